@@ -1,7 +1,11 @@
 from etl.utils.utils import load_dimension_tables
 from config.paths import LOCAL_DIM_ARTISTS_PATH
+from etl.utils.tracing import get_tracer, trace
+import logging
 import slugify
 
+tracer = get_tracer(__name__)
+
 def get_artist_name(artist_id, dim_artists):
     """
 
@@ -9,14 +13,12 @@ def get_artist_name(artist_id, dim_artists):
     :param dim_artists: (dict)
     :return:
     """
-    print(f"Artist ID is type: {type(artist_id)}")
     if isinstance(artist_id, str):
         if artist_id.isdigit():
             artist_id = int(artist_id)
 
     dim_artists_by_id = dim_artists["by_id"]
-    print("Dim Artists by ID")
-    print(dim_artists_by_id)
+    trace(tracer, logging.DEBUG, "artist_lookup", artist_id=artist_id, artist_id_type=type(artist_id).__name__)
     artist_record = dim_artists_by_id.get(artist_id)
     if artist_record is None:
         raise KeyError(f"Artist ID {artist_id} not found in artists dimension table")
@@ -36,7 +38,7 @@ def get_artist_ids(artist_names, dim_artists):
     :return: artist_ids (list)
     """
     existing_artists = dim_artists["by_slug"]
-    print(existing_artists.keys())
+    trace(tracer, logging.DEBUG, "artist_ids_lookup", artist_names=artist_names, artists=len(existing_artists))
     artist_ids = []
 
     for artist in artist_names:
@@ -1,7 +1,25 @@
 import slugify
 from config.paths import LOCAL_DIM_VENUES_PATH, LOCAL_DIM_CITIES_PATH
+from config.config import DIMENSION_TABLES
+from etl.utils.tracing import get_tracer, trace
+from etl.dimensions.location_utils import add_city_to_trie
+from etl.utils.utils import add_dimension_row
+import logging
 import csv
 
+tracer = get_tracer(__name__)
+
+VENUE_COLUMNS = ["id", "name", "slug", "city_id", "state_id"]
+CITY_COLUMNS = ["id", "name", "slug", "state_id"]
+
+def to_csv_row(columns, values):
+    '''
+    :param columns: list - the columns of the csv file
+    :param values: list - the values of the new row, in column order
+    :return: dict - the row as csv.DictReader reads it back from the file, every value a string and None as ''
+    '''
+    return {column: "" if value is None else str(value) for column, value in zip(columns, values)}
+
 def append_venue_csv(venue_name, dim_venues, city_id, state_id):
     '''
     Adds the new venue to dim_venues.csv and dim_venues dictionary
@@ -13,24 +31,19 @@ def append_venue_csv(venue_name, dim_venues, city_id, state_id):
     :return: venue_id (int)
     '''
     if venue_name is None:
-        print(f"Venue name {venue_name} not specified")
+        trace(tracer, logging.WARNING, "venue_name_missing", city_id=city_id, state_id=state_id)
         return None
     venue_id = dim_venues["max_id"] + 1
     venue_slug = slugify.slugify(venue_name)
     if city_id is None:
         city_id = -1
 
+    venue = to_csv_row(VENUE_COLUMNS, [venue_id, venue_name, venue_slug, city_id, state_id])
     with open(LOCAL_DIM_VENUES_PATH, "a", newline='', encoding='utf-8') as f:
         writer = csv.writer(f)
-        writer.writerow([venue_id, venue_name, venue_slug, city_id, state_id])
-
-    if venue_slug not in dim_venues["by_slug"]:
-        dim_venues["by_slug"][venue_slug] = [{'id': venue_id, 'name': venue_name, 'slug': venue_slug, 'city_id': city_id, state_id: state_id}]
-    else:
-        dim_venues["by_slug"][venue_slug].append({'id': venue_id, 'name': venue_name, 'slug': venue_slug, 'city_id': city_id, "state_id": state_id})
+        writer.writerow(venue.values())
 
-    dim_venues["by_id"][venue_id] = {'id': venue_id, 'name': venue_name, 'slug': venue_slug, 'city_id': city_id,
-                                     "state_id": state_id}
+    add_dimension_row(venue, dim_venues, DIMENSION_TABLES["venues"]["key_fn"])                                          # keeps by_slug, by_key, by_id, by_state and by_city current
 
     dim_venues["max_id"] += 1
     return venue_id
@@ -45,16 +58,13 @@ def append_city_csv(city_candidate, dim_cities, state_id):
     '''
     city_id = dim_cities["max_id"] + 1
     city_slug = slugify.slugify(city_candidate)
+    city = to_csv_row(CITY_COLUMNS, [city_id, city_candidate, city_slug, state_id])
     with open(LOCAL_DIM_CITIES_PATH, "a", newline='', encoding='utf-8') as f:
         writer = csv.writer(f)
-        writer.writerow([city_id, city_candidate, city_slug, state_id])
-
-    if city_id not in dim_cities["by_slug"]:
-        dim_cities["by_slug"][city_slug] = [{'id': city_id, 'name': city_candidate, 'slug': city_slug, 'aliases': None, 'state_id': state_id}]
-    else:
-        dim_cities["by_slug"][city_slug].append({'id': city_id, 'name': city_candidate, 'slug': city_slug, 'aliases': None, 'state_id': state_id})
+        writer.writerow(city.values())
 
-    dim_cities["by_id"][city_id] = {'id': city_id, 'name': city_candidate, 'slug': city_slug, 'aliases': None, 'state_id': state_id}
+    add_dimension_row(city, dim_cities, DIMENSION_TABLES["cities"]["key_fn"])                                           # keeps by_slug, by_key, by_id, by_state and by_city current
+    add_city_to_trie(city_slug, dim_cities)
 
     dim_cities["max_id"] += 1
 
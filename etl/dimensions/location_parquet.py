@@ -1,8 +1,12 @@
 import slugify
 from config.paths import LOCAL_DIM_VENUES_PATH, LOCAL_DIM_CITIES_PATH
 import pandas as pd
+from etl.utils.tracing import get_tracer, trace
+import logging
 import io
 
+tracer = get_tracer(__name__)
+
 def append_venue(s3_client, bucket, key, venue_name, dim_venues, city_id, state_id):
     """
     Adds the new venue to dim_venues.csv and dim_venues dictionary
@@ -17,7 +21,7 @@ def append_venue(s3_client, bucket, key, venue_name, dim_venues, city_id, state_
     :return: venue_id (int)
     """
     if venue_name is None:
-        print(f"Venue name {venue_name} not specified")
+        trace(tracer, logging.WARNING, "venue_name_missing", city_id=city_id, state_id=state_id)
         return None
 
     venue_id = dim_venues["max_id"] + 1
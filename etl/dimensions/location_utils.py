@@ -1,5 +1,10 @@
+from etl.utils.tracing import get_tracer, trace
+from etl.utils.phrase_trie import build_trie, insert_phrase, slug_phrase
+import logging
 import math
 
+tracer = get_tracer(__name__)
+
 def get_venue_name(venue_id, dim_venues):
     """
 
@@ -10,8 +15,6 @@ def get_venue_name(venue_id, dim_venues):
     if math.isnan(venue_id):
         return ""
 
-    print(venue_id)
-
     if isinstance(venue_id, str):
         if venue_id.isdigit():
             venue_id = int(venue_id)
@@ -20,11 +23,40 @@ def get_venue_name(venue_id, dim_venues):
     elif isinstance(venue_id, float):
         venue_id = int(venue_id)
     if not isinstance(venue_id, int):
-        print(f"venue_id must be int, not {type(venue_id)}")
+        trace(tracer, logging.WARNING, "venue_id_not_int", venue_id=venue_id, venue_id_type=type(venue_id).__name__)
 
     dim_venues_by_id = dim_venues["by_id"]
     venue_record = dim_venues_by_id.get(venue_id)
-    print(f"Venue Record for id {venue_id}")
-    print(venue_record)
+    trace(tracer, logging.DEBUG, "venue_lookup", venue_id=venue_id, venue_record=venue_record)
     venue_name = venue_record["name"]
-    return venue_name
\ No newline at end of file
+    return venue_name
+
+def build_city_trie(dim_cities):
+    """
+    :param dim_cities: (dict) the indexed dim_cities table
+    :return: (dict) phrase trie of every city slug, split into its slug pieces, with the slug as value
+    """
+    phrases = ((slug_phrase(city_slug), city_slug) for city_slug in dim_cities["by_slug"])
+    return build_trie((pieces, city_slug) for pieces, city_slug in phrases if pieces is not None)
+
+def get_city_trie(dim_cities):
+    """
+    Builds the city trie the first time it is asked for and keeps it in dim_cities["slug_trie"]
+
+    :param dim_cities: (dict) the indexed dim_cities table
+    :return: (dict) from build_city_trie
+    """
+    if "slug_trie" not in dim_cities:
+        dim_cities["slug_trie"] = build_city_trie(dim_cities)
+    return dim_cities["slug_trie"]
+
+def add_city_to_trie(city_slug, dim_cities):
+    """
+    Keeps an already built city trie in step with a city appended to dim_cities
+
+    :param city_slug: (str)
+    :param dim_cities: (dict) the indexed dim_cities table
+    """
+    pieces = slug_phrase(city_slug)
+    if "slug_trie" in dim_cities and pieces is not None:
+        insert_phrase(dim_cities["slug_trie"], pieces, city_slug)
@@ -0,0 +1,335 @@
+from etl.ocr.page_cache import render_page
+from etl.ocr.locator import lookup_table_page, locate_table_page
+from etl.ocr.regions import load_crop_boxes, crop_to_region
+from etl.ocr.workers import image_to_string
+from etl.schemas.billboard_magazine_3.processing.process import (
+    extract_raw_event_lines, consolidate_events, parse_events,
+    BOXSCORE_TABLE_NAME, BOXSCORE_MARKERS, BOXSCORE_DEFAULT_PAGE
+)
+from etl.utils.s3_utils import client, list_s3_files
+from config import BUCKET_NAME
+from contextlib import redirect_stdout
+from datetime import datetime
+from PIL import ImageOps
+import itertools
+import tempfile
+import argparse
+import time
+import json
+import ast
+import csv
+import io
+import os
+import re
+
+'''
+Benchmarks tesseract settings on both speed and accuracy. Every config in the matrix (psm, oem, DPI, preprocessing)
+re-runs rasterization + OCR + parsing over the same Boxscore issues, then the parsed events are scored against the true
+values in the corrections table. The corrections only cover fields the OCR once got wrong, so the error rates measure
+how many of the known hard cases each config still gets wrong.
+
+    python -m etl.ocr.benchmark --issues 5 --psm 4 6 --dpi 200 300
+'''
+
+CORRECTIONS_PATH = os.path.join(os.path.dirname(__file__), "..", "..", "reference_tables", "corrections", "event_corrections_bb_3.csv")
+ISSUE_MONTH_PREFIX = "raw/billboard/pdf/magazines/{year}/{month:02d}/"
+ISSUE_FILE_SUFFIX = "-{year}-{month:02d}-{day:02d}.pdf"                                                                 # BB-1984-11-03.pdf or Billboard-1987-03-07.pdf
+BENCHMARK_QUARANTINE_PATH = os.path.join(tempfile.gettempdir(), "ocr_benchmark_quarantine.jsonl")                       # kept out of the production quarantine file
+MATCH_THRESHOLD = 0.5                                                                                                   # min token overlap between a correction signature and a parsed event
+
+PREPROCESSORS = {
+    "none": lambda image: image,
+    "grayscale": lambda image: ImageOps.grayscale(image),
+    "autocontrast": lambda image: ImageOps.autocontrast(ImageOps.grayscale(image)),
+    "binarize": lambda image: ImageOps.grayscale(image).point(lambda pixel: 255 if pixel > 160 else 0),
+}
+
+DEFAULT_MATRIX = {
+    "psm": [3, 4, 6],
+    "oem": [1, 3],
+    "dpi": [200, 300],
+    "preprocessing": ["none", "binarize"],
+}
+
+def build_configs(matrix=DEFAULT_MATRIX):
+    """
+    :param matrix: (dict) {setting: list of values}
+    :return: list of config dicts, one per combination
+    """
+    settings = list(matrix)
+    return [dict(zip(settings, values)) for values in itertools.product(*(matrix[setting] for setting in settings))]
+
+def config_name(config):
+    return f"psm{config['psm']}-oem{config['oem']}-dpi{config['dpi']}-{config['preprocessing']}"
+
+def tesseract_args(config):
+    return f"--psm {config['psm']} --oem {config['oem']}"
+
+def issue_key_from_date(issue_date, list_keys=list_s3_files):
+    """
+    Finds the issue in the listing of its month, the file name prefix changed over the years
+
+    :param issue_date: (str) issue date as written in the corrections table, ex. '10/20/1984'
+    :param list_keys: function taking a prefix and returning the keys under it
+    :return: (str) the s3 key of the issue, None if no issue of the month has that date
+    """
+    parsed_date = datetime.strptime(issue_date, "%m/%d/%Y")
+    prefix = ISSUE_MONTH_PREFIX.format(year=parsed_date.year, month=parsed_date.month)
+    suffix = ISSUE_FILE_SUFFIX.format(year=parsed_date.year, month=parsed_date.month, day=parsed_date.day)
+
+    return next((key for key in list_keys(prefix) if key.endswith(suffix)), None)
+
+def load_corrections_by_issue(path=CORRECTIONS_PATH, list_keys=list_s3_files):
+    """
+    :param path: (str)
+    :param list_keys: function taking a prefix and returning the keys under it, each month is listed once
+    :return: (dict) {issue key: list of correction rows}, issues in the order they appear in the table
+    """
+    corrections_by_issue = {}
+    month_listings = {}
+    missing_dates = set()
+
+    def list_month(prefix):
+        if prefix not in month_listings:
+            month_listings[prefix] = list_keys(prefix)
+        return month_listings[prefix]
+
+    with open(path, "r", newline='', encoding='cp1252') as f:
+        for row in csv.DictReader(f):
+            issue_key = issue_key_from_date(row["issue_date"], list_month)
+            if issue_key is None:
+                missing_dates.add(row["issue_date"])
+                continue
+            corrections_by_issue.setdefault(issue_key, []).append(row)
+
+    if missing_dates:
+        print(f"No issue found for {len(missing_dates)} corrected issue dates: {sorted(missing_dates)}")
+
+    return corrections_by_issue
+
+def list_local_pdfs(pdf_dir):
+    """
+    :param pdf_dir: (str) local folder holding the pdfs by file name
+    :return: function listing the folder's pdfs as keys under the given prefix, for issue_key_from_date
+    """
+    file_names = sorted(os.listdir(pdf_dir))
+    return lambda prefix: [prefix + file_name for file_name in file_names]
+
+def parse_true_value(raw_value):
+    try:
+        return ast.literal_eval(raw_value)                                                                              # same conversion implement_corrections uses
+    except (ValueError, SyntaxError):
+        return raw_value
+
+def normalize_value(value):
+    """
+    Puts parsed and true values in the same form: numbers as floats, strings stripped, lists of normalized items
+    """
+    if isinstance(value, (list, tuple)):
+        return [normalize_value(item) for item in value]
+    if isinstance(value, str):
+        value = value.strip()
+        try:
+            return float(value.replace(",", ""))
+        except ValueError:
+            return value
+    if isinstance(value, (int, float)):
+        return float(value)
+    return value
+
+def tokenize(text):
+    return set(re.findall(r"[a-z0-9]+", text.lower()))
+
+def event_tokens(event):
+    return tokenize(" ".join(event["artists"] + event["location"] + event["dates"]))
+
+def match_event(signature, events):
+    """
+    Finds the parsed event a correction belongs to. Signatures are built during curation from the artist, venue and
+    start date, so they are matched on token overlap with the raw artist, location and date text
+
+    :param signature: (str) ex. 'diana-ross-war-memorial-1984-10-03'
+    :param events: list of parsed event dicts
+    :return: the best matching event, None if no event overlaps enough
+    """
+    signature_tokens = tokenize(signature.replace("-", " "))
+    best_event, best_score = None, 0.0
+
+    for event in events:
+        overlap = len(signature_tokens & event_tokens(event)) / len(signature_tokens) if signature_tokens else 0.0
+        if overlap > best_score:
+            best_event, best_score = event, overlap
+
+    return best_event if best_score >= MATCH_THRESHOLD else None
+
+def score_events(events, corrections):
+    """
+    Compares the parsed events to the true values of the corrections
+
+    :param events: list of parsed event dicts
+    :param corrections: list of correction rows for the issue
+    :return: (dict) {field: [num_errors, num_checked]}
+    """
+    field_scores = {}
+
+    for correction in corrections:
+        field = correction["field"]
+        score = field_scores.setdefault(field, [0, 0])
+        score[1] += 1
+
+        event = match_event(correction["event_signature"], events)
+        if event is None or normalize_value(event.get(field)) != normalize_value(parse_true_value(correction["true_value"])):
+            score[0] += 1
+
+    return field_scores
+
+def load_issue_pdf(issue_key, pdf_dir=None):
+    """
+    :param issue_key: (str) the s3 key of the issue
+    :param pdf_dir: (str) local folder holding the pdfs by file name, downloads from s3 when None
+    :return: the raw pdf bytes
+    """
+    if pdf_dir:
+        with open(os.path.join(pdf_dir, os.path.basename(issue_key)), "rb") as f:
+            return f.read()
+
+    return client.get_object(Bucket=BUCKET_NAME, Key=issue_key)["Body"].read()
+
+def ocr_and_parse(pdf_bytes, page_num, crop_box, config, issue_key, quarantine_path=BENCHMARK_QUARANTINE_PATH):
+    """
+    Runs one config over one page without the page or text caches so every config pays its own cost
+
+    :param issue_key: (str) the s3 key the events are parsed for
+    :param quarantine_path: (str) where lines that run past their time budget are written
+    :return: (list of parsed events, seconds spent on rasterizing, preprocessing and OCR)
+    """
+    start = time.perf_counter()
+    image = render_page(pdf_bytes, page_num, config["dpi"])
+    if crop_box:
+        image = crop_to_region(image, crop_box)
+    page_text = image_to_string(PREPROCESSORS[config["preprocessing"]](image), tesseract_args(config))
+    seconds = time.perf_counter() - start
+
+    with redirect_stdout(io.StringIO()):                                                                                # the parser prints every event
+        event_lines = extract_raw_event_lines(page_text.splitlines(), False)
+        events = [event for event in parse_events(consolidate_events(event_lines), issue_key, quarantine_path=quarantine_path) if event]
+
+    return events, seconds
+
+def run_benchmark(issue_keys, configs, corrections_by_issue, pdf_dir=None, quarantine_path=BENCHMARK_QUARANTINE_PATH):
+    """
+    :param issue_keys: list of s3 keys of the issues to benchmark on
+    :param configs: list of config dicts from build_configs
+    :param corrections_by_issue: (dict) from load_corrections_by_issue
+    :param pdf_dir: (str)
+    :param quarantine_path: (str) where lines that run past their time budget are written
+    :return: list of result dicts, one per config
+    """
+    issues = []
+    missing_keys = []
+    crop_boxes = load_crop_boxes()
+
+    for issue_key in issue_keys:
+        try:
+            pdf_bytes = load_issue_pdf(issue_key, pdf_dir)
+        except (client.exceptions.NoSuchKey, FileNotFoundError):
+            print(f"Skipping {issue_key}, the pdf does not exist")
+            missing_keys.append(issue_key)
+            continue
+        page_num = lookup_table_page(issue_key, BOXSCORE_TABLE_NAME)
+        if page_num is None:
+            page_num = locate_table_page(pdf_bytes, issue_key, BOXSCORE_TABLE_NAME, BOXSCORE_MARKERS, BOXSCORE_DEFAULT_PAGE)
+        if page_num is None:
+            print(f"Skipping {issue_key}, no Boxscore page")
+            continue
+        crop_box = crop_boxes.get(f"{BOXSCORE_TABLE_NAME}-{issue_key.split('/')[4]}")
+        issues.append((issue_key, pdf_bytes, page_num, crop_box))
+
+    if missing_keys:
+        print(f"Benchmarking on {len(issues)} issues, {len(missing_keys)} missing: {missing_keys}")
+
+    results = []
+
+    for config in configs:
+        total_seconds = 0.0
+        field_scores = {}
+        num_events = 0
+
+        for issue_key, pdf_bytes, page_num, crop_box in issues:
+            events, seconds = ocr_and_parse(pdf_bytes, page_num, crop_box, config, issue_key, quarantine_path)
+            total_seconds += seconds
+            num_events += len(events)
+
+            for field, (num_errors, num_checked) in score_events(events, corrections_by_issue.get(issue_key, [])).items():
+                score = field_scores.setdefault(field, [0, 0])
+                score[0] += num_errors
+                score[1] += num_checked
+
+        total_errors = sum(score[0] for score in field_scores.values())
+        total_checked = sum(score[1] for score in field_scores.values())
+
+        result = {
+            "config": config_name(config),
+            "pages": len(issues),
+            "events": num_events,
+            "seconds_per_page": round(total_seconds / len(issues), 3) if issues else None,
+            "error_rate": round(total_errors / total_checked, 4) if total_checked else None,
+            "field_error_rates": {field: round(score[0] / score[1], 4) for field, score in sorted(field_scores.items())},
+        }
+        print(f"{result['config']}: {result['seconds_per_page']} s/page, error rate {result['error_rate']}")
+        results.append(result)
+
+    return results
+
+def fastest_config(results, max_error_rate):
+    """
+    :param results: list of result dicts from run_benchmark
+    :param max_error_rate: (float) the accuracy bar
+    :return: the fastest result whose error rate meets the bar, None if none do
+    """
+    passing = [result for result in results if result["error_rate"] is not None and result["error_rate"] <= max_error_rate]
+    return min(passing, key=lambda result: result["seconds_per_page"], default=None)
+
+def save_results(results, path):
+    fields = sorted({field for result in results for field in result["field_error_rates"]})
+
+    with open(path, "w", newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(["config", "pages", "events", "seconds_per_page", "error_rate"] + fields)
+        for result in results:
+            writer.writerow(
+                [result["config"], result["pages"], result["events"], result["seconds_per_page"], result["error_rate"]]
+                + [result["field_error_rates"].get(field) for field in fields]
+            )
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark OCR configs on speed and accuracy against the corrections table")
+    parser.add_argument("--issues", type=int, default=5, help="number of corrected issues to benchmark on")
+    parser.add_argument("--psm", type=int, nargs="+", default=DEFAULT_MATRIX["psm"])
+    parser.add_argument("--oem", type=int, nargs="+", default=DEFAULT_MATRIX["oem"])
+    parser.add_argument("--dpi", type=int, nargs="+", default=DEFAULT_MATRIX["dpi"])
+    parser.add_argument("--preprocessing", nargs="+", default=DEFAULT_MATRIX["preprocessing"], choices=list(PREPROCESSORS))
+    parser.add_argument("--max-error-rate", type=float, default=0.2)
+    parser.add_argument("--pdf-dir", help="local folder of issue pdfs, defaults to downloading from s3")
+    parser.add_argument("--output", help="csv file to write the results to")
+    parser.add_argument("--quarantine", default=BENCHMARK_QUARANTINE_PATH, help="file for lines that run past their time budget")
+    args = parser.parse_args()
+
+    corrections_by_issue = load_corrections_by_issue(list_keys=list_local_pdfs(args.pdf_dir) if args.pdf_dir else list_s3_files)
+    issue_keys = list(corrections_by_issue)[:args.issues]
+    configs = build_configs({"psm": args.psm, "oem": args.oem, "dpi": args.dpi, "preprocessing": args.preprocessing})
+
+    results = run_benchmark(issue_keys, configs, corrections_by_issue, args.pdf_dir, args.quarantine)
+
+    if args.output:
+        save_results(results, args.output)
+
+    best = fastest_config(results, args.max_error_rate)
+    if best is None:
+        print(f"No config met the error rate bar of {args.max_error_rate}")
+    else:
+        print(f"Fastest config under {args.max_error_rate} error rate: {best['config']}")
+        print(json.dumps(best, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from collections import deque
+from etl.utils.utils import extract_text_ocr
+from etl.ocr.page_cache import spooled_pdf, hash_pdf
+from etl.ocr.workers import limit_worker_memory, set_ocr_backend
+import logging
+import os
+logger = logging.getLogger()
+
+'''
+Runs OCR jobs across a pool of worker processes. A job is a (pdf, page_num, pdf_hash) tuple where pdf is the path to a
+local pdf file (preferred, only the path is sent to the worker) or the raw pdf bytes. The pdf is hashed once per issue
+by the caller and the hash travels with every page job, so the workers never hash the pdf again.
+
+The processors read their table pages with ocr_pdf_low_memory instead of in their own process when low memory mode is
+on, either with the router's --low-memory flag or from the environment:
+
+    ETL_OCR_LOW_MEMORY=1
+'''
+
+PENDING_JOBS_PER_WORKER = 2
+DEFAULT_WORKER_MEMORY_LIMIT = 2 * 1024 ** 3                                                                             # per worker, poppler and tesseract children included
+LOW_MEMORY_ENV = "ETL_OCR_LOW_MEMORY"
+
+def low_memory_enabled():
+    """
+    :return: (bool) True if pages should be read with ocr_pdf_low_memory
+    """
+    return os.environ.get(LOW_MEMORY_ENV, "").lower() in ("1", "true", "yes")
+
+def ocr_page(job):
+    """
+    Runs OCR on a single (pdf, page_num, pdf_hash) job inside a worker process
+
+    :param job: (tuple) (pdf path or bytes, page_num, pdf_hash)
+    :return: the OCR text of the page
+    """
+    pdf, page_num, pdf_hash = job
+    return extract_text_ocr(pdf, page_num, pdf_hash=pdf_hash)
+
+def ocr_page_low_memory(job):
+    """
+    Low memory version of ocr_page for jobs holding a pdf path: the page is rendered to a file and tesseract reads it
+    from disk, so the worker never holds the pdf or the decoded page image
+
+    :param job: (tuple) (pdf path, page_num, pdf_hash)
+    :return: the OCR text of the page
+    """
+    pdf_path, page_num, pdf_hash = job
+    return extract_text_ocr(pdf_path, page_num, pdf_hash=pdf_hash, low_memory=True)
+
+def _init_worker(memory_limit):
+    set_ocr_backend(None)                                                                                               # a pool set in the parent is not reachable from here
+    limit_worker_memory(memory_limit)
+
+def _run_job(ocr_fn, job):
+    try:
+        return ocr_fn(job)
+    except Exception as e:
+        logger.error(f"OCR failed for page {job[1]}: {e}")
+        return None
+
+def ocr_pdf_low_memory(pdf, page_nums, max_workers=None, memory_limit=DEFAULT_WORKER_MEMORY_LIMIT, pdf_hash=None, ocr_fn=ocr_page_low_memory):
+    """
+    OCRs pages of a large pdf with bounded memory: the pdf is spooled to a temp file once, workers are only sent its
+    path, each page is rendered to a file and read by tesseract from disk, and every worker has a memory ceiling
+
+    :param pdf: the raw pdf bytes or the path to a local pdf file
+    :param page_nums: list of 1-indexed page numbers
+    :param max_workers: (int)
+    :param memory_limit: (int) max bytes of memory per worker
+    :param pdf_hash: (str) the pdf's hash if already known
+    :param ocr_fn: a picklable function taking a (pdf path, page_num, pdf_hash) job, ex. a partial of
+        etl.ocr.regions.extract_table_text_job to crop the table in the worker
+    :return: (dict) {page_num: page text}, None for pages that failed
+    """
+    with spooled_pdf(pdf) as pdf_path:
+        pdf_hash = pdf_hash or hash_pdf(pdf_path)                                                                       # hashed once for every page job
+        jobs = [(pdf_path, page_num, pdf_hash) for page_num in page_nums]
+        return {
+            page_num: page_text
+            for (_, page_num, _), page_text in ocr_pages(jobs, max_workers, ocr_fn=ocr_fn, memory_limit=memory_limit)
+        }
+
+def ocr_pages(jobs, max_workers=None, ordered=True, max_pending=None, ocr_fn=ocr_page, memory_limit=None):
+    """
+    Fans a list of (pdf, page_num, pdf_hash) jobs out over a process pool and yields each result as (job, page_text)
+
+    Only max_pending jobs are submitted at a time, so no more than max_pending rasterized pages are held in memory at
+    once no matter how many jobs are queued. A job that fails yields None as its page text.
+
+    :param jobs: iterable of (pdf, page_num, pdf_hash) tuples
+    :param max_workers: (int) number of worker processes, defaults to the number of cores
+    :param ordered: (bool) if True, results are yielded in job order, otherwise as soon as they complete
+    :param max_pending: (int) max jobs in flight at once, defaults to PENDING_JOBS_PER_WORKER per worker
+    :param ocr_fn: a module level function that takes a job and returns its text
+    :param memory_limit: (int) max bytes of memory per worker, ex. DEFAULT_WORKER_MEMORY_LIMIT, None for no limit
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    max_pending = max_pending or max_workers * PENDING_JOBS_PER_WORKER
+    jobs = iter(jobs)
+
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker, initargs=(memory_limit,)) as executor:
+        pending = deque() if ordered else set()
+        futures_to_jobs = {}
+
+        def submit_next():
+            job = next(jobs, None)
+            if job is None:
+                return False
+            future = executor.submit(_run_job, ocr_fn, job)
+            futures_to_jobs[future] = job
+            if ordered:
+                pending.append(future)
+            else:
+                pending.add(future)
+            return True
+
+        while len(pending) < max_pending and submit_next():
+            pass
+
+        try:
+            while pending:
+                if ordered:
+                    done = [pending.popleft()]                                                                          # wait on the oldest job to keep results in order
+                else:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    pending.difference_update(done)
+
+                for future in done:
+                    job = futures_to_jobs.pop(future)
+                    submit_next()                                                                                       # refill the pool before handing the result back
+                    yield job, future.result()
+        finally:
+            # if the caller stops early (ex. the page it was looking for was found), drop the queued jobs
+            for future in pending:
+                future.cancel()
@@ -0,0 +1,216 @@
+from etl.ocr.page_cache import get_page_image, hash_pdf, spooled_pdf
+from etl.ocr.engine import ocr_pages
+from etl.ocr.workers import image_to_string
+from etl.utils.file_lock import load_json_file, update_json_file
+from datetime import date
+import pdfplumber
+import statistics
+import io
+import os
+import re
+
+'''
+Finds the page of an issue that holds a chart table (Boxscore, Top Boxoffice) with the cheapest check that works:
+    1. the page index, pages found on earlier runs are never searched for again
+    2. the pdf text layer
+    3. low DPI OCR of the header strip at the top of each page, starting from the page predicted by neighbouring issues
+    4. low DPI OCR of full pages, in parallel
+Both OCR searches only look at pages within SEARCH_WINDOW of the predicted page. A page only counts when it holds every
+marker, so a table title alone on the contents page, a running head or an ad is never saved as the table page. The page
+found for each issue is saved in the page index so later runs OCR only one page per issue. The index is written at
+runtime and is not tracked by git.
+'''
+
+PAGE_INDEX_PATH = os.path.join(os.path.dirname(__file__), "..", "..", "reference_tables", "page_index", "table_pages.json")
+LOCATOR_DPI = 100
+HEADER_STRIP_FRACTION = 0.3                                                                                             # top 30% of the page
+NUM_NEIGHBOURS = 3
+SEARCH_WINDOW = 10                                                                                                      # pages either side of the predicted page to OCR
+ISSUE_DATE_PATTERN = re.compile(r"(\d{4})-(\d{2})-(\d{2})")
+
+def load_page_index(path=PAGE_INDEX_PATH):
+    """
+    :param path: (str)
+    :return: (dict) {table name: {issue key: page_num}}
+    """
+    return load_json_file(path)
+
+def save_page_index(page_index, path=PAGE_INDEX_PATH):
+    """
+    Merges the pages into the index under its lock, keeping pages other workers saved since it was loaded
+
+    :param page_index: (dict) {table name: {issue key: page_num}}
+    :param path: (str)
+    """
+    def merge(saved_index):
+        for table_name, table_pages in page_index.items():
+            saved_index.setdefault(table_name, {}).update(table_pages)
+
+    update_json_file(path, merge)
+
+def get_issue_date(issue_key):
+    """
+    Extracts the issue date from a key like 'raw/billboard/pdf/magazines/1984/11/BB-1984-11-03.pdf'
+
+    :param issue_key: (str)
+    :return: date, None if the key has no date
+    """
+    match = ISSUE_DATE_PATTERN.search(os.path.basename(issue_key))
+
+    if match is None:
+        return None
+
+    return date(int(match.group(1)), int(match.group(2)), int(match.group(3)))
+
+def predict_page(issue_key, table_pages, default_page):
+    """
+    Predicts the table page from the issues closest in date that have already been located
+
+    :param issue_key: (str)
+    :param table_pages: (dict) {issue key: page_num} for the same table
+    :param default_page: (int) used when there are no neighbouring issues
+    :return: (int) predicted page number
+    """
+    issue_date = get_issue_date(issue_key)
+    neighbours = []
+
+    if issue_date is not None:
+        for other_key, other_page in table_pages.items():
+            other_date = get_issue_date(other_key)
+            if other_date is not None and other_key != issue_key:
+                neighbours.append((abs((other_date - issue_date).days), other_page))
+
+    if not neighbours:
+        return default_page
+
+    neighbours.sort()
+    return int(statistics.median(page for _, page in neighbours[:NUM_NEIGHBOURS]))
+
+def search_order(predicted_page, num_pages, window=None):
+    """
+    Orders the pages by distance from the predicted page: p, p+1, p-1, p+2, p-2 ...
+
+    :param predicted_page: (int)
+    :param num_pages: (int)
+    :param window: (int) most pages to go either side of the predicted page, None for every page
+    :return: list of page numbers
+    """
+    predicted_page = min(max(predicted_page, 1), num_pages)
+    pages = [predicted_page]
+    max_offset = num_pages - 1 if window is None else min(window, num_pages - 1)
+
+    for offset in range(1, max_offset + 1):
+        for page in (predicted_page + offset, predicted_page - offset):
+            if 1 <= page <= num_pages:
+                pages.append(page)
+
+    return pages
+
+def contains_marker(text, markers, require_all=False):
+    """
+    Checks the text for the markers, ignoring case and whitespace since OCR often splits or joins words
+
+    :param text: (str)
+    :param markers: list of strings, ex. ['Boxscore']
+    :param require_all: (bool) True if every marker has to be in the text, otherwise any one is enough
+    :return: bool
+    """
+    if not text:
+        return False
+
+    squashed = re.sub(r"\s+", "", text).lower()
+    found = (re.sub(r"\s+", "", marker).lower() in squashed for marker in markers)
+    return all(found) if require_all else any(found)
+
+def find_page_in_text_layer(pdf_bytes, markers):
+    source = pdf_bytes if isinstance(pdf_bytes, (str, os.PathLike)) else io.BytesIO(pdf_bytes)
+
+    with pdfplumber.open(source) as pdf:
+        num_pages = len(pdf.pages)
+        for i, page in enumerate(pdf.pages):
+            if contains_marker(page.extract_text(), markers, require_all=True):
+                return i + 1, num_pages
+
+    return None, num_pages
+
+def ocr_header_strip(pdf_bytes, page_num, pdf_hash=None, dpi=LOCATOR_DPI):
+    """
+    OCRs only the top of the page at a low DPI
+
+    :param pdf_bytes: the raw pdf bytes or the path to a local pdf file
+    :param page_num: (int)
+    :param pdf_hash: (str)
+    :param dpi: (int)
+    :return: (str) the header text
+    """
+    image = get_page_image(pdf_bytes, page_num, dpi=dpi, pdf_hash=pdf_hash)
+
+    if image is None:
+        return ""
+
+    width, height = image.size
+    strip = image.crop((0, 0, width, int(height * HEADER_STRIP_FRACTION)))
+    return image_to_string(strip)
+
+def ocr_full_page_low_dpi(job):
+    pdf, page_num, pdf_hash = job
+    image = get_page_image(pdf, page_num, dpi=LOCATOR_DPI, pdf_hash=pdf_hash)
+    return "" if image is None else image_to_string(image)
+
+def locate_table_page(pdf_bytes, issue_key, table_name, markers, default_page=1, page_index_path=PAGE_INDEX_PATH, window=SEARCH_WINDOW):
+    """
+    Finds the page holding the table and records it in the page index
+
+    :param pdf_bytes: the raw pdf bytes or the path to a local pdf file
+    :param issue_key: (str) the s3 key of the issue
+    :param table_name: (str) groups issues of the same table in the index, ex. 'billboard_boxscore'
+    :param markers: list of strings that all appear on the table page, include the column header so the title alone
+                    on the contents page does not match
+    :param default_page: (int) where to start searching when no neighbouring issue has been located
+    :param page_index_path: (str)
+    :param window: (int) most pages to OCR either side of the predicted page, None for every page
+    :return: (int) the 1-indexed page number, None if the table was not found
+    """
+    page_index = load_page_index(page_index_path)
+    table_pages = page_index.setdefault(table_name, {})
+
+    if issue_key in table_pages:
+        return table_pages[issue_key]
+
+    page_num, num_pages = find_page_in_text_layer(pdf_bytes, markers)
+    method = "text_layer"
+
+    if page_num is None:
+        pdf_hash = hash_pdf(pdf_bytes)
+        candidate_pages = search_order(predict_page(issue_key, table_pages, default_page), num_pages, window)
+        method = "header_strip"
+
+        for candidate_page in candidate_pages:
+            if contains_marker(ocr_header_strip(pdf_bytes, candidate_page, pdf_hash), markers, require_all=True):
+                page_num = candidate_page
+                break
+
+        # the header strip can miss tables that start low on the page, OCR full pages as a last resort
+        if page_num is None:
+            method = "full_page"
+            with spooled_pdf(pdf_bytes) as pdf_path:
+                jobs = [(pdf_path, candidate_page, pdf_hash) for candidate_page in candidate_pages]
+                for (_, candidate_page, _), page_text in ocr_pages(jobs, ordered=False, ocr_fn=ocr_full_page_low_dpi):
+                    if contains_marker(page_text, markers, require_all=True):
+                        page_num = candidate_page
+                        break
+
+    if page_num is None:
+        print(f"Could not find {table_name} table in {issue_key}")
+        return None
+
+    print(f"Found {table_name} table on page {page_num} of {issue_key} with {method}")
+    save_page_index({table_name: {issue_key: page_num}}, page_index_path)
+
+    return page_num
+
+def lookup_table_page(issue_key, table_name, page_index_path=PAGE_INDEX_PATH):
+    """
+    :return: (int) the page recorded for the issue, None if it has not been located yet
+    """
+    return load_page_index(page_index_path).get(table_name, {}).get(issue_key)
@@ -0,0 +1,229 @@
+from pdf2image import convert_from_bytes, convert_from_path
+from contextlib import contextmanager
+from PIL import Image
+import tempfile
+import hashlib
+import shutil
+import os
+
+'''
+On-disk cache of rasterized pdf pages. Each page image is keyed by the sha256 of the pdf contents, the page number and
+the DPI, so re-reading a page costs a file read instead of a poppler render. Once the cache grows past
+PAGE_CACHE_MAX_BYTES the least recently used images are evicted. Walking the cache costs more the bigger it grows, so
+each process only walks it after writing EVICTION_CHECK_FRACTION of PAGE_CACHE_MAX_BYTES since its last walk, the cache
+can run over by that much per worker process.
+'''
+
+PAGE_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "music-industry-economics", "pages")
+PAGE_CACHE_MAX_BYTES = 2 * 1024 ** 3
+DEFAULT_DPI = 200                                                                                                       # pdf2image default
+EVICTION_CHECK_FRACTION = 0.02
+
+page_cache_writes = {"bytes_since_eviction": 0}                                                                         # per process
+
+def hash_pdf(pdf):
+    """
+    Generates the sha256 hex digest of the pdf contents
+
+    :param pdf: the raw pdf bytes or the path to a local pdf file
+    :return: (str) hex digest
+    """
+    sha = hashlib.sha256()
+
+    if isinstance(pdf, (str, os.PathLike)):
+        with open(pdf, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                sha.update(chunk)
+    else:
+        sha.update(pdf)
+
+    return sha.hexdigest()
+
+def page_image_path(pdf_hash, page_num, dpi, cache_dir=PAGE_CACHE_DIR):
+    return os.path.join(cache_dir, pdf_hash[:2], f"{pdf_hash}-p{page_num}-{dpi}dpi.png")
+
+def render_page(pdf, page_num, dpi):
+    """
+    Rasterizes one page of the pdf with poppler
+
+    :param pdf: the raw pdf bytes or the path to a local pdf file
+    :param page_num: (int) 1-indexed page number
+    :param dpi: (int)
+    :return: PIL image, None if the page does not exist
+    """
+    if isinstance(pdf, (str, os.PathLike)):
+        images = convert_from_path(pdf, dpi=dpi, first_page=page_num, last_page=page_num)
+    else:
+        images = convert_from_bytes(pdf, dpi=dpi, first_page=page_num, last_page=page_num)
+
+    return images[0] if images else None
+
+def render_page_to_file(pdf_path, page_num, dpi, path):
+    """
+    Rasterizes one page of the pdf straight to a png file with poppler, the image is never loaded into this process
+
+    :param pdf_path: (str) path to a local pdf file
+    :param page_num: (int) 1-indexed page number
+    :param dpi: (int)
+    :param path: (str) where to write the png
+    :return: (str) the path, None if the page does not exist
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    output_folder = tempfile.mkdtemp(dir=os.path.dirname(path))                                                         # same filesystem as the cache so the move is atomic
+
+    try:
+        image_paths = convert_from_path(
+            pdf_path, dpi=dpi, first_page=page_num, last_page=page_num, output_folder=output_folder, fmt="png", paths_only=True
+        )
+        if not image_paths:
+            return None
+        os.replace(image_paths[0], path)
+        return path
+    finally:
+        shutil.rmtree(output_folder, ignore_errors=True)
+
+def get_page_image_path(pdf_path, page_num, dpi=DEFAULT_DPI, pdf_hash=None, cache_dir=PAGE_CACHE_DIR, max_bytes=PAGE_CACHE_MAX_BYTES):
+    """
+    Low memory version of get_page_image: returns the path of the cached page image instead of the image, rendering it
+    to disk on a miss. Tesseract can read the image from the path, so the page is never decoded in this process.
+
+    :param pdf_path: (str) path to a local pdf file, see spooled_pdf
+    :param page_num: (int) 1-indexed page number
+    :param dpi: (int)
+    :param pdf_hash: (str) the pdf's hash if already known
+    :param cache_dir: (str)
+    :param max_bytes: (int)
+    :return: (str) path to the png, None if the page does not exist
+    """
+    pdf_hash = pdf_hash or hash_pdf(pdf_path)
+    path = page_image_path(pdf_hash, page_num, dpi, cache_dir)
+
+    if os.path.exists(path):
+        try:
+            os.utime(path)
+            return path
+        except FileNotFoundError:
+            pass                                                                                                        # evicted by another worker, render again
+
+    if render_page_to_file(pdf_path, page_num, dpi, path) is None:
+        return None
+
+    record_page_write(path, cache_dir, max_bytes)
+    return path
+
+def get_page_image(pdf, page_num, dpi=DEFAULT_DPI, pdf_hash=None, cache_dir=PAGE_CACHE_DIR, max_bytes=PAGE_CACHE_MAX_BYTES):
+    """
+    Returns the rasterized page from the cache, rendering and caching it on a miss
+
+    :param pdf: the raw pdf bytes or the path to a local pdf file
+    :param page_num: (int) 1-indexed page number
+    :param dpi: (int)
+    :param pdf_hash: (str) the pdf's hash if already known, avoids hashing the pdf again
+    :param cache_dir: (str)
+    :param max_bytes: (int) size of the cache before least recently used images are evicted
+    :return: PIL image, None if the page does not exist
+    """
+    pdf_hash = pdf_hash or hash_pdf(pdf)
+    path = page_image_path(pdf_hash, page_num, dpi, cache_dir)
+
+    if os.path.exists(path):
+        try:
+            image = Image.open(path)
+            image.load()
+            os.utime(path)                                                                                              # mark as recently used for LRU eviction
+            return image
+        except OSError:
+            pass                                                                                                        # evicted or partially written by another worker, render again
+
+    image = render_page(pdf, page_num, dpi)
+    if image is None:
+        return None
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    image.save(tmp_path, format="PNG")
+    os.replace(tmp_path, path)                                                                                          # atomic so other workers never read half an image
+    record_page_write(path, cache_dir, max_bytes)
+
+    return image
+
+def record_page_write(path, cache_dir=PAGE_CACHE_DIR, max_bytes=PAGE_CACHE_MAX_BYTES):
+    """
+    Adds a newly written image to the bytes this process wrote since it last walked the cache, and evicts once they
+    reach EVICTION_CHECK_FRACTION of max_bytes
+
+    :param path: (str) the image that was written
+    :param cache_dir: (str)
+    :param max_bytes: (int)
+    :return: (int) number of images deleted
+    """
+    try:
+        page_cache_writes["bytes_since_eviction"] += os.path.getsize(path)
+    except FileNotFoundError:
+        pass                                                                                                            # already evicted by another worker
+
+    if page_cache_writes["bytes_since_eviction"] < max_bytes * EVICTION_CHECK_FRACTION:
+        return 0
+
+    page_cache_writes["bytes_since_eviction"] = 0
+    return evict_page_cache(cache_dir, max_bytes)
+
+def evict_page_cache(cache_dir=PAGE_CACHE_DIR, max_bytes=PAGE_CACHE_MAX_BYTES):
+    """
+    Deletes the least recently used page images until the cache is under max_bytes
+
+    :param cache_dir: (str)
+    :param max_bytes: (int)
+    :return: (int) number of images deleted
+    """
+    entries = []
+    total_bytes = 0
+
+    for root, _, files in os.walk(cache_dir):
+        for name in files:
+            if not name.endswith(".png"):
+                continue
+            path = os.path.join(root, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total_bytes += stat.st_size
+
+    num_deleted = 0
+    entries.sort()                                                                                                      # oldest access first
+
+    for _, size, path in entries:
+        if total_bytes <= max_bytes:
+            break
+        try:
+            os.remove(path)
+            num_deleted += 1
+        except FileNotFoundError:
+            pass
+        total_bytes -= size
+
+    return num_deleted
+
+@contextmanager
+def spooled_pdf(pdf):
+    """
+    Writes the pdf bytes to a temporary file so pages can be rendered from disk and workers can be sent a path instead
+    of a copy of the whole pdf. A path is passed through unchanged.
+
+    :param pdf: the raw bytes of the pdf or the path to a local pdf file
+    :return: the path to the pdf file
+    """
+    if isinstance(pdf, (str, os.PathLike)):
+        yield pdf
+        return
+
+    with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as f:
+        f.write(pdf)
+        pdf_path = f.name
+
+    try:
+        yield pdf_path
+    finally:
+        os.remove(pdf_path)
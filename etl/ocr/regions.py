@@ -0,0 +1,149 @@
+from etl.ocr.page_cache import get_page_image, hash_pdf, DEFAULT_DPI
+from etl.ocr.text_cache import load_ocr_text, save_ocr_text
+from etl.ocr.locator import contains_marker
+from etl.ocr.workers import image_to_string
+from etl.utils.file_lock import load_json_file, update_json_file
+import numpy as np
+import os
+
+'''
+Crops a chart table out of a magazine page so tesseract only reads the table instead of the ads and articles around it.
+
+The table is found with row/column projection profiles: the fraction of dark pixels in every row and column. The table
+is the block of text rows with the most ink, and within those rows, the widest run of inked columns. Boxes are stored as
+fractions of the page so they work at any DPI, and the box learned for a layout era is cached so most issues skip
+detection entirely. Boxes are saved with update_json_file, so no worker overwrites a box another one just saved.
+'''
+
+CROP_BOX_CACHE_PATH = os.path.join(os.path.dirname(__file__), "..", "..", "reference_tables", "page_index", "crop_boxes.json")
+TABLE_REGION_CONFIG = "table_region"                                                                                    # separates cropped text from full page text in the OCR text cache
+
+INK_THRESHOLD = 128                                                                                                     # grayscale values below this are ink
+ROW_INK_MIN = 0.01                                                                                                      # rows with less ink than this are whitespace
+COL_INK_MIN = 0.02
+MAX_ROW_GAP = 0.02                                                                                                      # fraction of page height allowed between lines of the same block
+MAX_COL_GAP = 0.03                                                                                                      # fraction of page width allowed between columns of the same table
+PADDING = 0.01
+TOP_PADDING = 0.04                                                                                                      # extra room above so the column header is never cut off
+
+def find_runs(mask, max_gap):
+    """
+    Groups the True values of a 1-D mask into runs, merging runs separated by no more than max_gap False values
+
+    :param mask: 1-D boolean numpy array
+    :param max_gap: (int)
+    :return: list of (start, end) tuples, end exclusive
+    """
+    indexes = np.flatnonzero(mask)
+
+    if len(indexes) == 0:
+        return []
+
+    breaks = np.flatnonzero(np.diff(indexes) > max_gap + 1)                                                             # positions where the gap is too large
+    starts = np.concatenate(([indexes[0]], indexes[breaks + 1]))
+    ends = np.concatenate((indexes[breaks], [indexes[-1]])) + 1
+
+    return list(zip(starts.tolist(), ends.tolist()))
+
+def heaviest_run(runs, profile):
+    return max(runs, key=lambda run: profile[run[0]:run[1]].sum())
+
+def detect_table_region(image):
+    """
+    Finds the densest block of text on the page
+
+    :param image: PIL image of the page
+    :return: (left, top, right, bottom) as fractions of the page size, None if the page is blank
+    """
+    pixels = np.asarray(image.convert("L"))
+    ink = pixels < INK_THRESHOLD
+    height, width = ink.shape
+
+    row_profile = ink.mean(axis=1)
+    row_runs = find_runs(row_profile > ROW_INK_MIN, int(height * MAX_ROW_GAP))
+    if not row_runs:
+        return None
+    top, bottom = heaviest_run(row_runs, row_profile)
+
+    col_profile = ink[top:bottom].mean(axis=0)
+    col_runs = find_runs(col_profile > COL_INK_MIN, int(width * MAX_COL_GAP))
+    if not col_runs:
+        return None
+    left, right = heaviest_run(col_runs, col_profile)
+
+    return (
+        max(left / width - PADDING, 0.0),
+        max(top / height - TOP_PADDING, 0.0),
+        min(right / width + PADDING, 1.0),
+        min(bottom / height + PADDING, 1.0),
+    )
+
+def crop_to_region(image, box):
+    width, height = image.size
+    left, top, right, bottom = box
+    return image.crop((int(left * width), int(top * height), int(right * width), int(bottom * height)))
+
+def load_crop_boxes(path=CROP_BOX_CACHE_PATH):
+    return load_json_file(path)
+
+def save_crop_box(era, box, path=CROP_BOX_CACHE_PATH):
+    update_json_file(path, lambda crop_boxes: crop_boxes.update({era: [round(value, 4) for value in box]}))
+
+def extract_table_text_ocr(pdf_bytes, page_num, era, markers, pdf_hash=None, dpi=DEFAULT_DPI, crop_box_path=CROP_BOX_CACHE_PATH):
+    """
+    OCRs only the table region of the page. Uses the crop box cached for the layout era when its text still contains
+    the table header, otherwise detects the region on this page and caches the new box. Falls back to the full page if
+    the header cannot be found in the detected region either.
+
+    :param pdf_bytes: the raw pdf bytes or the path to a local pdf file
+    :param page_num: (int)
+    :param era: (str) layout era the crop box is cached under, ex. 'billboard_boxscore-1985'
+    :param markers: list of strings from the table header, used to verify the crop
+    :param pdf_hash: (str)
+    :param dpi: (int)
+    :param crop_box_path: (str)
+    :return: (str) the OCR text of the table
+    """
+    pdf_hash = pdf_hash or hash_pdf(pdf_bytes)
+    page_text = load_ocr_text(pdf_hash, page_num, dpi, TABLE_REGION_CONFIG)
+    if page_text is not None:
+        return page_text
+
+    image = get_page_image(pdf_bytes, page_num, dpi=dpi, pdf_hash=pdf_hash)
+    if image is None:
+        return ""
+
+    page_text = None
+    cached_box = load_crop_boxes(crop_box_path).get(era)
+
+    if cached_box:
+        page_text = image_to_string(crop_to_region(image, cached_box))
+        if not contains_marker(page_text, markers):
+            print(f"Cached crop box for {era} missed the table header, detecting the table again")
+            page_text = None
+
+    if page_text is None:
+        detected_box = detect_table_region(image)
+        if detected_box:
+            page_text = image_to_string(crop_to_region(image, detected_box))
+            if contains_marker(page_text, markers):
+                save_crop_box(era, detected_box, crop_box_path)
+            else:
+                page_text = None
+
+    if page_text is None:
+        print(f"Could not isolate the table on page {page_num}, reading the full page")
+        page_text = image_to_string(image)
+
+    save_ocr_text(pdf_hash, page_num, page_text, dpi, TABLE_REGION_CONFIG)
+    return page_text
+
+def extract_table_text_job(job, era, markers):
+    """
+    extract_table_text_ocr for a (pdf path, page_num, pdf_hash) job, so the table can be cropped and read in a memory
+    capped worker with ocr_pdf_low_memory(..., ocr_fn=partial(extract_table_text_job, era=era, markers=markers))
+
+    :return: (str) the OCR text of the table, cached under TABLE_REGION_CONFIG
+    """
+    pdf_path, page_num, pdf_hash = job
+    return extract_table_text_ocr(pdf_path, page_num, era, markers, pdf_hash=pdf_hash)
@@ -0,0 +1,106 @@
+from functools import lru_cache
+import pytesseract
+import hashlib
+import slugify
+import json
+import os
+
+'''
+Content-addressed cache of raw OCR text. Each page's text is keyed by the pdf hash, page number, DPI, tesseract version
+and tesseract config, so parser changes can be re-run over every issue without running tesseract again, while a
+tesseract upgrade or a new config is never served stale text.
+
+Source keys (S3 object keys) are mapped to their pdf hash along with their ETag, so a cached issue can be re-parsed
+without downloading the pdf again.
+'''
+
+TEXT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "music-industry-economics", "ocr_text")
+
+@lru_cache(maxsize=1)
+def get_tesseract_version():
+    return str(pytesseract.get_tesseract_version())
+
+def ocr_text_path(pdf_hash, page_num, dpi, config, tesseract_version, cache_dir=TEXT_CACHE_DIR):
+    settings = f"{dpi}|{config}|{tesseract_version}"
+    settings_hash = hashlib.sha256(settings.encode("utf-8")).hexdigest()[:16]
+    return os.path.join(cache_dir, pdf_hash[:2], f"{pdf_hash}-p{page_num}-{settings_hash}.json")
+
+def load_ocr_text(pdf_hash, page_num, dpi, config="", tesseract_version=None, cache_dir=TEXT_CACHE_DIR):
+    """
+    Returns the cached OCR text of the page
+
+    :param pdf_hash: (str)
+    :param page_num: (int)
+    :param dpi: (int)
+    :param config: (str) the tesseract config the text was read with
+    :param tesseract_version: (str) defaults to the installed tesseract version
+    :param cache_dir: (str)
+    :return: (str) the page text, None if it has not been cached
+    """
+    tesseract_version = tesseract_version or get_tesseract_version()
+    path = ocr_text_path(pdf_hash, page_num, dpi, config, tesseract_version, cache_dir)
+
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)["text"]
+    except (FileNotFoundError, json.JSONDecodeError, KeyError):
+        return None
+
+def save_ocr_text(pdf_hash, page_num, text, dpi, config="", tesseract_version=None, cache_dir=TEXT_CACHE_DIR):
+    """
+    Saves the OCR text of the page along with the settings it was read with
+
+    :param pdf_hash: (str)
+    :param page_num: (int)
+    :param text: (str) the OCR text
+    :param dpi: (int)
+    :param config: (str)
+    :param tesseract_version: (str) defaults to the installed tesseract version
+    :param cache_dir: (str)
+    """
+    tesseract_version = tesseract_version or get_tesseract_version()
+    path = ocr_text_path(pdf_hash, page_num, dpi, config, tesseract_version, cache_dir)
+    record = {
+        "pdf_hash": pdf_hash,
+        "page_num": page_num,
+        "dpi": dpi,
+        "config": config,
+        "tesseract_version": tesseract_version,
+        "text": text,
+    }
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(record, f)
+    os.replace(tmp_path, path)
+
+def source_hash_path(source_key, cache_dir=TEXT_CACHE_DIR):
+    return os.path.join(cache_dir, "sources", f"{slugify.slugify(source_key)}.json")
+
+def lookup_source_hash(source_key, etag, cache_dir=TEXT_CACHE_DIR):
+    """
+    Returns the pdf hash recorded for the source key, as long as the source has not changed since
+
+    :param source_key: (str) ex. 'raw/billboard/pdf/magazines/1984/11/BB-1984-11-03.pdf'
+    :param etag: (str) the current ETag of the source object
+    :param cache_dir: (str)
+    :return: (str) pdf hash, None if unknown or the ETag changed
+    """
+    try:
+        with open(source_hash_path(source_key, cache_dir), "r", encoding="utf-8") as f:
+            record = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+    if record.get("etag") != etag:
+        return None
+
+    return record.get("pdf_hash")
+
+def save_source_hash(source_key, etag, pdf_hash, cache_dir=TEXT_CACHE_DIR):
+    path = source_hash_path(source_key, cache_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"source_key": source_key, "etag": etag, "pdf_hash": pdf_hash}, f)
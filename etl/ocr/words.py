@@ -0,0 +1,98 @@
+from etl.ocr.text_cache import get_tesseract_version
+import pandas as pd
+import pytesseract
+import hashlib
+import os
+
+'''
+Word level OCR output. tesseract's TSV output gives every word with its bounding box and confidence, which lets the
+parsers place words in table columns by position instead of guessing field boundaries from flat text.
+
+Words are stored as one parquet file per page, keyed like the OCR text cache, with compact integer columns:
+    line (int32): 0-indexed line of the page, words on the same line share it
+    left, top, width, height (int32): bounding box in pixels at the DPI the page was read at
+    conf (float32): tesseract's word confidence, 0-100
+    text (str)
+'''
+
+WORDS_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "music-industry-economics", "ocr_words")
+WORD_COLUMNS = ["line", "left", "top", "width", "height", "conf", "text"]
+WORD_DTYPES = {"line": "int32", "left": "int32", "top": "int32", "width": "int32", "height": "int32", "conf": "float32"}
+
+def image_to_words(image, config=""):
+    """
+    Runs tesseract on the image and keeps the word level rows of its TSV output
+
+    :param image: PIL image or image path
+    :param config: (str) extra tesseract arguments
+    :return: DataFrame with WORD_COLUMNS, in reading order
+    """
+    data = pytesseract.image_to_data(image, config=config, output_type=pytesseract.Output.DATAFRAME)
+    return clean_words(data)
+
+def empty_words():
+    return pd.DataFrame({column: pd.Series(dtype=WORD_DTYPES.get(column, "object")) for column in WORD_COLUMNS})
+
+def clean_words(data):
+    """
+    Drops the page/block/paragraph/line rows and empty words of a tesseract TSV table and numbers the lines
+
+    :param data: DataFrame of tesseract TSV output
+    :return: DataFrame with WORD_COLUMNS
+    """
+    data = data[(data["level"] == 5) & data["text"].notna()].copy()
+    data["text"] = data["text"].astype(str).str.strip()
+    data = data[data["text"] != ""]
+
+    if data.empty:
+        return empty_words()
+
+    data["line"] = data.groupby(["block_num", "par_num", "line_num"], sort=False).ngroup()                             # numbered in reading order
+
+    return data[WORD_COLUMNS].astype(WORD_DTYPES).reset_index(drop=True)
+
+def words_to_text(words):
+    """
+    Rebuilds plain page text from the words, one line of text per OCR line
+
+    :param words: DataFrame with WORD_COLUMNS
+    :return: (str)
+    """
+    if words.empty:
+        return ""
+
+    return "\n".join(words.groupby("line", sort=True)["text"].agg(" ".join)) + "\n"
+
+def ocr_words_path(pdf_hash, page_num, dpi, config, tesseract_version, cache_dir=WORDS_CACHE_DIR):
+    settings = f"{dpi}|{config}|{tesseract_version}"
+    settings_hash = hashlib.sha256(settings.encode("utf-8")).hexdigest()[:16]
+    return os.path.join(cache_dir, pdf_hash[:2], f"{pdf_hash}-p{page_num}-{settings_hash}.parquet")
+
+def load_words(pdf_hash, page_num, dpi, config="", tesseract_version=None, cache_dir=WORDS_CACHE_DIR):
+    """
+    Returns the cached words of the page
+
+    :param pdf_hash: (str)
+    :param page_num: (int)
+    :param dpi: (int)
+    :param config: (str) the tesseract config the words were read with
+    :param tesseract_version: (str) defaults to the installed tesseract version
+    :param cache_dir: (str)
+    :return: DataFrame with WORD_COLUMNS, None if the page has not been cached
+    """
+    tesseract_version = tesseract_version or get_tesseract_version()
+    path = ocr_words_path(pdf_hash, page_num, dpi, config, tesseract_version, cache_dir)
+
+    if not os.path.exists(path):
+        return None
+
+    return pd.read_parquet(path)
+
+def save_words(pdf_hash, page_num, words, dpi, config="", tesseract_version=None, cache_dir=WORDS_CACHE_DIR):
+    tesseract_version = tesseract_version or get_tesseract_version()
+    path = ocr_words_path(pdf_hash, page_num, dpi, config, tesseract_version, cache_dir)
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    words.to_parquet(tmp_path, engine="pyarrow", index=False, compression="zstd")
+    os.replace(tmp_path, path)
@@ -0,0 +1,346 @@
+from concurrent.futures import Future
+import multiprocessing as mp
+import pytesseract
+import subprocess
+import threading
+import tempfile
+import logging
+import queue
+import shlex
+import time
+import os
+logger = logging.getLogger()
+
+try:
+    import tesserocr
+except ImportError:
+    tesserocr = None
+
+try:
+    import resource
+except ImportError:                                                                                                     # not available on Windows
+    resource = None
+
+'''
+OCR backend made of long-lived worker processes. pytesseract.image_to_string starts a new tesseract process and loads
+the language model for every page. These workers pay that cost once:
+    - with tesserocr installed, each worker keeps one tesseract API (and its model) loaded for its whole life
+    - otherwise, each worker OCRs a batch of queued pages with one tesseract call using a list file, so the model is
+      loaded once per batch instead of once per page
+
+Use it behind extract_text_ocr by calling set_ocr_backend(pool), or pass it as ocr_backend. The router does this for
+each of its workers when started with --ocr-workers.
+
+Workers report the pages they take before reading them. A worker that dies (ex. killed for going over its memory
+limit) fails the pages it had taken and is replaced, and every wait on a page gives up after result_timeout seconds
+so a lost page can never hang the caller.
+'''
+
+DEFAULT_BATCH_SIZE = 8
+DEFAULT_RESULT_TIMEOUT = 600                                                                                            # seconds to wait for one page
+LIVENESS_INTERVAL = 1.0                                                                                                 # seconds between checks that the workers are alive
+PAGE_SEPARATOR = "\f"                                                                                                   # tesseract ends every page of text with a form feed
+
+_default_backend = None
+
+def set_ocr_backend(backend):
+    """
+    Sets the backend used by image_to_string when no backend is passed, None restores pytesseract
+
+    :param backend: a TesseractWorkerPool or None
+    """
+    global _default_backend
+    _default_backend = backend
+
+def image_to_string(image, config="", ocr_backend=None):
+    """
+    Reads the text of one image with the given backend, the default backend, or pytesseract
+
+    :param image: PIL image or image path
+    :param config: (str) extra tesseract arguments
+    :param ocr_backend: a TesseractWorkerPool
+    :return: (str)
+    """
+    ocr_backend = ocr_backend or _default_backend
+
+    if ocr_backend is None:
+        return pytesseract.image_to_string(image, config=config)
+
+    return ocr_backend.image_to_string(image, config)
+
+def run_tesseract_batch(images, config="", tesseract_cmd=None):
+    """
+    OCRs several images with a single tesseract process using tesseract's list file input
+
+    :param images: list of PIL images or image paths
+    :param config: (str) extra tesseract arguments
+    :param tesseract_cmd: (str) path to the tesseract executable
+    :return: list of page texts in the same order as the images
+    """
+    tesseract_cmd = tesseract_cmd or pytesseract.pytesseract.tesseract_cmd
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        image_paths = []
+        for i, image in enumerate(images):
+            if isinstance(image, str):                                                                                  # already on disk, see get_page_image_path
+                image_paths.append(image)
+                continue
+            image_path = os.path.join(tmp_dir, f"{i}.png")
+            image.save(image_path)
+            image_paths.append(image_path)
+
+        list_path = os.path.join(tmp_dir, "pages.txt")
+        with open(list_path, "w") as f:
+            f.write("\n".join(image_paths) + "\n")
+
+        result = subprocess.run([tesseract_cmd, list_path, "stdout"] + shlex.split(config), capture_output=True, check=True)
+
+    pages = result.stdout.decode("utf-8").split(PAGE_SEPARATOR)
+
+    if len(pages) < len(images):
+        raise RuntimeError(f"Tesseract returned {len(pages)} pages for {len(images)} images")
+
+    return [page + PAGE_SEPARATOR for page in pages[:len(images)]]                                                     # match pytesseract, which keeps the separator
+
+def _ocr_batch(batch, api, tesseract_cmd):
+    """
+    :param batch: list of (task_id, image, config) tuples
+    :return: list of (task_id, text, error) tuples
+    """
+    results = []
+    batches_by_config = {}
+
+    for task in batch:
+        task_id, image, config = task
+        # the loaded api only covers the default config, anything else goes through a tesseract batch call
+        if api is not None and not config:
+            try:
+                if isinstance(image, str):
+                    api.SetImageFile(image)
+                else:
+                    api.SetImage(image)
+                results.append((task_id, api.GetUTF8Text(), None))
+            except Exception as e:
+                results.append((task_id, None, str(e)))
+        else:
+            batches_by_config.setdefault(config, []).append(task)
+
+    for config, tasks in batches_by_config.items():
+        try:
+            texts = run_tesseract_batch([image for _, image, _ in tasks], config, tesseract_cmd)
+            results.extend((task_id, text, None) for (task_id, _, _), text in zip(tasks, texts))
+        except Exception as e:
+            results.extend((task_id, None, str(e)) for task_id, _, _ in tasks)
+
+    return results
+
+def limit_worker_memory(max_bytes):
+    """
+    Caps the address space of the current process. The limit is inherited by the poppler and tesseract processes it
+    starts, so a page that needs more memory fails that one job instead of getting the worker OOM-killed
+
+    :param max_bytes: (int) None leaves the process unlimited
+    """
+    if not max_bytes:
+        return
+    if resource is None:
+        logger.warning("Worker memory limits are not supported on this platform")
+        return
+
+    _, hard_limit = resource.getrlimit(resource.RLIMIT_AS)
+    if hard_limit != resource.RLIM_INFINITY:
+        max_bytes = min(max_bytes, hard_limit)
+    resource.setrlimit(resource.RLIMIT_AS, (max_bytes, hard_limit))
+
+def _worker_loop(task_queue, result_queue, batch_size, tesseract_cmd, memory_limit=None):
+    limit_worker_memory(memory_limit)
+    api = tesserocr.PyTessBaseAPI() if tesserocr is not None else None                                                  # loads the language model once per worker
+    running = True
+
+    try:
+        while running:
+            task = task_queue.get()
+            if task is None:
+                break
+
+            # take whatever else is already waiting, up to a full batch
+            batch = [task]
+            while len(batch) < batch_size:
+                try:
+                    task = task_queue.get_nowait()
+                except queue.Empty:
+                    break
+                if task is None:
+                    running = False
+                    break
+                batch.append(task)
+
+            result_queue.put(("claimed", os.getpid(), [task_id for task_id, _, _ in batch]))
+            result_queue.put(("done", os.getpid(), _ocr_batch(batch, api, tesseract_cmd)))
+    finally:
+        if api is not None:
+            api.End()
+
+class TesseractWorkerPool:
+    """
+    Pool of warm tesseract worker processes fed through a queue
+
+    :param num_workers: (int) defaults to the number of cores
+    :param batch_size: (int) max pages a worker OCRs in one tesseract call
+    :param memory_limit: (int) max bytes of memory per worker, None for no limit
+    :param result_timeout: (float) max seconds to wait for a page, None to wait forever
+    """
+    def __init__(self, num_workers=None, batch_size=DEFAULT_BATCH_SIZE, memory_limit=None, result_timeout=DEFAULT_RESULT_TIMEOUT):
+        self.num_workers = num_workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.memory_limit = memory_limit
+        self.result_timeout = result_timeout
+        self.task_queue = mp.Queue()
+        self.result_queue = mp.Queue()
+        self.workers = []
+        self.futures = {}
+        self.claimed = {}                                                                                               # {worker pid: task ids it is reading}
+        self.dead_pids = set()
+        self.lock = threading.Lock()
+        self.next_task_id = 0
+        self.num_pages = 0
+        self.start_time = None
+        self.collector = None
+        self.closing = False
+
+    def _start_worker(self):
+        worker = mp.Process(
+            target=_worker_loop,
+            args=(self.task_queue, self.result_queue, self.batch_size, pytesseract.pytesseract.tesseract_cmd, self.memory_limit),
+            daemon=True
+        )
+        worker.start()
+        return worker
+
+    def start(self):
+        self.start_time = time.perf_counter()
+        self.workers = [self._start_worker() for _ in range(self.num_workers)]
+        self.collector = threading.Thread(target=self._collect_results, daemon=True)
+        self.collector.start()
+        return self
+
+    def _resolve(self, task_id, text, error):
+        with self.lock:
+            future = self.futures.pop(task_id, None)
+            if future is None:                                                                                          # already failed when its worker died
+                return
+            self.num_pages += 1
+
+        if error is None:
+            future.set_result(text)
+        else:
+            future.set_exception(RuntimeError(error))
+
+    def _check_workers(self):
+        """
+        Fails the pages taken by any worker that has died and starts a new worker in its place
+        """
+        if self.closing:
+            return
+
+        for i, worker in enumerate(self.workers):
+            if worker.is_alive():
+                continue
+
+            lost_task_ids = self.claimed.pop(worker.pid, set())
+            logger.error(f"Tesseract worker {worker.pid} exited with code {worker.exitcode}, failing {len(lost_task_ids)} pages")
+            self.dead_pids.add(worker.pid)
+            for task_id in lost_task_ids:
+                self._resolve(task_id, None, f"tesseract worker exited with code {worker.exitcode}")
+
+            self.workers[i] = self._start_worker()
+
+    def _collect_results(self):
+        while True:
+            try:
+                message = self.result_queue.get(timeout=LIVENESS_INTERVAL)
+            except queue.Empty:
+                self._check_workers()
+                continue
+
+            if message is None:
+                break
+            kind, pid, payload = message
+
+            if kind == "claimed" and pid in self.dead_pids:                                                             # the worker died before this arrived
+                for task_id in payload:
+                    self._resolve(task_id, None, "tesseract worker exited")
+            elif kind == "claimed":
+                self.claimed.setdefault(pid, set()).update(payload)
+            else:
+                for task_id, text, error in payload:
+                    self.claimed.get(pid, set()).discard(task_id)
+                    self._resolve(task_id, text, error)
+
+            self._check_workers()
+
+    def submit(self, image, config=""):
+        """
+        Queues an image for OCR
+
+        :param image: PIL image, or an image path so only the path is sent to the worker
+        :param config: (str) extra tesseract arguments
+        :return: Future resolving to the page text
+        """
+        future = Future()
+
+        with self.lock:
+            task_id = self.next_task_id
+            self.next_task_id += 1
+            self.futures[task_id] = future
+
+        self.task_queue.put((task_id, image, config))
+        return future
+
+    def image_to_string(self, image, config=""):
+        """
+        :raises concurrent.futures.TimeoutError: if the page is not read within result_timeout seconds
+        """
+        return self.submit(image, config).result(timeout=self.result_timeout)
+
+    def ocr_images(self, images, config=""):
+        """
+        OCRs every image across the workers
+
+        :param images: list of PIL images
+        :param config: (str)
+        :return: list of page texts in the same order as the images
+        :raises concurrent.futures.TimeoutError: if a page is not read within result_timeout seconds
+        """
+        futures = [self.submit(image, config) for image in images]
+        return [future.result(timeout=self.result_timeout) for future in futures]
+
+    def throughput(self):
+        """
+        :return: (dict) pages OCRed, seconds since the pool started, and pages per second
+        """
+        elapsed = time.perf_counter() - self.start_time if self.start_time else 0.0
+        return {
+            "pages": self.num_pages,
+            "seconds": round(elapsed, 2),
+            "pages_per_second": round(self.num_pages / elapsed, 2) if elapsed else 0.0,
+        }
+
+    def close(self):
+        self.closing = True
+        for _ in self.workers:
+            self.task_queue.put(None)
+        for worker in self.workers:
+            worker.join()
+
+        self.result_queue.put(None)
+        self.collector.join()
+
+        stats = self.throughput()
+        logger.info(f"Tesseract worker pool OCRed {stats['pages']} pages in {stats['seconds']}s ({stats['pages_per_second']} pages/s)")
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,231 @@
+from etl.utils.job_queue import (
+    open_job_queue, enqueue_jobs, claim_job, complete_job, fail_job, queue_status, failed_jobs,
+    JOB_QUEUE_PATH, DEFAULT_LEASE_SECONDS, DEFAULT_MAX_ATTEMPTS
+)
+from etl.utils.manifest import open_manifest, load_manifest, needs_processing, record_processed, MANIFEST_PATH
+from etl.utils.s3_utils import list_s3_objects
+from etl.ocr.text_cache import lookup_source_hash
+from etl.ocr.locator import get_issue_date
+from etl.ocr.workers import TesseractWorkerPool, set_ocr_backend
+from etl.ocr.engine import DEFAULT_WORKER_MEMORY_LIMIT, LOW_MEMORY_ENV
+from etl.schemas.errors import FileParsingError
+from datetime import date
+import multiprocessing as mp
+import importlib
+import argparse
+import logging
+import os
+logger = logging.getLogger()
+
+'''
+Routes every raw Billboard pdf to the processor for the schema that was in print on its issue date, and runs the whole
+archive as one batch: every era goes into the same durable job queue and is worked off by one shared pool of worker
+processes. A processor is a module with extract_to_csv(object_key, etag) returning the output key and PARSER_VERSION.
+With ocr_workers set, each worker reads its pages through its own pool of warm tesseract processes.
+'''
+
+RAW_PREFIX = "raw/billboard/pdf/magazines/"
+
+SCHEMA_ROUTES = [
+    {"schema_id": "bb_1", "start": date(1976, 3, 27), "end": date(1981, 9, 19), "module": "etl.schemas.billboard_magazine_1.processing.process"},
+    {"schema_id": "bb_2", "start": date(1981, 10, 3), "end": date(1984, 10, 13), "module": None},                       # no parser yet
+    {"schema_id": "bb_3", "start": date(1984, 10, 20), "end": date(2001, 7, 21), "module": "etl.schemas.billboard_magazine_3.processing.process"},
+]
+
+def route_issue(raw_key):
+    """
+    :param raw_key: (str) ex. 'raw/billboard/pdf/magazines/1984/11/BB-1984-11-03.pdf'
+    :return: (dict) the schema route for the issue date, None if no schema covers it
+    """
+    issue_date = get_issue_date(raw_key)
+
+    if issue_date is None:
+        return None
+
+    for route in SCHEMA_ROUTES:
+        if route["start"] <= issue_date <= route["end"]:
+            return route
+
+    return None
+
+def get_processor(raw_key):
+    """
+    :return: the processor module for the issue
+    :raises FileParsingError: if no schema with a parser covers the issue date
+    """
+    route = route_issue(raw_key)
+
+    if route is None or route["module"] is None:
+        raise FileParsingError(f"No parser for {raw_key}")
+
+    return importlib.import_module(route["module"])                                                                     # imported on first use, then cached by python
+
+def process_issue(raw_key, etag=None):
+    """
+    :return: the s3 key of the processed csv, None if the issue could not be processed
+    """
+    return get_processor(raw_key).extract_to_csv(raw_key, etag)
+
+def list_archive_issues(prefix=RAW_PREFIX, start=None, end=None, schema_ids=None):
+    """
+    Lists the raw issues that have a parser
+
+    :param prefix: (str) s3 prefix of the raw pdfs
+    :param start: (date) first issue date, None for no limit
+    :param end: (date) last issue date, None for no limit
+    :param schema_ids: list of schema ids to keep, None for every schema
+    :return: list of (raw key, etag) tuples
+    """
+    issues = []
+    num_unsupported = 0
+
+    for raw_key, etag in list_s3_objects(prefix):
+        issue_date = get_issue_date(raw_key)
+        if not raw_key.endswith(".pdf") or issue_date is None:
+            continue
+        if (start and issue_date < start) or (end and issue_date > end):
+            continue
+
+        route = route_issue(raw_key)
+        if route is None or (schema_ids and route["schema_id"] not in schema_ids):
+            continue
+        if route["module"] is None:
+            num_unsupported += 1
+            continue
+
+        issues.append((raw_key, etag))
+
+    if num_unsupported:
+        print(f"Skipping {num_unsupported} issues from schemas without a parser")
+
+    return issues
+
+def select_jobs(issues, manifest_path=MANIFEST_PATH):
+    """
+    Keeps the issues that are new, changed, or were last read by an older version of their parser
+
+    :param issues: list of (raw key, etag) tuples
+    :param manifest_path: (str)
+    :return: list of (raw key, etag, parser version) jobs
+    """
+    manifest_conn = open_manifest(manifest_path)
+    try:
+        manifest = load_manifest(manifest_conn)
+    finally:
+        manifest_conn.close()
+
+    jobs = []
+    for raw_key, etag in issues:
+        parser_version = get_processor(raw_key).PARSER_VERSION
+        if needs_processing(manifest.get(raw_key), etag, parser_version):
+            jobs.append((raw_key, etag, parser_version))
+
+    return jobs
+
+def run_worker(worker_id, queue_path=JOB_QUEUE_PATH, manifest_path=MANIFEST_PATH, lease_seconds=DEFAULT_LEASE_SECONDS, max_attempts=DEFAULT_MAX_ATTEMPTS, extract_fn=process_issue, ocr_workers=0):
+    """
+    Claims and processes jobs until the queue is empty
+
+    :param worker_id: (str)
+    :param queue_path: (str)
+    :param manifest_path: (str)
+    :param lease_seconds: (int)
+    :param max_attempts: (int)
+    :param extract_fn: function taking (raw key, etag) and returning the output key, None on failure
+    :param ocr_workers: (int) tesseract processes kept warm for this worker, 0 starts tesseract for every page
+    :return: (int) number of issues processed by this worker
+    """
+    queue_conn = open_job_queue(queue_path)
+    manifest_conn = open_manifest(manifest_path)
+    num_processed = 0
+    ocr_pool = None
+
+    if ocr_workers:
+        ocr_pool = TesseractWorkerPool(ocr_workers, memory_limit=DEFAULT_WORKER_MEMORY_LIMIT).start()
+        set_ocr_backend(ocr_pool)
+
+    try:
+        while True:
+            job = claim_job(queue_conn, worker_id, lease_seconds, max_attempts)
+            if job is None:
+                break
+
+            raw_key, etag = job["job_key"], job["etag"]
+            print(f"[{worker_id}] Processing {raw_key} (attempt {job['attempts']})")
+
+            try:
+                output_key = extract_fn(raw_key, etag)
+                parser_version = get_processor(raw_key).PARSER_VERSION
+            except Exception as e:
+                logger.error(f"[{worker_id}] {raw_key} failed: {e}")
+                fail_job(queue_conn, raw_key, e, max_attempts)
+                continue
+
+            if output_key is None:
+                fail_job(queue_conn, raw_key, "no output", max_attempts)
+                continue
+
+            record_processed(manifest_conn, raw_key, etag, parser_version, output_key, lookup_source_hash(raw_key, etag))
+            complete_job(queue_conn, raw_key)
+            num_processed += 1
+    finally:
+        queue_conn.close()
+        manifest_conn.close()
+        if ocr_pool is not None:
+            set_ocr_backend(None)
+            ocr_pool.close()
+
+    return num_processed
+
+def run_batch(issues, num_workers=4, queue_path=JOB_QUEUE_PATH, manifest_path=MANIFEST_PATH, lease_seconds=DEFAULT_LEASE_SECONDS, max_attempts=DEFAULT_MAX_ATTEMPTS, ocr_workers=0):
+    """
+    Queues the issues that need processing and processes the queue across one pool of worker processes
+
+    :param issues: list of (raw key, etag) tuples
+    :param num_workers: (int)
+    :param queue_path: (str)
+    :param manifest_path: (str)
+    :param lease_seconds: (int)
+    :param max_attempts: (int)
+    :param ocr_workers: (int) warm tesseract processes per worker, see run_worker
+    :return: (dict) {status: number of jobs} once the workers finish
+    """
+    conn = open_job_queue(queue_path)
+    num_queued = enqueue_jobs(conn, select_jobs(issues, manifest_path))
+    print(f"Queued {num_queued} new, changed or re-parsed issues, queue status: {queue_status(conn)}")
+
+    workers = [
+        mp.Process(target=run_worker, args=(f"worker-{i}", queue_path, manifest_path, lease_seconds, max_attempts, process_issue, ocr_workers))
+        for i in range(num_workers)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    status = queue_status(conn)
+    print(f"Batch finished, queue status: {status}")
+    for raw_key, error in failed_jobs(conn):
+        print(f"Failed: {raw_key}: {error}")
+
+    conn.close()
+    return status
+
+def main():
+    parser = argparse.ArgumentParser(description="Process every raw Billboard issue with the parser for its schema")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--schemas", nargs="+", help="schema ids to process, ex. bb_1 bb_3, defaults to all")
+    parser.add_argument("--lease-seconds", type=int, default=DEFAULT_LEASE_SECONDS)
+    parser.add_argument("--max-attempts", type=int, default=DEFAULT_MAX_ATTEMPTS)
+    parser.add_argument("--ocr-workers", type=int, default=0, help="warm tesseract processes per worker, 0 to start tesseract for every page")
+    parser.add_argument("--low-memory", action="store_true", help="read pages in memory capped OCR workers, see etl.ocr.engine")
+    args = parser.parse_args()
+
+    if args.low_memory:
+        os.environ[LOW_MEMORY_ENV] = "1"                                                                                # inherited by every worker process
+
+    issues = list_archive_issues(schema_ids=args.schemas)
+    run_batch(issues, args.workers, JOB_QUEUE_PATH, MANIFEST_PATH, args.lease_seconds, args.max_attempts, args.ocr_workers)
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,3 @@
-import pdfplumber
 import io
 import re
 from etl.utils.s3_utils import list_s3_files, client
@@ -7,27 +6,24 @@ import pandas as pd
 import csv
 import json
 from Levenshtein import distance as levenshtein_distance
+from etl.ocr.locator import locate_table_page
+from etl.utils.utils import extract_text_ocr
+from etl.ocr.engine import ocr_pdf_low_memory, low_memory_enabled
+from etl.schemas.errors import TourParsingError
+import pytesseract
 
 '''
 This parser is for the Billboard Boxoffice schema that ran from 1976-03-27 to 1981-09-19
 '''
 
-class ParsingError(Exception):
-    """Base class for parsing errors"""
-
-class FileParsingError(ParsingError):
-    """Raised when the entire file should be skipped"""
-
-class TourParsingError(ParsingError):
-    """Raised when just the current tour should be skipped"""
-
-
 pytesseract.pytesseract.tesseract_cmd = r"C:\Users\mquig\AppData\Local\Programs\Tesseract-OCR\tesseract.exe"
 
 directory_prefix = "raw/billboard/pdf/magazines/"
 
 object_key = 'raw/billboard/pdf/magazines/1984/09/BB-1981-09-19.pdf'
 
+PARSER_VERSION = "bb_1-1"                                                                                               # bump when a parser change should re-process every issue
+
 '''
     Every tour has:
     Rank: '2'
@@ -470,112 +466,110 @@ def parse_tours_list(tours_str, venue_size):
     except IndexError as e:
         print(f"Skipping tour due to index error\nTour String: {tour}")
 
-def find_boxoffice_table(pdf, pdf_bytes):
-    found_boxoffice_table = False
-    i = 0
-
-    while not found_boxoffice_table and i < len(pdf.pages):
-        next_page = pdf.pages[i]
-        page_text = next_page.extract_text()
-        if "Top Boxoffice" in page_text:
-            found_boxoffice_table = True
-            page_text = extract_text_ocr(pdf_bytes, i + 1)
-            print("Found top boxoffice with pdfplumber")
-        else:
-            i += 1
-
-    # if pdfplumber could not find the top boxoffice table, try with ocr
-    if not found_boxoffice_table:
-        i = 15  # jump to page 15 because ocr is more intensive and slower
-        while not found_boxoffice_table and i < len(pdf.pages):
-            next_page = extract_text_ocr(pdf_bytes, i)
-            if "Top Boxoffice" in next_page:
-                found_boxoffice_table = True
-                print("Found top boxoffice with ocr")
-            else:
-                i += 1
+def find_boxoffice_table(pdf_bytes, issue_key):
+    '''
+    Finds the page with the Top Boxoffice table. Checks the page index, then the pdf text layer, then low DPI OCR
+    starting from the page predicted by neighbouring issues
+
+    :param pdf_bytes: the raw pdf bytes
+    :param issue_key: the s3 key of the issue
+    :return: (int) the 1-indexed page number, None if the table was not found
+    '''
+    boxoffice_page = locate_table_page(pdf_bytes, issue_key, "billboard_top_boxoffice", ["Top Boxoffice"], default_page=15)
 
     # if boxoffice table is still not found, move on to the next magazine file
-    if not found_boxoffice_table:
+    if boxoffice_page is None:
         print("Could not find top boxoffice table")
-        pass
 
-def extract_to_csv():
+    return boxoffice_page
+
+def extract_to_csv(object_key=object_key, etag=None):
+    '''
+    Extracts the Top Boxoffice tours of one issue and uploads them as a processed csv
+
+    :param object_key: the s3 key of the raw pdf
+    :param etag: the ETag of the raw pdf, unused but accepted so every schema processor has the same signature
+    :return: the s3 key of the processed csv, None if the issue could not be processed
+    '''
     try:
         obj = client.get_object(Bucket=BUCKET_NAME, Key=object_key)
         pdf_bytes = obj['Body'].read()
-        pdf_file = io.BytesIO(pdf_bytes)
 
-        with (pdfplumber.open(pdf_file) as pdf):
-            # loop through every page, see if any of them say "Top Boxoffice"
-            # if not, try again but with OCR
-            # if still not found, log comment and move on to next file
-            #boxoffice_page = find_boxoffice_table(pdf, pdf_bytes)
+        # if the Top Boxoffice table is not found, move on to the next magazine file
+        boxoffice_page = find_boxoffice_table(pdf_bytes, object_key)
+        if boxoffice_page is None:
+            return None
 
-            # magazine two is page 57
-            page_text = extract_text_ocr(pdf_bytes, 35)
+        if low_memory_enabled():
+            page_text = ocr_pdf_low_memory(pdf_bytes, [boxoffice_page], max_workers=1)[boxoffice_page]
+            if page_text is None:
+                return None
+        else:
+            page_text = extract_text_ocr(pdf_bytes, boxoffice_page)
 
-            print(page_text)
+        print(page_text)
 
-            lines = page_text.splitlines()
+        lines = page_text.splitlines()
 
-            extract_raw_tour_lines(lines)
+        extract_raw_tour_lines(lines)
 
-            tour_objs = []                                                                                      # save a list of all normalized tour objects from the current file
-            tour_str = consolidate_tours(lines)                                                                 # create a list of all tours as one line of text
+        tour_objs = []                                                                                      # save a list of all normalized tour objects from the current file
+        tour_str = consolidate_tours(lines)                                                                 # create a list of all tours as one line of text
 
-            if tour_str is None:
-                raise TourParsingError("tour_str is None, cannot parse tours")
+        if tour_str is None:
+            raise TourParsingError("tour_str is None, cannot parse tours")
 
-            print("CREATED TOUR LISTS")
+        print("CREATED TOUR LISTS")
 
-            stadium_tours_str = tour_str["stadiums"]
-            arena_tours_str = tour_str["arenas"]                                                                # get all the arena tour String
-            auditorium_tours_str = tour_str["auditoriums"]                                                      # get all the auditorium tour String
-            print("got each tour list per venue size")
+        stadium_tours_str = tour_str["stadiums"]
+        arena_tours_str = tour_str["arenas"]                                                                # get all the arena tour String
+        auditorium_tours_str = tour_str["auditoriums"]                                                      # get all the auditorium tour String
+        print("got each tour list per venue size")
 
-            stadium_tour_data = parse_tours_list(stadium_tours_str, "stadium")
-            arena_tour_data = parse_tours_list(arena_tours_str, "arena")                          # break each arena tour String down into its normalized parts
-            auditorium_tours_data = parse_tours_list(auditorium_tours_str, "auditorium")          # break each auditorium String down into its normalized parts
+        stadium_tour_data = parse_tours_list(stadium_tours_str, "stadium")
+        arena_tour_data = parse_tours_list(arena_tours_str, "arena")                          # break each arena tour String down into its normalized parts
+        auditorium_tours_data = parse_tours_list(auditorium_tours_str, "auditorium")          # break each auditorium String down into its normalized parts
 
-            for tour in stadium_tour_data:
-                print(tour)
+        for tour in stadium_tour_data:
+            print(tour)
 
-            for tour in arena_tour_data:
-                print(tour)
+        for tour in arena_tour_data:
+            print(tour)
 
-            for tour in auditorium_tours_data:
-                print(tour)
+        for tour in auditorium_tours_data:
+            print(tour)
 
-            all_tours = stadium_tour_data + arena_tour_data + auditorium_tours_data
+        all_tours = stadium_tour_data + arena_tour_data + auditorium_tours_data
         
-            df_all_tours = pd.DataFrame(all_tours)
+        df_all_tours = pd.DataFrame(all_tours)
 
-            file_name = object_key.split('/')[-1]
-            csv_file_name = file_name.replace('.pdf', '.csv')
+        file_name = object_key.split('/')[-1]
+        csv_file_name = file_name.replace('.pdf', '.csv')
 
-            csv_buffer = io.StringIO()
-            df_all_tours.to_csv(csv_buffer, index=False)
+        csv_buffer = io.StringIO()
+        df_all_tours.to_csv(csv_buffer, index=False)
 
-            year = object_key.split('/')[4]
-            month = object_key.split('/')[5]
+        year = object_key.split('/')[4]
+        month = object_key.split('/')[5]
+        output_key = f"processed/billboard/magazines/{year}/{month}/" + csv_file_name
 
-            try:
-                client.put_object(
-                    Bucket="music-industry-data-lake",
-                    Key=f"processed/billboard/magazines/{year}/{month}/" + csv_file_name,
-                    Body=csv_buffer.getvalue(),
-                )
-                print("Saved all tours report")
-            except Exception as e:
-                print(f"Error uploading file: {e}")
+        try:
+            client.put_object(
+                Bucket="music-industry-data-lake",
+                Key=output_key,
+                Body=csv_buffer.getvalue(),
+            )
+            print("Saved all tours report")
+            return output_key
+        except Exception as e:
+            print(f"Error uploading file: {e}")
 
     except client.exceptions.NoSuchKey:
         print(f"Error: Object '{object_key}' not found in bucket '{BUCKET_NAME}'")
-        exit()
     except Exception as e:
         print(f"Error retrieving object: {e}")
-        exit()
+
+    return None
 
 def test():
     try:
@@ -1,17 +1,9 @@
+import pytesseract
+
 '''
 This parser is for the Billboard Boxscore that ran from 1981-10-03 to 1984-10-13
 '''
 
-class ParsingError(Exception):
-    """Base class for parsing errors"""
-
-class FileParsingError(ParsingError):
-    """Raised when the entire file should be skipped"""
-
-class TourParsingError(ParsingError):
-    """Raised when just the current tour should be skipped"""
-
-
 pytesseract.pytesseract.tesseract_cmd = r"C:\Users\mquig\AppData\Local\Programs\Tesseract-OCR\tesseract.exe"
 
 directory_prefix = "raw/billboard/pdf/magazines/"
@@ -1,17 +1,19 @@
 from etl.dimensions.artists_csv import update_artists_dim_csv
 from etl.dimensions.artists_utils import get_artist_ids, get_artist_name, get_first_artist_name_by_id
-from etl.utils.utils import load_artist_corrections
+from etl.utils.reference_data import get_reference_data
+from etl.utils.tracing import get_tracer, trace
+import logging
 import slugify
-import ast
 import re
 
+tracer = get_tracer(__name__)
+
 def identify_first_artist_line(processed_events_df):
     """
     Adds a new column to the dataframe with the first string from the raw artists list
 
     :param processed_events_df (dataframe)
     """
-    processed_events_df["artists"] = processed_events_df["artists"].apply(ast.literal_eval)                             # convert artist list from string to list
     processed_events_df["first_artist_line"] = processed_events_df["artists"].apply(                                    # add first artist string to its own column
         lambda artists: artists[0] if artists else None
     )
@@ -83,7 +85,7 @@ def merge_artists(raw_artist_strings, has_event_name):
                 merged_artists.append(clean_artist_name(merged_artist, has_event_name))                                 # add the merged token to the result list
                 i += 2                                                                                                  # skip next token
             else:
-                print(f"Overflow signal detected but no token after {raw_artist_strings[i]}")
+                trace(tracer, logging.WARNING, "overflow_signal_without_next_token", token=raw_artist_strings[i])
                 i += 1
         else:
             merged_artists.append(clean_artist_name(token, has_event_name))                                             # if no signal, just add token to list
@@ -169,7 +171,7 @@ def validate_artist(artist, dim_artists):
     """
     if not is_plausible_artist(artist):
         return None
-    artist_corrections_dict = load_artist_corrections()
+    artist_corrections_dict = get_reference_data("artist_corrections")
     candidates = generate_artist_candidates(artist)  # generate potential candidates from the string
     best_candidate = None
     best_score = 0
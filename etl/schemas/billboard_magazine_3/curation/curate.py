@@ -1,15 +1,16 @@
 import ast
 import logging
 import pandas as pd
-logger = logging.getLogger()
 from etl.dimensions.artists_utils import get_artist_name
 from etl.schemas.billboard_magazine_3.curation.artists import curate_artists, identify_first_artist_line
 from etl.schemas.billboard_magazine_3.curation.dates import identify_start_date, curate_dates
 from etl.schemas.billboard_magazine_3.curation.promoters import curate_promoters
 from etl.schemas.billboard_magazine_3.curation.location import identify_venue_name, curate_locations
 from etl.schemas.billboard_magazine_3.curation.special_event import curate_event_name
-from etl.utils.utils import load_corrections_table, get_source_id, parse_ocr_int
+from etl.utils.utils import load_corrections_table, parse_ocr_int
+from etl.utils.reference_data import get_source_id
 from etl.dimensions.location_utils import get_venue_name
+from etl.utils.tracing import get_tracer, trace
 import slugify
 from config.config import STORAGE_MODE, STORAGE_FORMAT, BUCKET_NAME
 from config.paths import S3_EVENT_CORRECTIONS_PATH, LOCAL_CORRECTION_TABLES_DIR
@@ -19,6 +20,7 @@ import os
 import boto3
 
 s3 = boto3.client("s3")
+tracer = get_tracer(__name__)
 
 '''
 This curation script is for the Billboard Boxscore schema that ran from 1984-10-20 to 2001-07-21
@@ -71,7 +73,7 @@ def validate_ticket_price(ticket_price):
             return False
 
     if bool(re.search(r'\d{2,},{3.}', ticket_price)):
-        print("Failed regex")
+        trace(tracer, logging.DEBUG, "ticket_price_rejected", ticket_price=ticket_price)
         return False
 
     return True
@@ -83,7 +85,7 @@ def curate_ticket_price(ticket_price):
             curated_ticket_price = float(cleaned_ticket_price)
             return curated_ticket_price
         except ValueError as e:
-            print(f"Error {e} curating ticket price: {cleaned_ticket_price}")
+            trace(tracer, logging.WARNING, "ticket_price_not_numeric", ticket_price=cleaned_ticket_price, error=str(e))
             return None
     else:
         return None
@@ -138,7 +140,7 @@ def normalize_event_or_artists(row, dimension_tables):
     artist_ids = row["artist_ids"]
 
     if len(artist_ids) > 0:
-        print(artist_ids[0])
+        trace(tracer, logging.DEBUG, "signature_first_artist", artist_id=artist_ids[0])
         return slugify.slugify(get_artist_name(artist_ids[0], dimension_tables["artists"]))
 
     return None
@@ -196,10 +198,9 @@ def implement_corrections(processed_events_df):
 
             try:
                 processed_events_df.at[row_idx, field] = true_value                                                     # implement the correction into the dataframe
-                print(f'Corrected {raw_value}: {true_value}')
+                trace(tracer, logging.INFO, "correction_applied", signature=event_signature, field=field, true_value=true_value)
             except ValueError as e:
-                print(e)
-                print(f"Could not correct {field} to {true_value}")
+                trace(tracer, logging.WARNING, "correction_failed", signature=event_signature, field=field, true_value=true_value, error=str(e))
 
 def curate_meta_data(processed_events_df, curated_events_df):
     """
@@ -227,7 +228,7 @@ def validate_numeric_column(df, col_name):
         if df[col_name].dropna().ge(0).all():                                                                           # verify all financial values are all greater than 0
             return True
     except TypeError as e:
-        print(f"Error: {e} for {df[col_name]}")
+        trace(tracer, logging.WARNING, "numeric_column_invalid", column=col_name, error=str(e))
         return False
 
 def curate_numeric_fields(processed_events_df, curated_events_df):
@@ -261,19 +262,17 @@ def write_curated_events(events_df, s3_client=None, processed_path=None):
 def curate_events(processed_events_df, path, dimension_tables, s3_client=None):
     """
 
-    :param processed_events_df:
+    :param processed_events_df: from etl.utils.processed.read_processed_events, with the list columns as python lists
     :param path
     :param dimension_tables:
     :param s3_client:
     """
-    print(f"Curating {path} ...")
+    trace(tracer, logging.INFO, "curating", path=path)
     curated_events_df = pd.DataFrame()
 
     identify_venue_name(processed_events_df, dimension_tables)
     identify_first_artist_line(processed_events_df)
     identify_start_date(processed_events_df, path)
-    processed_events_df["promoter"] = processed_events_df["promoter"].apply(ast.literal_eval)
-    processed_events_df["ticket_prices"] = processed_events_df["ticket_prices"].apply(ast.literal_eval)
 
     for col in ["promoter", "ticket_prices", "artists", "dates"]:
         if col in processed_events_df.columns:
@@ -292,6 +291,6 @@ def curate_events(processed_events_df, path, dimension_tables, s3_client=None):
     curate_num_sellouts(processed_events_df, curated_events_df)
     curate_ticket_prices(processed_events_df, curated_events_df)
     curate_meta_data(processed_events_df, curated_events_df)
-    print(f"Finished curating {path}")
+    trace(tracer, logging.INFO, "curated", path=path, events=len(curated_events_df))
 
     write_curated_events(curated_events_df, s3_client=s3_client, processed_path=path)
\ No newline at end of file
@@ -1,6 +1,9 @@
+from etl.utils.tracing import get_tracer, trace
 from datetime import date
+import logging
 import re
-import ast
+
+tracer = get_tracer(__name__)
 
 MONTH_MAP = {
     "Jan": 1, "Feb": 2, "March": 3, "Apr": 4,
@@ -24,7 +27,6 @@ def identify_start_date(processed_events_df, object_key):
     :param processed_events_df:
     :param object_key: the key of the processed csv file (partitioned by year/month)
     '''
-    processed_events_df["dates"] = processed_events_df["dates"].apply(ast.literal_eval)                                                  # convert dates string to array of strings                                                                         # get issue year from S3 uri
     issue_year = get_issue_year(object_key)
     issue_month = get_issue_month(object_key)
 
@@ -60,7 +62,7 @@ def clean_stray_numbers(dates):
                 if date_item.isdigit() and last_day_seen and date_item <= last_day_seen:
                     continue
                 elif date_item.isdigit() and 1 <= int(date_item) <= 31:
-                    print(f"{date_item} in valid days")
+                    trace(tracer, logging.DEBUG, "valid_day", date_item=date_item)
                     clean_date_items.append(date_item)
                     last_day_seen = date_item
                 elif '-' in date_item:
@@ -125,7 +127,7 @@ def curate_date(dates, issue_year, issue_month):
     :return: start_date (date), end_date (date), total_dates (string)
     '''
     total_dates = clean_dates(dates)
-    print(total_dates)
+    trace(tracer, logging.DEBUG, "cleaned_dates", total_dates=total_dates)
 
     # Schema 1: 'Oct 7'
     m = re.fullmatch(r"([A-Za-z]+)[.,]? (\d+)", total_dates)
@@ -139,7 +141,7 @@ def curate_date(dates, issue_year, issue_month):
     # Schema 2: 'Sept 20-27'
     m = re.fullmatch(r"([A-Za-z]+)[.,]? (\d+)-?\s?(\d+)", total_dates)
     if m:
-        print("MATCHED SCHEMA 2")
+        trace(tracer, logging.DEBUG, "date_schema_matched", schema=2, total_dates=total_dates)
         m, d1, d2 = m.groups()
         event_month = MONTH_MAP[m]
         event_year = determine_event_year(issue_year, issue_month, event_month)
@@ -162,7 +164,7 @@ def curate_date(dates, issue_year, issue_month):
     # Schema 4:
     m = re.fullmatch(r"([A-Za-z]+)[.,]? (\d+)-(\d+)/?(\d+)-(\d+)/?([A-Za-z]+)[.,]? (\d+)-(\d+)", total_dates)
     if m:
-        print(f"{total_dates} matched Schema 4!")
+        trace(tracer, logging.DEBUG, "date_schema_matched", schema=4, total_dates=total_dates)
         m1, start_day, e1, e2, e3, m2, e4, end_day = m.groups()
         event_month = MONTH_MAP[m1]
         event_year = determine_event_year(issue_year, issue_month, event_month)
@@ -186,7 +188,7 @@ def curate_date(dates, issue_year, issue_month):
     # Case 6: ['Nov. 4-5,7-9', '11-12']
     m = re.fullmatch(r"([A-Za-z]+)[.,]? (\d+)(-\d+)?,?\s?(\d+)(-\d+)?,?\s?(\d+)(-\d+)?", total_dates)
     if m:
-        print("MATCHED SCHEMA 6")
+        trace(tracer, logging.DEBUG, "date_schema_matched", schema=6, total_dates=total_dates)
         m, d1, d2, d3, d4, d5, d6 = m.groups()
         event_month = MONTH_MAP[m]
         event_year = determine_event_year(issue_year, issue_month, event_month)
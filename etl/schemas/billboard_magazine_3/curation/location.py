@@ -1,27 +1,64 @@
-from etl.data_cleaning.normalization import build_reverse_map
+from etl.schemas.billboard_magazine_3.curation.location_lexicon import get_location_lexicon
 import slugify
-from config.paths import LOCATION_ALIASES_PATH
-from etl.utils.utils import load_json
-from Levenshtein import distance as levenshtein_distance
 from etl.dimensions.location_csv import append_venue_csv, append_city_csv
-import ast
-import re
+from etl.dimensions.location_utils import get_city_trie
+from etl.utils.phrase_trie import find_phrases, tag_phrases, slug_pieces
+from etl.utils.fuzzy_index import find_within
+from etl.utils.utils import get_fuzzy_index
+from etl.utils.tracing import get_tracer, trace
+import logging
 
 EDUCATIONAL_TOKENS = {"univ", "unwv", "unv"}
 
-LOCATION_ALIASES = load_json(LOCATION_ALIASES_PATH)
+tracer = get_tracer(__name__)
 
-VENUE_TYPES_MAP = build_reverse_map(LOCATION_ALIASES["venue_types"])
-CITY_ALIAS_MAP = build_reverse_map(LOCATION_ALIASES["cities"])
-STATE_ALIAS_MAP = LOCATION_ALIASES["states"]
+def find_city_spans(location_tokens, dim_cities, max_tokens=None):
+    """
+    Finds every run of tokens whose slug is a city slug in dim_cities, in one pass over the tokens
+
+    :param location_tokens: (list)
+    :param dim_cities: (dict)
+    :param max_tokens: (int) longest run of tokens to consider, defaults to no limit
+    :return: list of (start, end, city_slug), end exclusive, ordered by start then end
+    """
+    token_pieces = [slug_pieces(token) for token in location_tokens]
+    return tag_phrases(get_city_trie(dim_cities), token_pieces, max_tokens)
+
+def tag_location_tokens(location_tokens, dim_cities=None, lexicon=None):
+    """
+    Annotates the location tokens with every venue type, state alias, city alias and, when dim_cities is given, known
+    city they hold, ex. ['Civic', 'Center', 'Las', 'Vegas'] -> [(1, 2, 'venue_type', 'center'), (2, 4, 'city', 'las-vegas')]
 
-def find_venue_type_idx(location_tokens):
+    :param location_tokens: (list)
+    :param dim_cities: (dict) defaults to not tagging known cities
+    :param lexicon: LocationLexicon, defaults to the one built from location_aliases.json
+    :return: list of (start, end, kind, value), kind being 'venue_type', 'state', 'city_alias' or 'city'
+    """
+    if lexicon is None:
+        lexicon = get_location_lexicon()
+    lowered_tokens = [(token.lower(),) for token in location_tokens]
+    spans = [
+        (start, end, kind, value)
+        for start, end, values in tag_phrases(lexicon.phrase_trie, lowered_tokens)
+        for kind, value in values.items()
+    ]
+
+    if dim_cities is not None:
+        spans.extend((start, end, "city", city_slug) for start, end, city_slug in find_city_spans(location_tokens, dim_cities))
+        spans.sort(key=lambda span: (span[0], span[1]))
+
+    return spans
+
+def find_venue_type_idx(location_tokens, lexicon=None):
     """
     Finds the index of the venue type
     :param location_tokens: list, each string of the location
+    :param lexicon: LocationLexicon, defaults to the one built from location_aliases.json
     :return: int, the index of the venue_type
     """
-    venue_types = build_reverse_map(VENUE_TYPES_MAP)
+    if lexicon is None:
+        lexicon = get_location_lexicon()
+    venue_types = lexicon.venue_types
 
     for i, token in enumerate(location_tokens):
         if token.lower() in venue_types:
@@ -29,13 +66,16 @@ def find_venue_type_idx(location_tokens):
 
     return None
 
-def clean_location(location_tokens):
+def clean_location(location_tokens, lexicon=None):
     """
     Filter out tokens that match strings prevalent in other fields like promoter, artists, etc...
     :param location_tokens: (list) the normalized location tokens
+    :param lexicon: LocationLexicon, defaults to the one built from location_aliases.json
     :return: clean_tokens (list), the filtered tokens that did not match noise strings
     """
-    venue_types = build_reverse_map(VENUE_TYPES_MAP)
+    if lexicon is None:
+        lexicon = get_location_lexicon()
+    venue_types = lexicon.venue_types
     NOISE = {"productions", "promotions", "presents", "presentations", "prods", "concerts", "inc", "jam"
              "sellout", "sellouts", "associates", "attractions"}
     clean_tokens = []
@@ -53,7 +93,7 @@ def clean_location(location_tokens):
 
         if token.lower() in venue_types:
             clean_tokens.append(venue_types[lowered].title())
-            print(f"Changes token to {venue_types[lowered]}")
+            trace(tracer, logging.DEBUG, "venue_type_normalized", token=token, venue_type=venue_types[lowered])
         else:
             clean_tokens.append(token.title())
     return clean_tokens
@@ -72,16 +112,17 @@ def normalize_location_tokens(location_tokens):
 
     return normalized
 
-def match_city_after_venue(location_tokens, state_id, dim_cities):
+def match_city_after_venue(location_tokens, state_id, dim_cities, lexicon=None):
     """
     See if an existing city can be found after the venue name
 
     :param location_tokens (list)
     :param state_id (int)
     :param dim_cities (dict)
+    :param lexicon: LocationLexicon, defaults to the one built from location_aliases.json
     :return: city_id (int), city_name (str), city_index (int)
     """
-    venue_type_idx = find_venue_type_idx(location_tokens)
+    venue_type_idx = find_venue_type_idx(location_tokens, lexicon)
 
     if venue_type_idx is None:
         return None, None, None
@@ -95,62 +136,60 @@ def match_city_after_venue(location_tokens, state_id, dim_cities):
     num_tokens = len(post_venue_tokens)
     difference = len(location_tokens) - num_tokens
 
+    city_trie = get_city_trie(dim_cities)
+    token_pieces = [slug_pieces(token) for token in post_venue_tokens]
+
     if state_id:
-        # start by checking for exact matches by (venue-slug, state_id) key
+        # start by checking for exact matches by (venue-slug, state_id) key, the longest city at the first start wins
         for start in range(num_tokens):
-            for end in range(num_tokens, start, -1):
-                candidate_city_name = " ".join(post_venue_tokens[start:end]).lower()
-                candidate_slug = slugify.slugify(candidate_city_name)
-                candidate_key = (candidate_slug, state_id)
-                if candidate_key in dim_cities_by_key:
-                    city_id = int(dim_cities_by_key[candidate_key]["id"])                                               # get the existing city id
-                    city_name = dim_cities_by_key[candidate_key]["name"]
-                    city_index = start+difference                                                                       # get the index of the first word in the city
-                    return city_id, city_name, city_index
+            candidate_keys = [(candidate_slug, state_id) for end, candidate_slug in find_phrases(city_trie, token_pieces, start)]
+            candidate_keys = [candidate_key for candidate_key in candidate_keys if candidate_key in dim_cities_by_key]
+            if candidate_keys:
+                city_id = int(dim_cities_by_key[candidate_keys[-1]]["id"])                                              # get the existing city id
+                city_name = dim_cities_by_key[candidate_keys[-1]]["name"]
+                city_index = start+difference                                                                           # get the index of the first word in the city
+                return city_id, city_name, city_index
 
         # if no exact match, filter down to venues in the same state, and check against venue names in case of typos in venue name
+        city_name_index = get_fuzzy_index(dim_cities, "lowered_name", "by_state", state_id)
         for start in range(num_tokens):
             for end in range(num_tokens, start, -1):
                 candidate_city_name = " ".join(post_venue_tokens[start:end]).lower()
-                cities_with_matching_state = [
-                    city
-                    for cities in dim_cities_by_slug.values()
-                    for city in cities
-                    if int(city["state_id"]) == state_id
-                ]
-
-                if cities_with_matching_state:
-                    for city in cities_with_matching_state:
-                        if len(city["name"]) >= 5 and levenshtein_distance(city["name"].lower(), candidate_city_name) <= 2:
-                            city_id = int(city["id"])
-                            city_name = city["name"]
-                            city_index = start+difference
-                            return city_id, city_name, city_index
-    else:
-        for start in range(num_tokens):
-            for end in range(num_tokens, start, -1):
-                candidate_city_name = " ".join(post_venue_tokens[start:end]).lower()
-                candidate_slug = slugify.slugify(candidate_city_name)
+                matching_cities = [city for order, distance, name, city in find_within(city_name_index, candidate_city_name, 2) if len(city["name"]) >= 5]
 
-                # if no state id, check for a unique city with the same name ("Springfield", "Arlington", etc... are common, get ignored)
-                city_name_matches = dim_cities_by_slug.get(candidate_slug, [])
-                if len(city_name_matches) == 1:
-                    city_id = int(city_name_matches[0]["id"])
-                    city_name = city_name_matches[0]["name"]
+                if matching_cities:
+                    city_id = int(matching_cities[0]["id"])                                                             # first city of the state within 2 edits
+                    city_name = matching_cities[0]["name"]
                     city_index = start+difference
                     return city_id, city_name, city_index
+    else:
+        for start in range(num_tokens):
+            # if no state id, check for a unique city with the same name ("Springfield", "Arlington", etc... are common, get ignored)
+            candidate_slugs = [
+                candidate_slug
+                for end, candidate_slug in find_phrases(city_trie, token_pieces, start)
+                if len(dim_cities_by_slug[candidate_slug]) == 1
+            ]
+            if candidate_slugs:
+                city_id = int(dim_cities_by_slug[candidate_slugs[-1]][0]["id"])
+                city_name = dim_cities_by_slug[candidate_slugs[-1]][0]["name"]
+                city_index = start+difference
+                return city_id, city_name, city_index
 
     return None, None, None
 
-def find_city_candidate(location_tokens):
+def find_city_candidate(location_tokens, lexicon=None):
     '''
     Find a potential new city that is not already stored in dim_cities
 
     :param location_tokens (list)
+    :param lexicon: LocationLexicon, defaults to the one built from location_aliases.json
     :return: city_candidate (str), venue_idx (int)
     '''
+    if lexicon is None:
+        lexicon = get_location_lexicon()
     city_candidate = venue_idx = None
-    reverse_venue_map = build_reverse_map(VENUE_TYPES_MAP)
+    reverse_venue_map = lexicon.venue_types
 
     for index, word in reversed(list(enumerate(location_tokens))):
         clean_word = word.lower()
@@ -162,15 +201,18 @@ def find_city_candidate(location_tokens):
 
     return city_candidate, venue_idx
 
-def match_state_after_venue(location_tokens):
+def match_state_after_venue(location_tokens, lexicon=None):
     '''
     Searches for a state from the end of the location tokens until it finds a venue type like 'hall' or 'auditorium'
 
     :param location_tokens: each remaining word in the location data broken into separate strings
+    :param lexicon: LocationLexicon, defaults to the one built from location_aliases.json
     :return: state_id, location_tokens
     '''
-    state_aliases = build_reverse_map(STATE_ALIAS_MAP)
-    venue_patterns = build_reverse_map(VENUE_TYPES_MAP)
+    if lexicon is None:
+        lexicon = get_location_lexicon()
+    state_aliases = lexicon.state_aliases
+    venue_patterns = lexicon.venue_types
     state_id = None
 
     # loop through each in the rest of the location strings
@@ -185,16 +227,19 @@ def match_state_after_venue(location_tokens):
 
     return state_id, location_tokens
 
-def match_state_in_venue(location_tokens):
+def match_state_in_venue(location_tokens, lexicon=None):
     '''
     Checks if any of the location tokens contain a state alias. Only records state if it is in bracket, parentheses, etc like
     'Charlotte (N.C.) Coliseum'
     Will not extract state name like 'Ohio Center' because many venues have states in their name but are not actually located in the given state
 
     :param location_tokens (list)
+    :param lexicon: LocationLexicon, defaults to the one built from location_aliases.json
     :return: state_id (int), location_tokens (list)
     '''
-    state_aliases = build_reverse_map(STATE_ALIAS_MAP)
+    if lexicon is None:
+        lexicon = get_location_lexicon()
+    state_aliases = lexicon.state_aliases
     state_id = None
     state_chars = set("(){}")                                                                                           # state will usually be surrounded by parentheses
     remove_chars = "(){}."
@@ -231,48 +276,47 @@ def match_city_in_venue(location_tokens, dim_cities, state_id):
     city_id = None
     dim_cities_by_key = dim_cities["by_key"]
     dim_cities_by_slug = dim_cities["by_slug"]
+    city_spans = find_city_spans(location_tokens, dim_cities, max_tokens=3)
 
     if state_id:
-        cities_with_matching_state = [
-            city
-            for cities in dim_cities_by_slug.values()
-            for city in cities
-            if int(city["state_id"]) == state_id
-        ]
-        #print(cities_with_matching_state)
-
-        for i in range(len(location_tokens)):
-            # check all combinations of words from left to right length 1 to 3 to see if any of them are in the existing city slugs
-            for window_size in range(1, 4):
-                candidate_slug = slugify.slugify(" ".join(location_tokens[i:i + window_size]).lower())
-                candidate_key = (candidate_slug, state_id)
-
-                if candidate_key in dim_cities_by_key:
-                    city_id = int(dim_cities_by_key[candidate_key]["id"])
-                    break
+        # check all combinations of words from left to right length 1 to 3 to see if any of them are in the existing city slugs
+        first_city_by_start = {}
+        for start, end, candidate_slug in city_spans:
+            if (candidate_slug, state_id) in dim_cities_by_key:
+                first_city_by_start.setdefault(start, candidate_slug)
+        if first_city_by_start:
+            city_id = int(dim_cities_by_key[(first_city_by_start[max(first_city_by_start)], state_id)]["id"])
 
         if not city_id:
             #print(f"City id is none, checking for cities in same state")
-            for city in cities_with_matching_state:
-                print(city)
-                for i in range(len(location_tokens)):
-                    for window_size in range(1, 4):
-                        candidate_slug = slugify.slugify(" ".join(location_tokens[i:i + window_size]).lower())
-                        #print(f"{city['slug']} vs candidate: {levenshtein_distance(city['slug'], candidate_slug)}")
-                        if len(candidate_slug) > 7 and levenshtein_distance(city["slug"], candidate_slug) <= 2:
-                            city_id = int(city["id"])
-                            return city_id
+            # the slug of every window of 1 to 3 words is its tokens' slug pieces joined by '-'
+            token_pieces = [slug_pieces(token) for token in location_tokens]
+            candidate_slugs = [
+                "-".join(piece for token in token_pieces[i:i + window_size] for piece in token)
+                for i in range(len(location_tokens))
+                for window_size in range(1, 4)
+            ]
+            city_slug_index = get_fuzzy_index(dim_cities, "slug", "by_state", state_id)
+            matching_cities = [
+                match
+                for candidate_slug in candidate_slugs if len(candidate_slug) > 7
+                for match in find_within(city_slug_index, candidate_slug, 2)
+            ]
+            if matching_cities:
+                order, distance, city_slug, city = min(matching_cities, key=lambda match: match[0])                     # first city of the state within 2 edits of any window
+                trace(tracer, logging.DEBUG, "fuzzy_city_matched", city=city, distance=distance)
+                city_id = int(city["id"])
+                return city_id
 
     # if state_id is not present, only match if there is only one instance of the given slug in dim cities (ex. "Las Vegas", "Los Angeles", "Honolulu")
-    for i in range(len(location_tokens)):
-        # check all combinations of words from left to right length 1 to 3 to see if any of them are in the existing city slugs
-        for window_size in range(1, 4):
-            candidate_slug = slugify.slugify(" ".join(location_tokens[i:i+window_size]).lower())
-
-            if candidate_slug in dim_cities_by_slug and len(dim_cities_by_slug[candidate_slug]) == 1:
-                print(dim_cities_by_slug[candidate_slug])
-                city_id = int(dim_cities_by_slug[candidate_slug][0]["id"])
-                break
+    first_city_by_start = {}
+    for start, end, candidate_slug in city_spans:
+        if len(dim_cities_by_slug[candidate_slug]) == 1:
+            first_city_by_start.setdefault(start, candidate_slug)
+    if first_city_by_start:
+        candidate_slug = first_city_by_start[max(first_city_by_start)]
+        trace(tracer, logging.DEBUG, "city_slug_matched", city=dim_cities_by_slug[candidate_slug][0])
+        city_id = int(dim_cities_by_slug[candidate_slug][0]["id"])
 
     return city_id
 
@@ -284,17 +328,13 @@ def potential_city_match_in_venue(location_tokens, dim_cities):
     :return: the name of the matching city
     '''
     city_name = None
-    dim_cities_by_slug = dim_cities["by_slug"]
-
-    for i in range(len(location_tokens)):
-        # check all combinations of words from left to right length 1 to 3 to see if any of them are in the existing city slugs
-        for window_size in range(1, 4):
-            next_candidate = " ".join(location_tokens[i:i + window_size])
-            candidate_slug = slugify.slugify(next_candidate.lower())
 
-            if candidate_slug in dim_cities_by_slug:
-                city_name = next_candidate
-                break
+    # check all combinations of words from left to right length 1 to 3 to see if any of them are in the existing city slugs, the shortest at the last start wins
+    city_spans = find_city_spans(location_tokens, dim_cities, max_tokens=3)
+    if city_spans:
+        last_start = city_spans[-1][0]
+        first_end = next(end for start, end, candidate_slug in city_spans if start == last_start)
+        city_name = " ".join(location_tokens[last_start:first_end])
 
     return city_name
 
@@ -316,21 +356,20 @@ def match_existing_venues(venue_name, dim_venues, city_id, city_name, dim_cities
     if venue_slug not in existing_venues_by_slug:
         # if there are no venues with the same name, check for typos
         if city_id is not None and city_id != -1:                                                                       # if the city_if known, get all venues in that city
-            venues_with_matching_city = [
-                venue
-                for venues in existing_venues_by_slug.values()
-                for venue in venues
-                if int(venue["city_id"]) == city_id
-            ]
+            venues_with_matching_city = dim_venues["by_city"].get(city_id, [])
             if not venues_with_matching_city:
-                print(f"No existing venues with city id {city_id}")
+                trace(tracer, logging.DEBUG, "no_venues_in_city", city_id=city_id)
                 return None, None
             else:
-                for existing_venue in venues_with_matching_city:
-                    if len(venue_name) > 7 and levenshtein_distance(existing_venue["name"], venue_name) <= 2:
-                        venue_slug = existing_venue["slug"]
-                        venue_name = existing_venue["name"]
-                        continue
+                # each venue of the city within 2 edits of the name replaces it, later venues are compared with the replaced name
+                venue_name_index = get_fuzzy_index(dim_venues, "name", "by_city", city_id)
+                last_order = -1
+                while len(venue_name) > 7:
+                    later_matches = [match for match in find_within(venue_name_index, venue_name, 2) if match[0] > last_order]
+                    if not later_matches:
+                        break
+                    last_order, distance, venue_name, existing_venue = later_matches[0]
+                    venue_slug = existing_venue["slug"]
                 if venue_slug not in existing_venues_by_slug:
                     return None, None
         else:
@@ -340,10 +379,9 @@ def match_existing_venues(venue_name, dim_venues, city_id, city_name, dim_cities
     venue_id = candidate_city_id = None
     candidates = existing_venues_by_slug[venue_slug]                                                                    # get all existing venues that match incoming venue name
 
-    print(candidates)
+    trace(tracer, logging.DEBUG, "venue_candidates", venue_slug=venue_slug, candidates=len(candidates))
 
     for candidate in candidates:
-        print(candidate)
         candidate_city_id = int(candidate["city_id"])                                                                   # get the existing venues id
         candidate_city_name = existing_cities_by_id[int(candidate_city_id)]["name"]                                     # get the existing venues name
 
@@ -352,7 +390,7 @@ def match_existing_venues(venue_name, dim_venues, city_id, city_name, dim_cities
             venue_name = candidate["name"]
             break
         if city_id == candidate_city_id:
-            print(f"Candidate {candidate_city_id} has the same city_id")
+            trace(tracer, logging.DEBUG, "venue_candidate_matched", venue_id=candidate["id"], city_id=candidate_city_id)
             venue_id = int(candidate["id"])
             venue_name = candidate["name"]
             break
@@ -361,24 +399,26 @@ def match_existing_venues(venue_name, dim_venues, city_id, city_name, dim_cities
             venue_name = candidate["name"]
             break
         else:
-            print(f"Candidate {candidate} does not have matching city id or city name")
+            trace(tracer, logging.DEBUG, "venue_candidate_rejected", venue_id=candidate["id"], city_id=candidate_city_id)
 
-    print(f"Returning after checking candidates, venue_id = {venue_id}, venue_name = {venue_name}")
+    trace(tracer, logging.DEBUG, "venue_matched", venue_id=venue_id, venue_name=venue_name)
     return venue_id, venue_name
 
 def looks_like_educational_institution(location_tokens):
     return any(educational_tokens in location_tokens for educational_tokens in EDUCATIONAL_TOKENS)
 
-def isolate_venue_name(location_tokens):
+def isolate_venue_name(location_tokens, lexicon=None):
     """
     Checks for a type on the venue type. Last word of venue is usually Hall, Auditorium, Center, etc... so it uses
     venue_patterns to see if there is the venue type matches any of the common typos and corrects it
 
     :param location_tokens: the remaining location tokens, only the name of the venue should be left
+    :param lexicon: LocationLexicon, defaults to the one built from location_aliases.json
     :return: the updated location tokens
     """
-
-    venue_types = build_reverse_map(VENUE_TYPES_MAP)             # import the map of common venue typos to their corrected version
+    if lexicon is None:
+        lexicon = get_location_lexicon()
+    venue_types = lexicon.venue_types                                                                                   # the map of common venue typos to their corrected version
     venue_tokens = None
     reverse_furthest_keyword_idx = None
     found_venue_type = False
@@ -402,50 +442,57 @@ def isolate_venue_name(location_tokens):
 
     return venue_tokens
 
-def correct_location_typos(location_tokens):
+def correct_location_typos(location_tokens, lexicon=None):
+    if lexicon is None:
+        lexicon = get_location_lexicon()
     corrected_tokens = []
 
     for token in location_tokens:
         lowered = token.lower()
         corrected = token
 
-        for misspelled_city, correct_city in CITY_ALIAS_MAP.items():
-            pattern = rf"\b{re.escape(misspelled_city)}\b"
-            if re.search(pattern, lowered):
-                corrected = re.sub(pattern, correct_city.title(), corrected, flags=re.IGNORECASE)
+        if lexicon.city_alias_prefilter is None or not lexicon.city_alias_prefilter.search(lowered):                    # one search for the tokens that hold no misspelling
+            corrected_tokens.append(corrected)
+            continue
+
+        for pattern, ignorecase_pattern, correct_city in lexicon.city_alias_patterns:
+            if pattern.search(lowered):
+                corrected = ignorecase_pattern.sub(correct_city, corrected)
 
         corrected_tokens.append(corrected)
 
     return corrected_tokens
 
-def identify_venue_name(processed_events_df, dimension_tables):
+def identify_venue_name(processed_events_df, dimension_tables, lexicon=None):
     '''
     Identifies the state, city, and venue name without writing to any dimension tables
 
     :param processed_events_df: a dataframe of all the events in the current Billboard issue
     :param dimension_tables:
+    :param lexicon: LocationLexicon, defaults to the one built from location_aliases.json
     :return:
     '''
+    if lexicon is None:
+        lexicon = get_location_lexicon()
     dim_cities = dimension_tables["cities"]
     dim_venues = dimension_tables["venues"]
-    processed_events_df["location"] = processed_events_df["location"].apply(ast.literal_eval)                           # convert location values from a string to an array
     venue_names = []
 
     for location in processed_events_df["location"]:
         city_id = city_index = city_candidate = None
         location_tokens = [token for part in location for token in part.split()]                                        # split every word/item into a token
-        state_id, location_tokens = match_state_after_venue(location_tokens)
+        state_id, location_tokens = match_state_after_venue(location_tokens, lexicon)
 
         # only check for an existing city if a state was provided, can't compare cities without knowing state
         if state_id is not None:
-            city_id, city_name, city_index = match_city_after_venue(location_tokens, state_id, dim_cities)
+            city_id, city_name, city_index = match_city_after_venue(location_tokens, state_id, dim_cities, lexicon)
 
         # if existing city was found, everything before the city should be the venue name
         if city_id is not None:
             location_tokens = location_tokens[:city_index]
         # if no existing city was found, check for a possible city to be recorded
         else:
-            city_candidate, venue_type_idx = find_city_candidate(location_tokens)                                       # find what looks like a city name
+            city_candidate, venue_type_idx = find_city_candidate(location_tokens, lexicon)                              # find what looks like a city name
 
             if venue_type_idx:                                                                                          # remove city candidate from location tokens
                 location_tokens = location_tokens[:venue_type_idx+1]
@@ -456,45 +503,47 @@ def identify_venue_name(processed_events_df, dimension_tables):
 
     processed_events_df["venue_name"] = venue_names
 
-def curate_location(location, dimension_tables):
+def curate_location(location, dimension_tables, lexicon=None):
     """
 
     :param location: list of strings
     :param dimension_tables:
+    :param lexicon: LocationLexicon, defaults to the one built from location_aliases.json
     :return:
     """
+    if lexicon is None:
+        lexicon = get_location_lexicon()
     dim_cities = dimension_tables["cities"]
     dim_venues = dimension_tables["venues"]
 
     venue_id = venue_name = city_id = city_index = city_candidate = None
     location_tokens = [token for part in location for token in part.split()]  # split every word/item into a token
     location_tokens = normalize_location_tokens(location_tokens)
-    location_tokens = clean_location(location_tokens)
-    state_id, location_tokens = match_state_after_venue(location_tokens)
+    location_tokens = clean_location(location_tokens, lexicon)
+    state_id, location_tokens = match_state_after_venue(location_tokens, lexicon)
 
-    city_id, city_name, city_index = match_city_after_venue(location_tokens, state_id, dim_cities)
+    city_id, city_name, city_index = match_city_after_venue(location_tokens, state_id, dim_cities, lexicon)
 
     # if existing city was found, everything before the city should be the venue name
     if city_id:
         location_tokens = location_tokens[:city_index]
-        print(f"Location tokens after cutting: {location_tokens}")
-        print(f"Location tokens after cutting: {location_tokens}")
+        trace(tracer, logging.DEBUG, "location_tokens_before_city", location_tokens=location_tokens)
     # if no existing city was found, check for a possible city to be recorded
     else:
-        city_candidate, venue_type_idx = find_city_candidate(location_tokens)  # find what looks like a city name
+        city_candidate, venue_type_idx = find_city_candidate(location_tokens, lexicon)  # find what looks like a city name
         if city_candidate and state_id is not None:  # if city candidate found and a state was found
             city_id = append_city_csv(city_candidate, dim_cities, state_id)  # add city to dim_cities
         if venue_type_idx:  # remove city candidate from location tokens
             location_tokens = location_tokens[:venue_type_idx + 1]
 
     if state_id is None:
-        state_id, location_tokens = match_state_in_venue(location_tokens)  # check if there is a state in the venue name
+        state_id, location_tokens = match_state_in_venue(location_tokens, lexicon)  # check if there is a state in the venue name
 
     if city_id is None:
         city_id = match_city_in_venue(location_tokens, dim_cities, state_id)  # check if there is a city in the venue name
 
-    location_tokens = isolate_venue_name(location_tokens)
-    location_tokens = correct_location_typos(location_tokens)
+    location_tokens = isolate_venue_name(location_tokens, lexicon)
+    location_tokens = correct_location_typos(location_tokens, lexicon)
 
     if city_id is None:
         city_id = match_city_in_venue(location_tokens, dim_cities, state_id)
@@ -511,19 +560,22 @@ def curate_location(location, dimension_tables):
 
     return venue_id, venue_name
 
-def curate_locations(processed_events_df, dimension_tables):
+def curate_locations(processed_events_df, dimension_tables, lexicon=None):
     """
     Curate all locations in the processed events dataframe
 
     :param processed_events_df: a dataframe of all the events in the current Billboard issue
     :param dimension_tables:
+    :param lexicon: LocationLexicon, defaults to the one built from location_aliases.json
     :return:
     """
+    if lexicon is None:
+        lexicon = get_location_lexicon()
     venue_ids = []
     venue_names = []
 
     for location in processed_events_df["location"]:
-        venue_id, venue_name = curate_location(location, dimension_tables)
+        venue_id, venue_name = curate_location(location, dimension_tables, lexicon)
         venue_ids.append(venue_id)
         venue_names.append(venue_name)
 
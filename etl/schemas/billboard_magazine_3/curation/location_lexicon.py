@@ -0,0 +1,81 @@
+from etl.data_cleaning.normalization import build_reverse_map
+from etl.utils.reference_data import get_reference_data
+from etl.utils.tracing import get_tracer, trace
+from etl.utils.phrase_trie import build_trie, freeze_trie
+from types import MappingProxyType
+from typing import NamedTuple, Mapping
+import logging
+import time
+import re
+
+'''
+Lookup tables the location curation uses for every location of every event, built once from location_aliases.json.
+The tables are read-only mappings and the lexicon itself is a tuple, so one lexicon can be shared by every call and
+every worker without being changed under them.
+
+    lexicon = get_location_lexicon()
+    state_id, location_tokens = match_state_after_venue(location_tokens, lexicon)
+'''
+
+tracer = get_tracer(__name__)
+
+class LocationLexicon(NamedTuple):
+    venue_types: Mapping                                                                                                # venue type spelling -> venue type, ex. 'auditoriurn' -> 'auditorium'
+    state_aliases: Mapping                                                                                              # state alias -> state id, ex. 'ariz' -> 3
+    city_aliases: Mapping                                                                                               # city misspelling -> city, ex. 'buttato' -> 'buffalo'
+    city_alias_patterns: tuple                                                                                          # (search pattern, ignorecase pattern, city title) per misspelling
+    city_alias_prefilter: re.Pattern                                                                                    # any misspelling, None if there are none
+    phrase_trie: Mapping                                                                                                # lowered words -> {'venue_type' | 'state' | 'city_alias': value}
+    build_seconds: float
+
+def build_location_lexicon(location_aliases):
+    """
+    :param location_aliases: (dict) the parsed location_aliases.json
+    :return: LocationLexicon
+    """
+    start = time.perf_counter()
+    city_aliases = build_reverse_map(location_aliases["cities"])
+
+    city_alias_patterns = []
+    for misspelled_city, correct_city in city_aliases.items():
+        pattern = rf"\b{re.escape(misspelled_city)}\b"
+        city_alias_patterns.append((re.compile(pattern), re.compile(pattern, flags=re.IGNORECASE), correct_city.title()))
+
+    city_alias_prefilter = None
+    if city_aliases:
+        city_alias_prefilter = re.compile(r"\b(?:" + "|".join(re.escape(misspelled_city) for misspelled_city in city_aliases) + r")\b")
+
+    venue_types = build_reverse_map(location_aliases["venue_types"])
+    state_aliases = build_reverse_map(location_aliases["states"])
+
+    alias_phrases = {}
+    for kind, aliases in (("venue_type", venue_types), ("state", state_aliases), ("city_alias", city_aliases)):
+        for alias, value in aliases.items():
+            alias_phrases.setdefault(tuple(alias.split()), {})[kind] = value
+
+    lexicon = LocationLexicon(
+        venue_types=MappingProxyType(venue_types),
+        state_aliases=MappingProxyType(state_aliases),
+        city_aliases=MappingProxyType(city_aliases),
+        city_alias_patterns=tuple(city_alias_patterns),
+        city_alias_prefilter=city_alias_prefilter,
+        phrase_trie=freeze_trie(build_trie((pieces, MappingProxyType(values)) for pieces, values in alias_phrases.items())),
+        build_seconds=time.perf_counter() - start,
+    )
+    trace(tracer, logging.DEBUG, "location_lexicon_built", seconds=lexicon.build_seconds, venue_types=len(lexicon.venue_types),
+          state_aliases=len(lexicon.state_aliases), city_aliases=len(lexicon.city_aliases))
+    return lexicon
+
+location_lexicon = {"source": None, "lexicon": None}                                                                    # rebuilt when the registry reloads the json
+
+def get_location_lexicon():
+    """
+    :return: LocationLexicon for the current location_aliases.json
+    """
+    location_aliases = get_reference_data("location_aliases")
+
+    if location_lexicon["source"] is not location_aliases:
+        location_lexicon["lexicon"] = build_location_lexicon(location_aliases)
+        location_lexicon["source"] = location_aliases
+
+    return location_lexicon["lexicon"]
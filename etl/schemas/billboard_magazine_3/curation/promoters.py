@@ -1,8 +1,12 @@
 from Levenshtein import distance as levenshtein_distance
 import slugify
 from etl.dimensions.promoters_csv import update_dim_promoters_csv
+from etl.utils.tracing import get_tracer, trace
+import logging
 import ast
 
+tracer = get_tracer(__name__)
+
 def parse_promoters(promoters_list, venue_names):
     promoters_per_event = []
     unique_promoters = set()
@@ -41,7 +45,7 @@ def curate_promoters(processed_events_df, curated_events_df, dim_promoters, venu
 
     update_dim_promoters_csv(unique_promoters, dim_promoters)                                                                 # add any new promoters to dim_promoters
     existing_promoters = dim_promoters["by_slug"]
-    print(existing_promoters)
+    trace(tracer, logging.DEBUG, "promoters_index", promoters=len(existing_promoters))
 
     promoter_ids = []
 
@@ -51,7 +55,7 @@ def curate_promoters(processed_events_df, curated_events_df, dim_promoters, venu
 
         for promoter_name in promoters:
             promoter_slug = slugify.slugify(promoter_name)
-            print(f"Slug: {promoter_slug}")
+            trace(tracer, logging.DEBUG, "promoter_slug", promoter_slug=promoter_slug)
             promoter_record = existing_promoters.get(promoter_name)
             if promoter_record is not None:
                 promoter_ids_per_event.append(promoter_record[0]["id"])                                      # get the id for that promoter
@@ -1,59 +1,137 @@
-from etl.utils.utils import load_event_keywords
-from config.paths import EVENT_KEYWORDS_PATH, LOCAL_DIM_SPECIAL_EVENTS_PATH
+from etl.utils.reference_data import get_reference_data
+from config.paths import LOCAL_DIM_SPECIAL_EVENTS_PATH
+from etl.utils.tracing import get_tracer, trace
+from etl.utils.aho_corasick import build_automaton, find_matches
+from functools import lru_cache
+import logging
 import re
 
 ORDINAL_FIX = re.compile(r"\b(\d+)(St|Nd|Rd|Th)\b")
 APOSTROPHE_FIX = re.compile(r"(['’])S\b")
 
-def find_event_end_index(artist_lines, event_keywords):
+tracer = get_tracer(__name__)
+
+KEYWORD_CATEGORIES = ["strong", "weak", "tags"]
+event_automaton = {"sources": None, "automaton": None}                                                                  # rebuilt when the registry reloads either file
+
+def get_event_automaton():
+    """
+    Builds the keyword automaton from event_keywords.json and special_event_aliases.json, the aliases are names of known
+    special events and are labelled strong. Strong and weak keywords are also labelled event
+
+    :return: (dict) automaton from build_automaton
+    """
+    event_keywords = get_reference_data("event_keywords")
+    special_event_aliases = get_reference_data("special_event_aliases")
+    sources = event_automaton["sources"]
+
+    if sources is None or sources[0] is not event_keywords or sources[1] is not special_event_aliases:
+        patterns = [(keyword, category) for category in KEYWORD_CATEGORIES for keyword in event_keywords[category]]
+        patterns += [(alias.replace("-", " "), "strong") for alias in special_event_aliases]                            # aliases are slugs
+        patterns += [(keyword, "event") for keyword, category in patterns if category in ("strong", "weak")]
+        event_automaton["automaton"] = build_automaton(patterns)
+        event_automaton["sources"] = (event_keywords, special_event_aliases)
+
+    return event_automaton["automaton"]
+
+@lru_cache(maxsize=32)
+def get_keyword_automaton(keywords):
+    """
+    :param keywords: (frozenset) keywords that are not all in the event automaton
+    """
+    return build_automaton((keyword, "keyword") for keyword in keywords)
+
+def match_event_keywords(artist_lines, keywords=None):
+    """
+    Finds every keyword in the artist lines in one scan over the lowered lines joined without a separator
+
+    :param artist_lines: list
+    :param keywords: iterable of keywords to look for, defaults to the event keywords and aliases
+    :return: (dict) {"lines": [set of keywords found inside line i], "joined": set of keywords found in the joined lines,
+        including ones spanning two lines, "by_label": {category: set of keywords}}
+    """
+    automaton = get_event_automaton()
+    if keywords is not None and not set(keywords) <= automaton["labels"].keys():
+        automaton = get_keyword_automaton(frozenset(keywords))
+
+    lowered_lines = [line.lower() for line in artist_lines]
+    line_keywords = [set() for _ in lowered_lines]
+    joined_keywords = set()
+    line_idx, line_start, line_end = -1, 0, 0
+
+    for end, keyword in find_matches(automaton, "".join(lowered_lines)):
+        while line_end < end:                                                                                           # matches come in order of end
+            line_idx += 1
+            line_start, line_end = line_end, line_end + len(lowered_lines[line_idx])
+        joined_keywords.add(keyword)
+        if end - len(keyword) >= line_start:
+            line_keywords[line_idx].add(keyword)
+
+    return {"lines": line_keywords, "joined": joined_keywords, "by_label": automaton["by_label"]}
+
+def get_category_keywords(keyword_matches, category):
+    """
+    :return: (set) every keyword of the automaton labelled with the category
+    """
+    return keyword_matches["by_label"].get(category, set())
+
+def find_first_line(keyword_matches, keywords):
+    """
+    :return: (int) index of the first line containing one of the keywords, -1 if none does
+    """
+    for i, line_keywords in enumerate(keyword_matches["lines"]):
+        if not line_keywords.isdisjoint(keywords):
+            return i
+
+    return -1
+
+def find_event_end_index(artist_lines, event_keywords, keyword_matches=None):
     """
 
     :param artist_lines: list
     :param event_keywords: list
+    :param keyword_matches: (dict) from match_event_keywords, to reuse a scan of the same lines
     :return:
     """
-    for i, line in enumerate(artist_lines):
-        lowered = line.lower()
-        for keyword in event_keywords:
-            if keyword in lowered:
-                return i
+    if keyword_matches is None:
+        keyword_matches = match_event_keywords(artist_lines, event_keywords)
 
-    return -1
+    return find_first_line(keyword_matches, event_keywords)
 
-def find_tag_index(artist_lines, tag_keywords):
-    for i, line in enumerate(artist_lines):
-        lowered = line.lower()
-        for keyword in tag_keywords:
-            if keyword in lowered:
-                return i
+def find_tag_index(artist_lines, tag_keywords, keyword_matches=None):
+    if keyword_matches is None:
+        keyword_matches = match_event_keywords(artist_lines, tag_keywords)
 
-    return -1
+    return find_first_line(keyword_matches, tag_keywords)
 
-def calc_special_event_score(artist_lines):
+def calc_special_event_score(artist_lines, keyword_matches=None):
     """
     Generates a score to estimate if the artist lines contain a special event name
     :param artist_lines: list
+    :param keyword_matches: (dict) from match_event_keywords, to reuse a scan of the same lines
     :return:
     """
     score = 0
-    event_keywords = load_event_keywords(EVENT_KEYWORDS_PATH)
-    strong_event_keywords = event_keywords['strong']
-    weak_event_keywords = event_keywords['weak']
-    tag_keywords = event_keywords['tags']
+    if keyword_matches is None:
+        keyword_matches = match_event_keywords(artist_lines)
+    strong_event_keywords = get_category_keywords(keyword_matches, "strong")
+    weak_event_keywords = get_category_keywords(keyword_matches, "weak")
+    tag_keywords = get_category_keywords(keyword_matches, "tags")
+    found_keywords = keyword_matches["joined"]
     total_artists_string = "".join(artist_lines).lower()
     event_candidate = None
 
-    if any(keyword in total_artists_string for keyword in strong_event_keywords):
+    if not found_keywords.isdisjoint(strong_event_keywords):
         score += 7
 
-    if any(keyword in total_artists_string for keyword in tag_keywords):
-        tag_idx = find_tag_index(artist_lines, tag_keywords)
+    if not found_keywords.isdisjoint(tag_keywords):
+        tag_idx = find_tag_index(artist_lines, tag_keywords, keyword_matches)
         post_tag = " ".join(artist_lines[tag_idx:])
-        print(f"Post tag: {post_tag}")
+        trace(tracer, logging.DEBUG, "post_tag", post_tag=post_tag)
         if any(char.isdigit() for char in post_tag):
             score += 7
 
-    if any(keyword in total_artists_string for keyword in weak_event_keywords):
+    if not found_keywords.isdisjoint(weak_event_keywords):
         score += 5
 
     if ":" in total_artists_string:
@@ -62,11 +140,11 @@ def calc_special_event_score(artist_lines):
         event_candidate = pre_colon
 
     else:
-        event_end_idx = find_event_end_index(artist_lines, strong_event_keywords+weak_event_keywords)
-        print(event_end_idx)
+        event_end_idx = find_event_end_index(artist_lines, get_category_keywords(keyword_matches, "event"), keyword_matches)
+        trace(tracer, logging.DEBUG, "event_end_index", event_end_idx=event_end_idx)
         if event_end_idx is not None:
             event_candidate = " ".join(artist_lines[: event_end_idx + 1])
-            print(event_candidate)
+            trace(tracer, logging.DEBUG, "event_candidate", event_candidate=event_candidate)
     if "'" in event_candidate:
         score += 2
 
@@ -75,25 +153,27 @@ def calc_special_event_score(artist_lines):
 
     return score
 
-def extract_event_name(artist_lines):
+def extract_event_name(artist_lines, keyword_matches=None):
     artist_lines_lowered = [artist_line.lower() for artist_line in artist_lines]
     event_name_parts = []
     updated_artists = []
-    event_keywords = load_event_keywords(EVENT_KEYWORDS_PATH)["strong"] + load_event_keywords(EVENT_KEYWORDS_PATH)["weak"]
+    if keyword_matches is None:
+        keyword_matches = match_event_keywords(artist_lines)
+    event_keywords = get_category_keywords(keyword_matches, "event")
+    lines_with_keyword = [not line_keywords.isdisjoint(event_keywords) for line_keywords in keyword_matches["lines"]]
     combined_artists = " ".join(artist_lines).lower()
     event_name = None
     found_colon = False
     found_keyword = False
     contains_colon = ":" in combined_artists
-    contains_keyword = any(keyword in combined_artists for keyword in event_keywords)
-    print(f"Contains colon: {contains_colon}, contains keyword: {contains_keyword}")
+    contains_keyword = any(lines_with_keyword)
+    trace(tracer, logging.DEBUG, "event_name_signals", contains_colon=contains_colon, contains_keyword=contains_keyword)
 
     for i, line in enumerate(artist_lines_lowered):
-        print(line)
-        keyword_in_line = any(keyword in line for keyword in event_keywords)                                            # check for a token like "Festival", "Fest", "Show"
+        keyword_in_line = lines_with_keyword[i]                                                                         # check for a token like "Festival", "Fest", "Show"
         if keyword_in_line:
             found_keyword = True
-            print(f"Found keyword {keyword_in_line} in {line}")
+            trace(tracer, logging.DEBUG, "event_keyword_line", line=line)
             if ':' in line:
                 found_colon = True
                 before, after = line.split(":", 1)                                                                      # split string on colon
@@ -107,10 +187,10 @@ def extract_event_name(artist_lines):
             if not contains_colon or (contains_colon and found_colon):                                                  # if no colon or colon already found
                 updated_artists.extend(artist_lines[i + 1:])                                                            # put all remaining lines in the updated artists list
                 event_name = normalize_event_name(" ".join(event_name_parts))                                           # join event name and fix casing
-                print("Ready to return in keyword path")
+                trace(tracer, logging.DEBUG, "event_name_found", path="keyword", event_name=event_name)
                 return event_name, updated_artists
         elif ":" in line:
-            print(f"Found colon in {line}")
+            trace(tracer, logging.DEBUG, "event_colon_line", line=line)
             found_colon = True
             if not contains_keyword or (contains_keyword and found_keyword):                                            # if no event name or already found
                 before, after = line.split(":", 1)                                                                      # split string on colon
@@ -121,7 +201,7 @@ def extract_event_name(artist_lines):
 
                 updated_artists.extend(artist_lines[i + 1:])                                                            # put all remaining lines in the updated artists list
                 event_name = normalize_event_name(" ".join(event_name_parts))                                           # join event name and fix casing
-                print("Ready to return in colon path")
+                trace(tracer, logging.DEBUG, "event_name_found", path="colon", event_name=event_name)
                 return event_name, updated_artists
             else:
                 event_name_parts.append(line)                                                                           # if still an event name to find, just append
@@ -129,7 +209,7 @@ def extract_event_name(artist_lines):
             event_name_parts.append(line)
 
     event_name = normalize_event_name(" ".join(event_name_parts))
-    print("Ready to return at end")
+    trace(tracer, logging.DEBUG, "event_name_found", path="end", event_name=event_name)
     return event_name, updated_artists
 
 def parse_event_name(artist_lines, existing_special_events):
@@ -138,10 +218,11 @@ def parse_event_name(artist_lines, existing_special_events):
     :param existing_special_events: dict, the special_events dimension table
     :return: event_name str, updated_artists
     """
-    special_event_score = calc_special_event_score(artist_lines)
+    keyword_matches = match_event_keywords(artist_lines)                                                                # one scan shared by the scorer and the extractor
+    special_event_score = calc_special_event_score(artist_lines, keyword_matches)
 
     if special_event_score >= 7:
-        event_name, updated_artists = extract_event_name(artist_lines)
+        event_name, updated_artists = extract_event_name(artist_lines, keyword_matches)
         return event_name, updated_artists
     else:
         return None, artist_lines
@@ -0,0 +1,47 @@
+from etl.router import list_archive_issues, run_batch, RAW_PREFIX
+from etl.utils.job_queue import JOB_QUEUE_PATH, DEFAULT_LEASE_SECONDS, DEFAULT_MAX_ATTEMPTS
+from etl.utils.manifest import MANIFEST_PATH
+from datetime import date
+import argparse
+import os
+
+'''
+Backfills every Boxscore issue. Issues are enumerated from the raw layer, queued in the durable job queue and processed
+across N worker processes. Re-running after a crash resumes from the queue: done issues are never redone and issues
+whose worker died are picked up again once their lease expires.
+
+    python -m etl.schemas.billboard_magazine_3.processing.backfill --workers 4
+'''
+
+BACKFILL_START = date(1984, 10, 13)
+BACKFILL_END = date(2001, 7, 21)
+
+def list_backfill_issues(prefix=RAW_PREFIX, start=BACKFILL_START, end=BACKFILL_END):
+    """
+    :param prefix: (str) s3 prefix of the raw pdfs
+    :param start: (date) first issue date
+    :param end: (date) last issue date
+    :return: list of (raw key, etag) tuples for the Boxscore issues published between start and end
+    """
+    return list_archive_issues(prefix, start, end, schema_ids=["bb_3"])
+
+def run_backfill(num_workers=4, queue_path=JOB_QUEUE_PATH, manifest_path=MANIFEST_PATH, lease_seconds=DEFAULT_LEASE_SECONDS, max_attempts=DEFAULT_MAX_ATTEMPTS):
+    """
+    Queues every backfill issue and processes the queue across worker processes
+
+    :return: (dict) {status: number of jobs} once the workers finish
+    """
+    return run_batch(list_backfill_issues(), num_workers, queue_path, manifest_path, lease_seconds, max_attempts)
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill every Boxscore issue with a resumable job queue")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--lease-seconds", type=int, default=DEFAULT_LEASE_SECONDS)
+    parser.add_argument("--max-attempts", type=int, default=DEFAULT_MAX_ATTEMPTS)
+    parser.add_argument("--queue-path", default=JOB_QUEUE_PATH)
+    args = parser.parse_args()
+
+    run_backfill(args.workers, args.queue_path, MANIFEST_PATH, args.lease_seconds, args.max_attempts)
+
+if __name__ == "__main__":
+    main()
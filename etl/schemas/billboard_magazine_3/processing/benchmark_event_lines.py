@@ -0,0 +1,80 @@
+from etl.schemas.billboard_magazine_3.processing.event_lines import is_new_event_line
+import argparse
+import time
+import sys
+import re
+
+'''
+Times the new event line detector on pathological lines of growing length. Every family is timed at doubling lengths
+and the average growth per doubling is printed, a linear detector stays near 2x. The regex the detector
+replaced is timed on the short lengths only, it backtracks exponentially on long runs of spaces.
+
+    python -m etl.schemas.billboard_magazine_3.processing.benchmark_event_lines
+'''
+
+LEGACY_NEW_EVENT_PATTERN = re.compile(r"^[^a-z]*\s([^0-9]*\s)*((?:j|J(?:an|qn)|F(?:eb|eh)|Ma(?:r|rch|rc|rn|vch|tch)|A(?:pr|pril|prl|or|ar)|May|(?:Ju|du|tu|Su)(?:n|ne|u|l|ly)|Au(?:g|gg|uq)|S(?:ep|ept|eph)|O(?:ct|oet|oct)|N(?:ov|ow|no)|D(?:e[ceo]|ec|ee))[.,]?\s?.{1,2}-?){1,2}\s?[^A-Za-z]+\s(in-house|[A-Z])")
+
+PATHOLOGICAL_LINES = {
+    "spaces": lambda n: "A" + " " * n + "Nov 1",                                                                        # one long space run, the regex blows up here
+    "venue_words": lambda n: "A " + "Nov " * n + "x",                                                                   # a month token could start at every word
+    "short_months": lambda n: "A " + "j " * n + "x",                                                                   # every word is a month token
+    "no_lowercase": lambda n: "A " * n + "Nov",
+}
+DETECTOR_LENGTHS = [1000, 2000, 4000, 8000, 16000]
+LEGACY_LENGTHS = [4, 8, 12, 16, 20]
+MAX_GROWTH = 3.0                                                                                                        # average per doubling, linear is 2x and quadratic 4x
+
+def time_detector(detect, line, repeats=5):
+    """
+    :return: (float) fastest of repeats, in milliseconds
+    """
+    best = None
+
+    for _ in range(repeats):
+        start = time.perf_counter()
+        detect(line)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    return best * 1e3
+
+def run_benchmark(lengths=DETECTOR_LENGTHS, legacy_lengths=LEGACY_LENGTHS, repeats=5):
+    """
+    :return: (dict) {family: {"detector": [(length, ms)], "legacy": [(length, ms)], "growth": float}}
+    """
+    results = {}
+
+    for family, make_line in PATHOLOGICAL_LINES.items():
+        detector_times = [(n, time_detector(is_new_event_line, make_line(n), repeats)) for n in lengths]
+        legacy_times = [(n, time_detector(LEGACY_NEW_EVENT_PATTERN.search, make_line(n), 1)) for n in legacy_lengths]
+        first_ms, last_ms = detector_times[0][1], detector_times[-1][1]
+        growth = (last_ms / first_ms) ** (1 / (len(detector_times) - 1)) if len(detector_times) > 1 and first_ms > 0 else 0.0
+
+        results[family] = {"detector": detector_times, "legacy": legacy_times, "growth": growth}
+
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the new event line detector on pathological lines")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--skip-legacy", action="store_true")
+    args = parser.parse_args()
+
+    results = run_benchmark(legacy_lengths=[] if args.skip_legacy else LEGACY_LENGTHS, repeats=args.repeats)
+    is_linear = True
+
+    for family, result in results.items():
+        print(family)
+        for n, ms in result["detector"]:
+            print(f"    detector  length {n:>6}: {ms:9.3f} ms")
+        for n, ms in result["legacy"]:
+            print(f"    regex     length {n:>6}: {ms:9.3f} ms")
+        print(f"    growth per doubling: {result['growth']:.2f}x")
+        is_linear = is_linear and result["growth"] <= MAX_GROWTH
+
+    if not is_linear:
+        print(f"Detector grew more than {MAX_GROWTH}x per doubling")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+from etl.schemas.billboard_magazine_3.processing.process import consolidate_events, parse_event
+from etl.schemas.billboard_magazine_3.processing.lexer import classify
+from etl.schemas.billboard_magazine_3.processing.number_words import get_lookup_stats
+from contextlib import redirect_stdout
+import subprocess
+import argparse
+import logging
+import types
+import json
+import time
+import ast
+import io
+import os
+
+'''
+Times parse_event per event on the smoke fixtures: the consolidated lines in etl/raw_event_lines.json and the event
+lines of the Boxscore smoke tests. The baseline is parse_event as it was before the lexer, loaded from git, run on the
+same rows. The cold run clears the lexer cache before every pass, so each token is classified the first time it is
+seen, the warm run parses with every token already classified, as in a long backfill.
+
+    python -m etl.schemas.billboard_magazine_3.processing.benchmark_parse --repeats 50
+'''
+
+ETL_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "..")
+BASELINE_REV = "686e44ffd8e5"                                                                                           # last commit where parse_event ran its regexes on every token
+PROCESS_PATH = "etl/schemas/billboard_magazine_3/processing/process.py"
+RAW_EVENT_LINES_PATH = os.path.join(ETL_DIR, "raw_event_lines.json")
+SMOKE_TEST_PATH = os.path.join(ETL_DIR, "tests", "smoke", "billboard_magazine_3", "processing", "test_extract_boxoffice_3.py")
+
+def load_smoke_event_lines(path=SMOKE_TEST_PATH):
+    """
+    :param path: (str) a smoke test module
+    :return: list of the strings assigned to event_line in the tests
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+
+    return [
+        node.value.value for node in ast.walk(tree)
+        if isinstance(node, ast.Assign) and isinstance(node.value, ast.Constant) and isinstance(node.value.value, str)
+        and any(isinstance(target, ast.Name) and target.id == "event_line" for target in node.targets)
+    ]
+
+def load_fixture_events(raw_event_lines_path=RAW_EVENT_LINES_PATH, smoke_test_path=SMOKE_TEST_PATH):
+    """
+    :return: list of consolidated event lines
+    """
+    with open(raw_event_lines_path, "r", encoding="utf-8") as f:
+        raw_event_lines = json.load(f)
+
+    with redirect_stdout(io.StringIO()):
+        events = consolidate_events(raw_event_lines)
+
+    return events + load_smoke_event_lines(smoke_test_path)
+
+def load_baseline_parse_event(rev=BASELINE_REV):
+    """
+    :param rev: (str) the git revision to load process.py from
+    :return: parse_event as it was at rev
+    """
+    source = subprocess.run(["git", "show", f"{rev}:{PROCESS_PATH}"], cwd=ETL_DIR, capture_output=True, text=True, check=True).stdout
+    module = types.ModuleType("baseline_process")
+
+    with redirect_stdout(io.StringIO()):
+        exec(compile(source, f"{rev}:{PROCESS_PATH}", "exec"), module.__dict__)
+
+    return module.parse_event
+
+def parse_quietly(parse_fn, event):
+    try:
+        return parse_fn(event)
+    except Exception as e:                                                                                              # a malformed fixture still costs its parse time
+        return repr(e)
+
+def count_differences(events, baseline_parse_fn):
+    """
+    :return: (int) number of events the baseline and the current parse_event read differently
+    """
+    with redirect_stdout(io.StringIO()):
+        return sum(parse_quietly(baseline_parse_fn, event) != parse_quietly(parse_event, event) for event in events)
+
+def time_parse(events, repeats=20, cold=False, parse_fn=parse_event):
+    """
+    :param events: list of consolidated event lines
+    :param repeats: (int) number of passes, the fastest one is kept
+    :param cold: (bool) clear the lexer cache before every pass
+    :param parse_fn: the parse_event to time, ex. from load_baseline_parse_event
+    :return: (float) microseconds per event
+    """
+    best = None
+
+    with redirect_stdout(io.StringIO()):
+        for _ in range(repeats):
+            if cold:
+                classify.cache_clear()
+
+            start = time.perf_counter()
+            for event in events:
+                parse_quietly(parse_fn, event)
+            elapsed = time.perf_counter() - start
+
+            best = elapsed if best is None else min(best, elapsed)
+
+    return best / len(events) * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description="Time parse_event per event on the Boxscore smoke fixtures")
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--baseline-rev", default=BASELINE_REV, help="git revision of the parser to compare against")
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)                                                                                   # the parser logs every bad attendance and capacity
+    events = load_fixture_events()
+    baseline_parse_fn = load_baseline_parse_event(args.baseline_rev)
+
+    baseline = time_parse(events, args.repeats, parse_fn=baseline_parse_fn)
+    cold = time_parse(events, args.repeats, cold=True)
+    warm = time_parse(events, args.repeats, cold=False)
+    print(f"{len(events)} events, {count_differences(events, baseline_parse_fn)} parsed differently by the baseline")
+    print(f"baseline ({args.baseline_rev}): {baseline:.1f} us/event")
+    print(f"cold lexer cache: {cold:.1f} us/event ({baseline / cold:.2f}x)")
+    print(f"warm lexer cache: {warm:.1f} us/event ({baseline / warm:.2f}x)")
+    print(f"number word lookups: {get_lookup_stats()}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+from etl.schemas.billboard_magazine_3.processing.process import (
+    new_event_state, parse_gross_receipts_us, parse_attendance, parse_capacity, parse_num_sellouts_shows, object_key
+)
+from etl.schemas.billboard_magazine_3.processing.lexer import classify, tokenize, months_pattern
+from etl.utils.utils import extract_words_ocr
+from etl.ocr.page_cache import DEFAULT_DPI
+from config import BUCKET_NAME
+import numpy as np
+import re
+
+'''
+Column-aware Boxscore parser for word level OCR output (see etl.ocr.words). Instead of recovering field boundaries from
+flat text, every word is placed in a table column by the x-coordinate of its center, using the positions of the column
+headers, and in a table row by the y-coordinate of its center. An event starts on every row with a date.
+
+    ARTIST(S)     Venue               Date(s)    Ticket Price(s)       Capacity          Promoter
+    CULTURE CLUB  Capital Centre      Nov. 11    $216,736              13,983            Cellar Door Prods.
+    DADS          Landover, Md.                  $15.50                (19,114)
+'''
+
+# first word of each column header, in page order, and the field the column holds
+COLUMN_HEADERS = [
+    ("ARTIST", "artists"),
+    ("VENUE", "location"),
+    ("DATE", "dates"),
+    ("TICKET", "gross"),
+    ("CAPACITY", "attendance"),
+    ("PROMOTER", "promoter"),
+]
+ROW_GAP = 0.6                                                                                                           # fraction of the median word height between rows
+TABLE_END = "Copyrighted"
+
+def find_header(words):
+    """
+    Finds the column header row and the x-coordinate boundaries between columns
+
+    :param words: DataFrame of words
+    :return: (bottom of the header row in pixels, list of column names, array of boundaries between columns), None if
+        the header is not on the page
+    """
+    upper_text = words["text"].str.upper()
+
+    for line in words.loc[upper_text.str.startswith("ARTIST"), "line"].unique():
+        header_words = words[words["line"] == line]
+        header_text = upper_text[header_words.index]
+        columns, lefts, rights = [], [], []
+
+        for header, column in COLUMN_HEADERS:
+            matches = header_words[header_text.str.startswith(header)]
+            if not matches.empty:
+                columns.append(column)
+                lefts.append(matches["left"].iloc[0])
+                rights.append(matches["left"].iloc[0] + matches["width"].iloc[0])
+
+        if len(columns) >= 4:                                                                                           # enough of the header was read to place the columns
+            boundaries = (np.array(rights[:-1]) + np.array(lefts[1:])) / 2                                              # halfway between neighbouring headers
+            return (header_words["top"] + header_words["height"]).max(), columns, boundaries
+
+    return None
+
+def assign_cells(words):
+    """
+    Places every table word in a row and column in one vectorized pass
+
+    :param words: DataFrame of words
+    :return: list of {column: cell text} dicts, one per table row, None if the table header was not found
+    """
+    header = find_header(words)
+    if header is None:
+        return None
+    header_bottom, columns, boundaries = header
+
+    table = words[words["top"] > header_bottom]
+    end_rows = table[table["text"].str.startswith(TABLE_END)]
+    if not end_rows.empty:
+        table = table[table["top"] < end_rows["top"].min()]
+    if table.empty:
+        return []
+
+    center_x = (table["left"] + table["width"] / 2).to_numpy()
+    center_y = (table["top"] + table["height"] / 2).to_numpy()
+
+    order = np.argsort(center_y, kind="stable")
+    row_starts = np.diff(center_y[order], prepend=center_y[order][0]) > ROW_GAP * np.median(table["height"])
+    rows = np.empty(len(order), dtype=np.int64)
+    rows[order] = np.cumsum(row_starts)
+
+    table = table.assign(row=rows, column=np.searchsorted(boundaries, center_x)).sort_values(["row", "column", "left"])
+    cells = table.groupby(["row", "column"], sort=True)["text"].agg(" ".join)
+
+    table_rows = [{} for _ in range(rows.max() + 1)]
+    for (row, column), text in cells.items():
+        table_rows[row][columns[column]] = text
+
+    return table_rows
+
+def is_event_start(row):
+    dates = row.get("dates", "")
+    return bool(dates) and bool(re.search(months_pattern, dates) or re.match(r"^\d", dates))
+
+def group_event_rows(table_rows):
+    """
+    :param table_rows: list of {column: cell text} dicts
+    :return: list of events, each a list of its rows. Rows before the first dated row are dropped
+    """
+    events = []
+
+    for row in table_rows:
+        if is_event_start(row):
+            events.append([row])
+        elif events:
+            events[-1].append(row)
+
+    return events
+
+def parse_gross_cell(event_data, cell):
+    canadian_gross = re.search(r"\(\$?([\d,.]+)\s*Canadian", cell)
+    if canadian_gross:
+        event_data["gross_receipts_canadian"] = int(re.sub(r"[^\d]", "", canadian_gross.group(1)))
+    elif cell.startswith("$"):
+        event_data["ticket_prices"].append(cell.replace("$", "").replace(" ", ""))
+
+def parse_attendance_cell(event_data, cell):
+    tokens = tokenize(cell)
+
+    if re.search(r"\(\d+,?.?\d+\)", cell):
+        parse_capacity(event_data, classify(cell))
+    elif tokens and tokens[0].is_count_word and len(tokens) > 1:
+        parse_num_sellouts_shows(event_data, tokens[0], iter(tokens[1:]))
+    elif tokens and tokens[0].is_sellout:
+        event_data["num_sellouts"] = 1
+
+def build_event(event_rows, object_key=object_key):
+    """
+    Converts the cells of one event into the same event dictionary parse_event produces
+
+    :param event_rows: list of {column: cell text} dicts, the first one holds the date
+    :param object_key: the s3 key of the raw pdf
+    :return: (dict) event data
+    """
+    event_data = new_event_state(BUCKET_NAME, object_key)
+
+    for i, row in enumerate(event_rows):
+        for column in ("artists", "location", "dates", "promoter"):
+            if row.get(column):
+                event_data[column].append(row[column])
+
+        if i == 0:
+            parse_gross_receipts_us(event_data, classify(row.get("gross", "").replace(" ", "")))
+            parse_attendance(event_data, classify(row.get("attendance", "").replace(" ", "")))
+        else:
+            if row.get("gross"):
+                parse_gross_cell(event_data, row["gross"])
+            if row.get("attendance"):
+                parse_attendance_cell(event_data, row["attendance"])
+
+    return event_data
+
+def parse_boxscore_words(words, object_key=object_key):
+    """
+    Parses the Boxscore table from the words of its page
+
+    :param words: DataFrame of words, see etl.ocr.words
+    :param object_key: the s3 key of the raw pdf
+    :return: list of event dictionaries, empty if the table header was not found
+    """
+    table_rows = assign_cells(words)
+
+    if table_rows is None:
+        print("Could not find the Boxscore column headers in the OCR words")
+        return []
+
+    return [build_event(event_rows, object_key) for event_rows in group_event_rows(table_rows)]
+
+def parse_boxscore_page(pdf, page_num, object_key=object_key, pdf_hash=None, dpi=DEFAULT_DPI):
+    """
+    OCRs the Boxscore page as word boxes, saving them to the word cache, and parses its events by column
+
+    :param pdf: the raw pdf bytes or the path to a local pdf file
+    :param page_num: (int) the Boxscore page
+    :param object_key: the s3 key of the raw pdf
+    :param pdf_hash: (str)
+    :param dpi: (int)
+    :return: list of event dictionaries
+    """
+    words = extract_words_ocr(pdf, page_num, dpi, pdf_hash)
+    return parse_boxscore_words(words, object_key)
@@ -0,0 +1,108 @@
+import pyarrow.parquet as pq
+import pyarrow as pa
+import pandas as pd
+import io
+
+'''
+Columnar builder for the events of one issue. Parsed events are appended straight into typed column buffers, list
+fields as one flat value buffer plus offsets, and the issue is turned into a single Arrow RecordBatch with native list
+columns, so the events never go through a DataFrame of dicts and the lists never have to be parsed back from strings.
+
+    columns = new_event_columns()
+    for event_data in events:
+        append_event(columns, event_data)
+    batch = build_record_batch(columns)
+'''
+
+EVENT_SCHEMA = pa.schema([                                                                                              # same fields and order as new_event_state
+    ("artists", pa.list_(pa.string())),
+    ("dates", pa.list_(pa.string())),
+    ("gross_receipts_us", pa.float64()),
+    ("gross_receipts_canadian", pa.int64()),
+    ("attendance", pa.float64()),
+    ("capacity", pa.int64()),
+    ("num_shows", pa.int64()),
+    ("num_sellouts", pa.int64()),
+    ("promoter", pa.list_(pa.string())),
+    ("ticket_prices", pa.list_(pa.string())),
+    ("location", pa.list_(pa.string())),
+    ("source_id", pa.string()),
+    ("schema_id", pa.string()),
+    ("s3_uri", pa.string()),
+])
+LIST_COLUMNS = [field.name for field in EVENT_SCHEMA if pa.types.is_list(field.type)]
+SCALAR_COLUMNS = [field.name for field in EVENT_SCHEMA if not pa.types.is_list(field.type)]
+
+def new_event_columns():
+    """
+    :return: (dict) {column: list of values} for scalar columns, {column: {"values": [], "offsets": [0]}} for list columns
+    """
+    columns = {name: [] for name in SCALAR_COLUMNS}
+    columns.update({name: {"values": [], "offsets": [0]} for name in LIST_COLUMNS})
+    return columns
+
+def append_event(columns, event_data):
+    """
+    :param columns: (dict) column buffers from new_event_columns
+    :param event_data: (dict) one parsed event
+    """
+    for name in LIST_COLUMNS:
+        column = columns[name]
+        column["values"].extend(event_data[name])
+        column["offsets"].append(len(column["values"]))
+
+    for name in SCALAR_COLUMNS:
+        columns[name].append(event_data[name])
+
+def build_record_batch(columns):
+    """
+    :param columns: (dict) column buffers from new_event_columns
+    :return: pyarrow RecordBatch with EVENT_SCHEMA
+    """
+    arrays = []
+
+    for field in EVENT_SCHEMA:
+        column = columns[field.name]
+        if field.name in LIST_COLUMNS:
+            offsets = pa.array(column["offsets"], type=pa.int32())
+            arrays.append(pa.ListArray.from_arrays(offsets, pa.array(column["values"], type=pa.string())))
+        else:
+            arrays.append(pa.array(column, type=field.type))
+
+    return pa.RecordBatch.from_arrays(arrays, schema=EVENT_SCHEMA)
+
+def build_event_batch(events):
+    """
+    :param events: iterable of parsed events, None for lines that were not events
+    :return: pyarrow RecordBatch with one row per event
+    """
+    columns = new_event_columns()
+
+    for event_data in events:
+        if event_data is not None:
+            append_event(columns, event_data)
+
+    return build_record_batch(columns)
+
+def event_batch_to_frame(batch):
+    """
+    Converts a batch to the DataFrame the processed csv is written from, list columns stay python lists so they are
+    written the way curation reads them back
+
+    :param batch: pyarrow RecordBatch with EVENT_SCHEMA
+    :return: DataFrame
+    """
+    return pd.DataFrame({name: batch.column(name).to_pylist() for name in batch.schema.names})
+
+def serialize_event_batch(batch, file_format="parquet"):
+    """
+    :param batch: pyarrow RecordBatch with EVENT_SCHEMA
+    :param file_format: (str) 'parquet', with native list columns, or 'csv'
+    :return: (bytes) the processed file
+    """
+    if file_format == "csv":
+        return event_batch_to_frame(batch).to_csv(index=False).encode("utf-8")
+
+    buffer = io.BytesIO()
+    pq.write_table(pa.Table.from_batches([batch], schema=EVENT_SCHEMA), buffer, compression="zstd")
+    return buffer.getvalue()
@@ -0,0 +1,160 @@
+import re
+
+'''
+Detects the first OCR line of a Boxscore event in linear time. The first line of an event is the only one with the
+date, ex. 'CULTURE CLUB Capital Centre Nov. 11 $216,736 13,983 Cellar Door Prods.', and reads as:
+
+    1. a prefix without lowercase letters (the artist) up to a space
+    2. optionally, words without digits (the venue), each ending in a space
+    3. one or two month tokens, each an OCR spelling of a month, an optional '.' or ',', an optional space, one or two
+       characters of day and an optional '-'
+    4. an optional space, then a run of non-letters ending in a space ($216,736 13,983 )
+    5. an uppercase letter or 'in-house' (the promoter)
+
+This used to be one regex whose nested '([^0-9]* )*' and '(...){1,2}' groups backtrack on long noisy lines. Here the
+line is scanned once to find where a month token may start (step 1 and 2), and every month token found there is
+matched by a small state machine over its fixed-length parts, with the check for step 4 and 5 a lookup into a
+precomputed next-letter index. Lines without a month spelling are rejected before the scan.
+'''
+
+MONTH_SPELLINGS = [
+    "j",
+    "Jan", "Jqn",
+    "Feb", "Feh",
+    "Mar", "March", "Marc", "Marn", "Mavch", "Match",
+    "Apr", "April", "Aprl", "Aor", "Aar",
+    "May",
+    *[prefix + suffix for prefix in ("Ju", "du", "tu", "Su") for suffix in ("n", "ne", "u", "l", "ly")],
+    "Aug", "Augg", "Auuq",
+    "Sep", "Sept", "Seph",
+    "Oct", "Ooet", "Ooct",
+    "Nov", "Now", "Nno",
+    "Dec", "Deo", "Dee",
+]
+month_prefilter = re.compile("|".join(sorted(MONTH_SPELLINGS, key=len, reverse=True)))                                 # plain alternation, scans the line once
+
+MONTHS_BY_FIRST_CHAR = {}
+for month in MONTH_SPELLINGS:
+    MONTHS_BY_FIRST_CHAR.setdefault(month[0], []).append(month)
+
+MAX_MONTH_TOKENS = 2
+
+def is_lower(char):
+    return "a" <= char <= "z"
+
+def is_letter(char):
+    return "a" <= char <= "z" or "A" <= char <= "Z"
+
+def is_digit(char):
+    return "0" <= char <= "9"
+
+def find_month_starts(line):
+    """
+    Finds every position a month token may start at: after a prefix without lowercase letters ending in a space,
+    optionally followed by words without digits that each end in a space
+
+    :param line: (str)
+    :return: generator of positions, in order
+    """
+    last_prefix_space = -1                                                                                              # last space before the first lowercase letter
+    last_digit = -1
+    seen_lower = False
+
+    for i, char in enumerate(line):
+        if is_lower(char):
+            seen_lower = True
+        elif is_digit(char):
+            last_digit = i
+        elif char.isspace():
+            if not seen_lower:
+                last_prefix_space = i
+                yield i + 1
+            elif last_prefix_space >= 0 and last_digit < last_prefix_space:                                             # no digits since the prefix
+                yield i + 1
+
+def match_month_token(line, start):
+    """
+    :param line: (str)
+    :param start: (int) position of the month spelling
+    :return: set of positions one month token starting at start can end at
+    """
+    ends = set()
+
+    for month in MONTHS_BY_FIRST_CHAR.get(line[start:start + 1], []):
+        if not line.startswith(month, start):
+            continue
+
+        positions = {start + len(month)}
+        positions |= {i + 1 for i in positions if line[i:i + 1] in (".", ",")}                                           # optional '.' or ','
+        positions |= {i + 1 for i in positions if i < len(line) and line[i].isspace()}                                  # optional space
+
+        day_ends = set()
+        for i in positions:
+            for day_length in (1, 2):                                                                                   # one or two characters of day
+                if i + day_length <= len(line) and "\n" not in line[i:i + day_length]:
+                    day_ends.add(i + day_length)
+
+        ends |= day_ends
+        ends |= {i + 1 for i in day_ends if line[i:i + 1] == "-"}                                                       # optional '-'
+
+    return ends
+
+def build_next_letter_index(line):
+    """
+    :return: list where item i is the position of the first letter at or after i, len(line) if there is none
+    """
+    next_letter = [len(line)] * (len(line) + 1)
+
+    for i in range(len(line) - 1, -1, -1):
+        next_letter[i] = i if is_letter(line[i]) else next_letter[i + 1]
+
+    return next_letter
+
+def is_promoter_start(line, position, next_letter):
+    """
+    Checks that a run of non-letters ending in a space starts at position and is followed by an uppercase letter or
+    'in-house'
+    """
+    letter = next_letter[position]
+
+    if letter - position < 2 or not line[letter - 1].isspace() or letter == len(line):
+        return False
+
+    return "A" <= line[letter] <= "Z" or line.startswith("in-house", letter)
+
+def is_new_event_line(line):
+    """
+    :param line: (str) one cleaned OCR line of the Boxscore table
+    :return: True if the line is the first line of an event
+    """
+    if not month_prefilter.search(line):
+        return False
+
+    next_letter = None
+
+    for start in find_month_starts(line):
+        if line[start:start + 1] not in MONTHS_BY_FIRST_CHAR:
+            continue
+
+        ends = set()
+        token_starts = {start}
+        for _ in range(MAX_MONTH_TOKENS):
+            token_ends = set()
+            for token_start in token_starts:
+                token_ends |= match_month_token(line, token_start)
+            ends |= token_ends
+            token_starts = token_ends
+
+        if not ends:
+            continue
+
+        if next_letter is None:
+            next_letter = build_next_letter_index(line)
+
+        for end in ends:
+            if is_promoter_start(line, end, next_letter):
+                return True
+            if end < len(line) and line[end].isspace() and is_promoter_start(line, end + 1, next_letter):              # optional space
+                return True
+
+    return False
@@ -0,0 +1,128 @@
+from etl.schemas.billboard_magazine_3.processing.number_words import classify_word
+from Levenshtein import distance as levenshtein_distance
+from functools import lru_cache
+import re
+
+'''
+Single pass lexer for consolidated Boxscore event lines. Every whitespace separated token is classified once into a
+typed Token that carries its kind and every flag the event parser branches on, so parse_event never runs a regex or an
+edit distance on a token it has already seen. Tokens are cached by text, the same words repeat across every issue.
+
+    Capital -> WORD, Nov. -> MONTH, 11-12 -> DAY_RANGE, $216,736 -> MONEY, ($216,736 -> CAD_MONEY, (19,114) -> CAPACITY,
+    13,983 -> NUMBER, two -> COUNT_WORD, sellout -> SELLOUT, | -> PIPE
+
+A kind only describes the shape of the token. Digits that could be a day or a count, ex. 3 in 'Nov. 3' and '3 shows',
+are DAY_RANGE if they have one or two digits and NUMBER otherwise, the parser decides from the flags where they go.
+'''
+
+PIPE = "PIPE"
+COUNT_WORD = "COUNT_WORD"                                                                                               # one, two, twenty-two... spelled out numbers
+SELLOUT = "SELLOUT"
+CAD_MONEY = "CAD_MONEY"                                                                                                 # ($216,736 Canadian)
+CAPACITY = "CAPACITY"                                                                                                   # (19,114)
+MONEY = "MONEY"
+MONTH = "MONTH"
+DAY_RANGE = "DAY_RANGE"                                                                                                 # 11-12
+NUMBER = "NUMBER"                                                                                                       # attendance and other figures, 13,983
+WORD = "WORD"
+
+months_pattern = r'\b(?:Jan|Feb|March|April|May|June|July|Aug|Sept|Oct|Nov|Dec)[\.,\b]?'
+month_regex = re.compile(months_pattern)
+location_word_regex = re.compile("[^0-9-/]+$")
+decimal_regex = re.compile(r"\d+\.\d+")
+attendance_regex = re.compile(r"^[\d,]+$")
+artist_end_regex = re.compile(r"[a-z\d$]")
+all_caps_regex = re.compile(r"^[A-Z:,.]+$")
+digit_regex = re.compile("[0-9]")
+cad_money_regex = re.compile(r"\(\$\d*,\d*")
+capacity_regex = re.compile(r"\(\d+,?.?\d+\)")
+day_range_regex = re.compile(r"\d{1,2}(?:-\d{1,2})?[.,]?")
+number_regex = re.compile(r"\d[\d,.]*")
+
+LEXER_CACHE_SIZE = 16384
+
+class Token:
+    __slots__ = (
+        "text", "kind", "number", "metric", "is_month", "starts_digit", "has_digit", "is_decimal", "is_location_word",
+        "is_money", "is_cad_money", "is_capacity", "is_sellout", "is_all_caps", "is_attendance", "ends_artist",
+        "near_promotions"
+    )
+
+    def __init__(self, text):
+        word_class = classify_word(text)
+        self.text = text
+        self.number = word_class["number"]
+        self.metric = word_class["metric"]
+        self.is_sellout = word_class["is_sellout"]
+        self.is_month = month_regex.search(text) is not None
+        self.starts_digit = text[:1] != "" and text[0] in "0123456789"
+        self.has_digit = digit_regex.search(text) is not None
+        self.is_decimal = decimal_regex.search(text) is not None
+        self.is_location_word = location_word_regex.fullmatch(text) is not None and not self.is_month
+        self.is_money = text.startswith("$")
+        self.is_cad_money = cad_money_regex.search(text) is not None
+        self.is_capacity = capacity_regex.search(text) is not None
+        self.is_all_caps = all_caps_regex.fullmatch(text) is not None
+        self.is_attendance = attendance_regex.match(text) is not None
+        self.ends_artist = artist_end_regex.search(text) is not None
+        self.near_promotions = levenshtein_distance(text, "Promotions") < 2
+        self.kind = get_kind(self)
+
+    @property
+    def is_count_word(self):
+        return self.number is not None
+
+    def __bool__(self):
+        return self.text != ""
+
+    def __str__(self):
+        return self.text
+
+    def __repr__(self):
+        return f"Token({self.kind}, {self.text!r})"
+
+def get_kind(token):
+    if token.text == "|":
+        return PIPE
+    if token.is_count_word and not token.starts_digit:
+        return COUNT_WORD
+    if token.is_sellout:
+        return SELLOUT
+    if token.is_cad_money:
+        return CAD_MONEY
+    if token.is_capacity:
+        return CAPACITY
+    if token.is_money:
+        return MONEY
+    if token.is_month:
+        return MONTH
+    if day_range_regex.fullmatch(token.text):
+        return DAY_RANGE
+    if number_regex.fullmatch(token.text):
+        return NUMBER
+    return WORD
+
+@lru_cache(maxsize=LEXER_CACHE_SIZE)
+def classify(text):
+    """
+    :param text: (str) one token of an event line
+    :return: (Token) the classified token, shared by every occurrence of the same text
+    """
+    return Token(text)
+
+def tokenize(line):
+    """
+    :param line: (str) a consolidated event line, or the part of it after the artist
+    :return: list of Tokens
+    """
+    return [classify(text) for text in line.split()]
+
+def iter_tokens(line):
+    """
+    Classifies the tokens one at a time as they are taken, so a caller can stop before classifying the rest of the line
+
+    :param line: (str) a consolidated event line, or the part of it after the artist
+    :return: generator of Tokens
+    """
+    for text in line.split():
+        yield classify(text)
@@ -0,0 +1,118 @@
+from Levenshtein import distance as levenshtein_distance
+from word2number import w2n
+from functools import lru_cache
+
+'''
+Classifies the count words of Boxscore events, ex. 'two sellouts', 'three shows'. Every word is mapped to its number
+value, the event field it counts (num_sellouts or num_shows) and whether it reads as 'sellout'. Number words, keywords
+and their known OCR misspellings are precomputed into a lookup table, so the common words never raise through
+word2number or run an edit distance, and words outside the table are classified once and kept in an LRU cache.
+'''
+
+NUMBER_WORDS = dict(w2n.american_number_system)
+KEYWORDS = ["sellout", "sellouts", "shows"]
+OCR_MISSPELLINGS = ["seHtouts", "setlouts", "seflout", "Sellout", "Sellouts", "Shows"]
+WORD_CACHE_SIZE = 8192
+
+lookup_counts = {"table_hits": 0}
+
+def parse_number(text):
+    """
+    Reads a word the way word2number does, without raising for words that hold no number word
+
+    :param text: (str) ex. 'two', 'twenty-two', '3'
+    :return: the number, None if the word is not a number
+    """
+    number_sentence = text.replace("-", " ").lower()
+
+    if number_sentence.isdigit():
+        try:
+            return int(number_sentence)
+        except ValueError:                                                                                              # unicode digits like '²' are not ints
+            return None
+
+    if not any(word in NUMBER_WORDS for word in number_sentence.split()):
+        return None
+
+    try:
+        return w2n.word_to_num(text)
+    except ValueError:                                                                                                  # malformed combinations, ex. 'thousand thousand'
+        return None
+
+def get_metric(text):
+    """
+    :param text: (str) the word after a count, ex. 'sellouts'
+    :return: (str) the event field the count goes into, None if the word is neither sellouts nor shows
+    """
+    if text == "sellouts":
+        return "num_sellouts"
+    if text == "shows":
+        return "num_shows"
+    if levenshtein_distance(text, "sellouts") <= 3:
+        return "num_sellouts"
+    if levenshtein_distance(text, "shows") <= 3:
+        return "num_shows"
+    return None
+
+def compute_word_class(text):
+    return {
+        "number": parse_number(text),
+        "metric": get_metric(text),
+        "is_sellout": levenshtein_distance(text, "sellout") < 2,
+    }
+
+def build_word_table():
+    """
+    :return: (dict) {word: word class} for every number word, in lower, title and upper case, and every keyword and
+        known OCR misspelling
+    """
+    words = set(KEYWORDS + OCR_MISSPELLINGS)
+    for word in NUMBER_WORDS:
+        words.update([word, word.title(), word.upper()])
+
+    return {word: compute_word_class(word) for word in words}
+
+WORD_TABLE = build_word_table()
+
+@lru_cache(maxsize=WORD_CACHE_SIZE)
+def classify_unseen_word(text):
+    return compute_word_class(text)
+
+def classify_word(text):
+    """
+    :param text: (str) one token
+    :return: (dict) {"number": value or None, "metric": "num_sellouts", "num_shows" or None, "is_sellout": bool}.
+        The dict is shared by every lookup of the word, do not modify it
+    """
+    word_class = WORD_TABLE.get(text)
+
+    if word_class is not None:
+        lookup_counts["table_hits"] += 1
+        return word_class
+
+    return classify_unseen_word(text)
+
+def is_number_word(text):
+    """
+    :param text: a token, or None
+    :return: True if the token spells out a number
+    """
+    return isinstance(text, str) and classify_word(text)["number"] is not None
+
+def get_lookup_stats():
+    """
+    :return: (dict) table hits, cache hits, cache misses and the fraction of lookups that did not classify a new word
+    """
+    cache_info = classify_unseen_word.cache_info()
+    num_lookups = lookup_counts["table_hits"] + cache_info.hits + cache_info.misses
+
+    return {
+        "table_hits": lookup_counts["table_hits"],
+        "cache_hits": cache_info.hits,
+        "cache_misses": cache_info.misses,
+        "hit_rate": (lookup_counts["table_hits"] + cache_info.hits) / num_lookups if num_lookups else 0.0,
+    }
+
+def reset_lookup_stats():
+    lookup_counts["table_hits"] = 0
+    classify_unseen_word.cache_clear()
@@ -1,36 +1,47 @@
-import pdfplumber
-import io
 import re
-from etl.utils.s3_utils import client
+from etl.utils.s3_utils import client, download_to_temp_file, list_s3_objects
+from etl.utils.manifest import open_manifest, load_manifest, needs_processing, record_processed, MANIFEST_PATH
 from config import BUCKET_NAME
-import pandas as pd
 import json
-from Levenshtein import distance as levenshtein_distance
 import logging
-from word2number import w2n
+import os
 import pytesseract
-from etl.utils.utils import extract_text_ocr
+from etl.ocr.page_cache import hash_pdf, DEFAULT_DPI
+from etl.ocr.text_cache import load_ocr_text, lookup_source_hash, save_source_hash
+from etl.ocr.words import load_words
+from etl.ocr.locator import locate_table_page, lookup_table_page, get_issue_date
+from functools import partial
+from datetime import date
+from etl.ocr.regions import extract_table_text_ocr, extract_table_text_job, TABLE_REGION_CONFIG
+from etl.ocr.engine import ocr_pdf_low_memory, low_memory_enabled
+from etl.schemas.errors import EventParsingError, ParseTimeoutError
+from etl.schemas.watchdog import with_deadline, get_deadline, is_past, quarantine_line, EVENT_TIME_BUDGET, ISSUE_TIME_BUDGET, QUARANTINE_PATH
+from etl.schemas.billboard_magazine_3.processing.lexer import iter_tokens, PIPE
+from etl.schemas.billboard_magazine_3.processing.number_words import is_number_word
+from etl.schemas.billboard_magazine_3.processing.event_lines import is_new_event_line
+from etl.schemas.billboard_magazine_3.processing.event_batch import build_event_batch, serialize_event_batch
+from etl.utils.processed import get_processed_key, DEFAULT_PROCESSED_FORMAT
 logger = logging.getLogger()
 
 '''
 This parser is for the Billboard Boxscore schema that ran from 1984-10-20 to 2001-07-21
 '''
 
-class ParsingError(Exception):
-    """Base class for parsing errors"""
-
-class FileParsingError(ParsingError):
-    """Raised when the entire file should be skipped"""
-
-class EventParsingError(ParsingError):
-    """Raised when just the current tour should be skipped"""
-
 pytesseract.pytesseract.tesseract_cmd = r"C:\Users\mquig\AppData\Local\Programs\Tesseract-OCR\tesseract.exe"
 
 directory_prefix = "raw/billboard/pdf/magazines/"
 
 object_key = 'raw/billboard/pdf/magazines/1984/11/BB-1984-11-03.pdf'
-page_num = 55
+
+BOXSCORE_TABLE_NAME = "billboard_boxscore"
+BOXSCORE_MARKERS = ["Boxscore", "ARTIST(S) Venue Date(s)"]
+BOXSCORE_HEADER_MARKERS = ["ARTIST(S) Venue Date(s)"]
+BOXSCORE_DEFAULT_PAGE = 55
+
+COLUMN_PARSER_ENV = "ETL_BB3_COLUMN_PARSER"
+PARSER_VERSION = "bb_3-1"                                                                                               # bump when a parser change should re-process every issue
+SCHEMA_START = date(1984, 10, 20)
+SCHEMA_END = date(2001, 7, 21)
 
 '''
     Every tour has:
@@ -47,10 +58,6 @@ page_num = 55
 
 months = ["Jan.", "Feb.", "March", "April", "May", "June", "July", "Aug.", "Sept.", "Oct.", "Nov.", "Dec."]
 
-months_pattern = r'\b(?:Jan|Feb|March|April|May|June|July|Aug|Sept|Oct|Nov|Dec)[\.,\b]?'
-
-new_event_pattern = re.compile(r"^[^a-z]*\s([^0-9]*\s)*((?:j|J(?:an|qn)|F(?:eb|eh)|Ma(?:r|rch|rc|rn|vch|tch)|A(?:pr|pril|prl|or|ar)|May|(?:Ju|du|tu|Su)(?:n|ne|u|l|ly)|Au(?:g|gg|uq)|S(?:ep|ept|eph)|O(?:ct|oet|oct)|N(?:ov|ow|no)|D(?:e[ceo]|ec|ee))[.,]?\s?.{1,2}-?){1,2}\s?[^A-Za-z]+\s(in-house|[A-Z])")
-
 def extract_raw_event_lines(page_lines, should_save):
     """
     Extracts the top boxoffice table lines
@@ -87,7 +94,7 @@ def consolidate_events(event_lines):
 
         for line in event_lines:
             line = clean_event(line)
-            if new_event_pattern.search(line):           # only the first line of a tour contains the date of the tour:
+            if is_new_event_line(line):                 # only the first line of a tour contains the date of the tour:
                 if len(next_event) > 0:
                     events.append(" | ".join(next_event))
                 next_event = []
@@ -105,24 +112,24 @@ def parse_location(event_data, next_item, it):
     """
     Pieces together the venue name, stops once it reaches a month name
     :param event_data: the tour data dictionary of the current tour being processed
-    :param next_item: the next item in the tour iterator
-    :param it: the iterator of tour data
+    :param next_item: the next token in the tour iterator
+    :param it: the iterator of tour tokens
     :return: the updated next_item in the iterator
     """
     if not next_item:
         return
     next_location_line = []                                                                                 # group the next set of location data
-    next_location_line.append(next_item)
+    next_location_line.append(next_item.text)
 
     # while no month is in the next item
     while True:
         next_item = next(it, None)                                                                         # if next item is none, reached the end of the tour data
-        if not next_item or next_item == "|":
+        if not next_item or next_item.kind == PIPE:
             break
-        if not re.fullmatch("[^0-9-/]+$", next_item) or re.search(months_pattern, next_item):       # if next item has numbers or a month, move on
+        if not next_item.is_location_word:                                                                 # if next item has numbers or a month, move on
             print(f"Breaking in parse_location because next_item: {next_item}")
             break
-        next_location_line.append(next_item)                                                               # otherwise, add next item to the new location list
+        next_location_line.append(next_item.text)                                                          # otherwise, add next item to the new location list
 
     event_data["location"].append(" ".join(next_location_line))                                             # group the next set of location items and add the string to location
     return next_item
@@ -131,17 +138,17 @@ def parse_date(event_data, next_item, it):
     """
     Extracts the month, first, and last day of the event
     :param event_data: the event data dictionary of the current tour being processed
-    :param next_item: the next item in the tour iterator
-    :param it: the iterator of tour data
+    :param next_item: the next token in the tour iterator
+    :param it: the iterator of tour tokens
     :return:
     """
     if not next_item:
         return
     next_data_line = []
 
-    if re.search(r"\d+\.\d+", next_item):
+    if next_item.is_decimal:
         return next(it, None)
-    next_data_line.append(next_item)
+    next_data_line.append(next_item.text)
 
     # while there is a month or starts with a number
     while True:
@@ -149,12 +156,12 @@ def parse_date(event_data, next_item, it):
         if not next_item:
             break
         # if there is no month or no number in the next_item, break
-        if not re.search(months_pattern, next_item) and not re.search("^[0-9]", next_item):
+        if not next_item.is_month and not next_item.starts_digit:
             print(f"No month or number in next item: {next_item}")
             break
-        if re.search(r"\d+\.\d+", next_item):
+        if next_item.is_decimal:
             break
-        next_data_line.append(next_item)
+        next_data_line.append(next_item.text)
 
     event_data["dates"].append(" ".join(next_data_line))
     return next_item
@@ -166,9 +173,9 @@ def parse_gross_receipts_us(event_data, next_item):
     :return:
     """
 
-    if next_item and next_item.startswith("$"):
+    if next_item and next_item.is_money:
         try:
-            event_data["gross_receipts_us"] = float(next_item.replace("$", "").replace(",", ""))
+            event_data["gross_receipts_us"] = float(next_item.text.replace("$", "").replace(",", ""))
         except ValueError:
             pass
 
@@ -179,8 +186,8 @@ def parse_attendance(event_data, next_item):
     :param next_item:
     :return:
     '''
-    if next_item and re.match(r"^[\d,]+$", next_item):
-        event_data["attendance"] = float(next_item.replace(",", ""))
+    if next_item and next_item.is_attendance:
+        event_data["attendance"] = float(next_item.text.replace(",", ""))
     else:
         logger.error(f"Attendance = {next_item}, leaving attendance as None")
 
@@ -194,15 +201,15 @@ def parse_additional_artist(event_data, next_item, it):
     :return:
     """
     next_artist_line = []
-    next_artist_line.append(next_item)
+    next_artist_line.append(next_item.text)
 
     while True:
         next_item = next(it, None)
-        if not next_item or next_item == "|":
+        if not next_item or next_item.kind == PIPE:
             break
-        if re.search(r"[a-z\d$]", next_item):
+        if next_item.ends_artist:
             break
-        next_artist_line.append(next_item)
+        next_artist_line.append(next_item.text)
 
     event_data["artists"].append(" ".join(next_artist_line))
 
@@ -217,15 +224,15 @@ def parse_ticket_prices(event_data, ticket_price, it):
     :param it:
     :return:
     '''
-    ticket_price = ticket_price.replace("$", "")
+    ticket_price = ticket_price.text.replace("$", "")
 
     next_item = next(it, None)
     if re.search(r"^0-9\$,./-", ticket_price):
         logger.warning(f"Ticket prices = {ticket_price}, setting it back to None")
     else:
-        if next_item and next_item == "&":
+        if next_item and next_item.text == "&":
             ticket_price_2 = next(it, None)
-            event_data["ticket_prices"].append(ticket_price + " & " + ticket_price_2)
+            event_data["ticket_prices"].append(ticket_price + " & " + ticket_price_2.text)
         else:
             event_data["ticket_prices"].append(ticket_price)
 
@@ -241,8 +248,8 @@ def parse_canadian_gross(event_data, gross_receipts_canadian, it):
     '''
     next_item = next(it, None)
     print(f"In parse_canadian_gross: next item = {next_item}")
-    if next_item == "Canadian)":
-        event_data["gross_receipts_canadian"] = int(gross_receipts_canadian.replace("(", "").replace(",", "").replace("$", ""))
+    if next_item and next_item.text == "Canadian)":
+        event_data["gross_receipts_canadian"] = int(gross_receipts_canadian.text.replace("(", "").replace(",", "").replace("$", ""))
 
     next_item = next(it, None)
     return next_item
@@ -255,7 +262,7 @@ def parse_capacity(event_data, next_item):
     :param next_item:
     :return:
     '''
-    capacity = re.sub("[(),]", "", next_item)
+    capacity = re.sub("[(),]", "", next_item.text)
     if capacity.isdigit():
         if event_data["attendance"] is not None and int(capacity) < event_data["attendance"]:
             logger.warning(f"Capacity = {capacity} but attendance = {event_data["attendance"]} for tour, setting capacity back to None")
@@ -274,15 +281,8 @@ def parse_num_sellouts_shows(event_data, number_text, it):
     :return:
     '''
     metric = next(it, None)
-    number = w2n.word_to_num(number_text)
-    if metric == "sellouts":
-        event_data["num_sellouts"] = int(number)
-    elif metric == "shows":
-        event_data["num_shows"] = int(number)
-    elif levenshtein_distance(metric, "sellouts") <= 3:
-        event_data["num_sellouts"] = int(number)
-    elif levenshtein_distance(metric, "shows") <= 3:
-        event_data["num_shows"] = int(number)
+    if metric.metric is not None:
+        event_data[metric.metric] = int(number_text.number)
 
     next_item = next(it, None)
     return next_item
@@ -297,8 +297,8 @@ def parse_promoter(event_data, next_item, it):
     :return:
     '''
     next_promoter_line = []
-    while next_item and next_item != "|":
-        next_promoter_line.append(next_item)
+    while next_item and next_item.kind != PIPE:
+        next_promoter_line.append(next_item.text)
         next_item = next(it, None)
 
     event_data["promoter"].append(" ".join(next_promoter_line))
@@ -341,56 +341,58 @@ def clean_event(line):
 
 def is_number_text(text):
     '''
-    Tries converting a word to a number
+    Checks if a word spells out a number
     :param text: a string
-    :return: Yes if successfully converted to a number, otherwise False
+    :return: True if the word is a number, otherwise False
     '''
-    try:
-        w2n.word_to_num(text)
-        return True
-    except ValueError:
-        return False
+    return is_number_word(text)
 
 def parse_additional_lines(event_data, next_item, it):
     '''
     Parses all data for consolidated tour line after the first pipe delimiter
 
     :param tour_data: a dictionary with a key for each section of the tour data
-    :param next_item: the next item in the consolidated tour string
-    :param it: the iterator of the tour string
+    :param next_item: the next token in the consolidated tour string
+    :param it: the iterator of the tour tokens
     '''
     try:
-        if not next_item or next_item == '|':
+        if not next_item or next_item.kind == PIPE:
             return
-        if is_number_text(next_item):
+        if next_item.is_count_word:
             parse_num_sellouts_shows(event_data, next_item, it)
             return
-        if re.fullmatch(r"^[A-Z:,.]+$", next_item):
+        if next_item.is_all_caps:
             next_item = parse_additional_artist(event_data, next_item, it)
         # if next item has no numbers, it should be additional venue/location data
-        if next_item != "|" and not re.search("[0-9]", next_item) or levenshtein_distance(next_item, "Promotions") < 2:
+        if next_item.kind != PIPE and not next_item.has_digit or next_item.near_promotions:
             next_item = parse_location(event_data, next_item, it)
-        if re.search(months_pattern, next_item) or re.search(r"^[0-9]", next_item):
+        if next_item.is_month or next_item.starts_digit:
             next_item = parse_date(event_data, next_item, it)
         # if next item starts with dollar sign, it is ticket prices
-        if re.search(r"^\$", next_item):
+        if next_item.is_money:
             next_item = parse_ticket_prices(event_data, next_item, it)
-        if re.search(r"\(\$\d*,\d*", next_item):
+        if next_item.is_cad_money:
             next_item = parse_canadian_gross(event_data, next_item, it)
-        if re.search(r"\(\d+,?.?\d+\)", next_item):
+        if next_item.is_capacity:
             parse_capacity(event_data, next_item)
             next_item = next(it, None)
-        if levenshtein_distance(next_item, 'sellout') < 2:
+        if next_item.is_sellout:
             event_data["num_sellouts"] = 1
             next_item = next(it, None)
-        if is_number_text(next_item):
+        if next_item.is_count_word:
             next_item = parse_num_sellouts_shows(event_data, next_item, it)
-        if re.search(r"[0-9]", next_item):
+        if next_item.has_digit:
             parse_promoter(event_data, next_item, it)
-    except TypeError as e:
-        print(f"TypeError = {e}. Next item = {next_item}")
+    except (TypeError, AttributeError) as e:                                                                            # AttributeError: the event ran out of tokens
+        print(f"{type(e).__name__} = {e}. Next item = {next_item}")
 
-def parse_event(event_str):
+def parse_event(event_str, object_key=object_key, deadline=None):
+    """
+    :param event_str: a consolidated event line
+    :param object_key: the s3 key of the raw pdf the line came from
+    :param deadline: (float) time.perf_counter deadline from etl.schemas.watchdog, None to parse without a time budget
+    :raises ParseTimeoutError: if the event is still being parsed at the deadline
+    """
     event_data = new_event_state(BUCKET_NAME, object_key)
     line = clean_event(event_str)
 
@@ -399,8 +401,9 @@ def parse_event(event_str):
         return None
     first_lowercase_idx = first_lowercase.start()
     event_data["artists"].append(line[0:first_lowercase_idx - 2])
-    rest_of_line = line[first_lowercase_idx - 1:].split()
-    it = iter(rest_of_line)
+    it = iter_tokens(line[first_lowercase_idx - 1:])
+    if deadline is not None:
+        it = with_deadline(it, deadline)
     next_item = next(it, None)
     next_item = parse_location(event_data, next_item, it)
     next_item = parse_date(event_data, next_item, it)
@@ -415,85 +418,222 @@ def parse_event(event_str):
 
     return event_data
 
-def parse_events(tour_lines):
+def parse_events(tour_lines, object_key=object_key, event_budget=EVENT_TIME_BUDGET, issue_budget=ISSUE_TIME_BUDGET, quarantine_path=QUARANTINE_PATH):
     '''
     Takes a string of consolidated tour lines and returns a list with a dictionary for each object
     Each component of the tour is divided into a separate key and value.
+    Lines that run past the event or issue time budget are quarantined and left out
 
     :param tour_lines: a list of consolidated tour lines
+    :param object_key: the s3 key of the raw pdf the lines came from
+    :param event_budget: (float) seconds each line may take, None for no limit
+    :param issue_budget: (float) seconds all lines of the issue may take, None for no limit
+    :param quarantine_path: (str) the quarantine file, see etl.schemas.watchdog
     :return: a list of dictionaries with each tour's data broken into separate key and value
     '''
     event_objs = []
+    issue_deadline = get_deadline(issue_budget)
+
+    for offset, line in enumerate(tour_lines):
+        if is_past(issue_deadline):
+            logger.warning(f"Issue time budget exceeded, quarantining line {offset} of {object_key}")
+            quarantine_line(object_key, offset, line, "issue time budget exceeded", quarantine_path)
+            continue
 
-    for line in tour_lines:
         try:
-            parsed_event = parse_event(line)
+            parsed_event = parse_event(line, object_key, get_deadline(event_budget, issue_deadline))
             print(parsed_event)
             event_objs.append(parsed_event)
+        except ParseTimeoutError as e:
+            logger.warning(f"Quarantining line {offset} of {object_key}: {e}")
+            quarantine_line(object_key, offset, line, str(e), quarantine_path)
         except EventParsingError as e:
             logger.warning(f"Skipping tour due to parsing error: {e}")
 
     return event_objs
 
-def extract_to_csv():
+def read_boxscore_text(object_key, etag=None):
     '''
+    Returns the OCR text of the Boxscore table, cropped out of its page. If the page has already been located and the
+    pdf has not changed since it was last read, the text comes from the OCR text cache without downloading the pdf again.
+    In low memory mode the table is cropped and read by a memory capped worker instead of in this process
 
-    :return:
+    :param object_key: the s3 key of the raw pdf
+    :param etag: the ETag of the raw pdf if already known from a listing
+    :return: the OCR text of the page, None if the Boxscore page could not be found
     '''
-    try:
-        obj = client.get_object(Bucket=BUCKET_NAME, Key=object_key)
-        pdf_bytes = obj['Body'].read()
-        pdf_file = io.BytesIO(pdf_bytes)
+    etag = etag or client.head_object(Bucket=BUCKET_NAME, Key=object_key)["ETag"]
+    pdf_hash = lookup_source_hash(object_key, etag)
+    boxscore_page = lookup_table_page(object_key, BOXSCORE_TABLE_NAME)
+
+    if pdf_hash and boxscore_page:
+        page_text = load_ocr_text(pdf_hash, boxscore_page, DEFAULT_DPI, TABLE_REGION_CONFIG)
+        if page_text is not None:
+            print(f"Using cached OCR text for {object_key} page {boxscore_page}")
+            return page_text
+
+    # stream the pdf to disk instead of reading it into memory, pages are rendered from the file
+    with download_to_temp_file(object_key, ".pdf") as pdf_path:
+        pdf_hash = hash_pdf(pdf_path)
+        save_source_hash(object_key, etag, pdf_hash)
+
+        if boxscore_page is None:
+            boxscore_page = locate_table_page(pdf_path, object_key, BOXSCORE_TABLE_NAME, BOXSCORE_MARKERS, BOXSCORE_DEFAULT_PAGE)
+            if boxscore_page is None:
+                return None
+
+        era = f"{BOXSCORE_TABLE_NAME}-{object_key.split('/')[4]}"
 
-        with (pdfplumber.open(pdf_file) as pdf):
-            # loop through every page, see if any of them say "Top Boxoffice"
-            # if not, try again but with OCR
-            # if still not found, log comment and move on to next file
-            #boxoffice_page = find_boxoffice_table(pdf, pdf_bytes)
+        if low_memory_enabled():
+            read_table = partial(extract_table_text_job, era=era, markers=BOXSCORE_HEADER_MARKERS)
+            return ocr_pdf_low_memory(pdf_path, [boxscore_page], max_workers=1, pdf_hash=pdf_hash, ocr_fn=read_table)[boxscore_page]
 
-            # magazine two is page 57
-            page_text = extract_text_ocr(pdf_bytes, page_num)
+        return extract_table_text_ocr(pdf_path, boxscore_page, era, BOXSCORE_HEADER_MARKERS, pdf_hash=pdf_hash)
 
-            print(page_text)
+def read_boxscore_events(object_key, etag=None):
+    '''
+    Parses the Boxscore events from the OCR text of the table
 
-            lines = page_text.splitlines()
+    :param object_key: the s3 key of the raw pdf
+    :param etag: the ETag of the raw pdf if already known
+    :return: list of event dictionaries, None if the Boxscore page could not be found
+    '''
+    page_text = read_boxscore_text(object_key, etag)
 
-            event_lines = extract_raw_event_lines(lines, False)
+    if page_text is None:
+        return None
 
-            #with open("raw_event_lines.json", "r") as f:
-            #    event_lines = json.load(f)
+    print(page_text)
 
-            consolidated_event_lines = consolidate_events(event_lines)
+    lines = page_text.splitlines()
 
-            for event in consolidated_event_lines:
-                print(event)
+    event_lines = extract_raw_event_lines(lines, False)
 
-            event_objs = parse_events(consolidated_event_lines)
+    #with open("raw_event_lines.json", "r") as f:
+    #    event_lines = json.load(f)
 
-            events_df = pd.DataFrame(event_objs)
-        
-            file_name = object_key.split('/')[-1]
-            csv_file_name = file_name.replace('.pdf', '.csv')
+    consolidated_event_lines = consolidate_events(event_lines)
 
-            csv_buffer = io.StringIO()
-            events_df.to_csv(csv_buffer, index=False)
+    for event in consolidated_event_lines:
+        print(event)
 
-            year = object_key.split('/')[4]
-            month = object_key.split('/')[5]
+    return parse_events(consolidated_event_lines, object_key)
 
-            try:
-                client.put_object(
-                    Bucket="music-industry-data-lake",
-                    Key=f"processed/billboard/magazines/{year}/{month}/" + csv_file_name,
-                    Body=csv_buffer.getvalue(),
-                )
-                print("Saved all tours report")
-            except Exception as e:
-                print(f"Error uploading file: {e}")
+def column_parser_enabled():
+    '''
+    :return: (bool) True if the Boxscore should be parsed by column from word boxes instead of from the page text
+    '''
+    return os.environ.get(COLUMN_PARSER_ENV, "").lower() in ("1", "true", "yes")
+
+def read_boxscore_events_by_column(object_key, etag=None):
+    '''
+    Parses the Boxscore events with the column-aware parser. If the page has already been located and its words have
+    been read, they come from the word cache without downloading the pdf again
+
+    :param object_key: the s3 key of the raw pdf
+    :param etag: the ETag of the raw pdf if already known from a listing
+    :return: list of event dictionaries, None if the Boxscore page could not be found
+    '''
+    # imported here because columns imports its field parsers from this module
+    from etl.schemas.billboard_magazine_3.processing.columns import parse_boxscore_page, parse_boxscore_words
+
+    etag = etag or client.head_object(Bucket=BUCKET_NAME, Key=object_key)["ETag"]
+    pdf_hash = lookup_source_hash(object_key, etag)
+    boxscore_page = lookup_table_page(object_key, BOXSCORE_TABLE_NAME)
+
+    if pdf_hash and boxscore_page:
+        words = load_words(pdf_hash, boxscore_page, DEFAULT_DPI)
+        if words is not None:
+            print(f"Using cached OCR words for {object_key} page {boxscore_page}")
+            return parse_boxscore_words(words, object_key)
+
+    with download_to_temp_file(object_key, ".pdf") as pdf_path:
+        pdf_hash = hash_pdf(pdf_path)
+        save_source_hash(object_key, etag, pdf_hash)
+
+        if boxscore_page is None:
+            boxscore_page = locate_table_page(pdf_path, object_key, BOXSCORE_TABLE_NAME, BOXSCORE_MARKERS, BOXSCORE_DEFAULT_PAGE)
+            if boxscore_page is None:
+                return None
+
+        return parse_boxscore_page(pdf_path, boxscore_page, object_key, pdf_hash=pdf_hash)
+
+def extract_to_csv(object_key=object_key, etag=None, file_format=DEFAULT_PROCESSED_FORMAT):
+    '''
+    Extracts the Boxscore events of one issue and uploads them to the processed layer
+    With ETL_BB3_COLUMN_PARSER set, the events are parsed by column from the word boxes of the page, see columns.py
+
+    :param object_key: the s3 key of the raw pdf
+    :param etag: the ETag of the raw pdf if already known
+    :param file_format: 'parquet', with native list columns, or 'csv'
+    :return: the s3 key of the processed file, None if the issue could not be processed
+    '''
+    try:
+        if column_parser_enabled():
+            events = read_boxscore_events_by_column(object_key, etag)
+        else:
+            events = read_boxscore_events(object_key, etag)
+
+        if events is None:
+            return
+
+        events_batch = build_event_batch(events)
+
+        output_key = get_processed_key(object_key, file_format)
+
+        try:
+            client.put_object(
+                Bucket="music-industry-data-lake",
+                Key=output_key,
+                Body=serialize_event_batch(events_batch, file_format),
+            )
+            print("Saved all tours report")
+            return output_key
+        except Exception as e:
+            print(f"Error uploading file: {e}")
 
     except client.exceptions.NoSuchKey:
         print(f"Error: Object '{object_key}' not found in bucket '{BUCKET_NAME}'")
-        exit()
     except Exception as e:
         print(f"Error retrieving object: {e}")
-        exit()
\ No newline at end of file
+
+    return None
+
+def is_schema_issue(object_key):
+    issue_date = get_issue_date(object_key)
+    return object_key.endswith(".pdf") and issue_date is not None and SCHEMA_START <= issue_date <= SCHEMA_END
+
+def extract_new_issues(prefix=directory_prefix, manifest_path=MANIFEST_PATH, force=False):
+    '''
+    Processes every Boxscore issue under the prefix that is new, changed since it was last processed, or was processed
+    by an older parser version. Issues recorded in the manifest as unchanged are skipped without being downloaded
+
+    :param prefix: the s3 prefix of the raw pdfs
+    :param manifest_path: (str)
+    :param force: (bool) process every issue regardless of the manifest
+    :return: (dict) number of issues processed, skipped and failed
+    '''
+    conn = open_manifest(manifest_path)
+    manifest = load_manifest(conn)
+    counts = {"processed": 0, "skipped": 0, "failed": 0}
+
+    try:
+        for raw_key, etag in list_s3_objects(prefix):
+            if not is_schema_issue(raw_key):
+                continue
+            if not force and not needs_processing(manifest.get(raw_key), etag, PARSER_VERSION):
+                counts["skipped"] += 1
+                continue
+
+            output_key = extract_to_csv(raw_key, etag)
+            if output_key is None:
+                counts["failed"] += 1
+                continue
+
+            record_processed(conn, raw_key, etag, PARSER_VERSION, output_key, lookup_source_hash(raw_key, etag))
+            counts["processed"] += 1
+    finally:
+        conn.close()
+
+    print(f"Processed {counts['processed']} issues, skipped {counts['skipped']} unchanged, {counts['failed']} failed")
+    return counts
\ No newline at end of file
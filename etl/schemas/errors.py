@@ -0,0 +1,18 @@
+'''
+Parsing errors shared by every schema parser
+'''
+
+class ParsingError(Exception):
+    """Base class for parsing errors"""
+
+class FileParsingError(ParsingError):
+    """Raised when the entire file should be skipped"""
+
+class EventParsingError(ParsingError):
+    """Raised when just the current event should be skipped"""
+
+class TourParsingError(EventParsingError):
+    """Raised when just the current tour should be skipped, used by the schemas that list tours instead of events"""
+
+class ParseTimeoutError(EventParsingError):
+    """Raised when an event runs past its parse time budget, the event is quarantined instead of parsed"""
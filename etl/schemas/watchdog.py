@@ -0,0 +1,85 @@
+from etl.schemas.errors import ParseTimeoutError
+from datetime import datetime, timezone
+import json
+import time
+import os
+
+'''
+Time budgets for unattended parsing. Every event gets a deadline that is checked each time the parser takes its next
+token, so one malformed line cannot stall a worker, and every issue gets a budget for all of its events. Lines that run
+past either budget are appended to the quarantine file with their issue key and offset, to be looked at by hand, and
+the batch moves on to the next line or issue.
+
+Tokens are classified as they are taken, so the time spent classifying a token counts toward the budget and is checked
+before the parser sees it. The check cannot interrupt a token while it is being classified: an event can run past its
+deadline by the time of its slowest single token, and is stopped as soon as that token is done.
+
+Quarantine records, one JSON object per line:
+    {"issue_key": "raw/billboard/pdf/magazines/1984/11/BB-1984-11-03.pdf", "offset": 12, "line": "...",
+     "reason": "...", "quarantined_at": "..."}
+'''
+
+QUARANTINE_PATH = os.path.join(os.path.dirname(__file__), "..", "..", "data", "processed", "quarantine.jsonl")
+EVENT_TIME_BUDGET = 0.25                                                                                                # seconds, a normal event parses in well under a millisecond
+ISSUE_TIME_BUDGET = 30.0
+
+def get_deadline(budget, limit=None):
+    """
+    :param budget: (float) seconds from now, None for no budget
+    :param limit: (float) a deadline the new one cannot run past, ex. the issue deadline
+    :return: (float) the deadline on the time.perf_counter clock, None if there is no budget
+    """
+    if budget is None:
+        return limit
+
+    deadline = time.perf_counter() + budget
+    return deadline if limit is None else min(deadline, limit)
+
+def is_past(deadline):
+    return deadline is not None and time.perf_counter() > deadline
+
+def with_deadline(items, deadline):
+    """
+    Yields the items until the deadline passes. The deadline is checked after each item is produced, so pass a lazy
+    iterable to count the time spent producing the items, ex. iter_tokens rather than tokenize
+
+    :param items: iterable, ex. the tokens of an event
+    :param deadline: (float) from get_deadline, None for no deadline
+    :raises ParseTimeoutError: when the next item is produced after the deadline
+    """
+    for item in items:
+        if is_past(deadline):
+            raise ParseTimeoutError(f"Time budget exceeded at '{item}'")
+        yield item
+
+def quarantine_line(issue_key, offset, line, reason, path=QUARANTINE_PATH):
+    """
+    Appends a line that could not be parsed in time to the quarantine file
+
+    :param issue_key: (str) the s3 key of the raw pdf
+    :param offset: (int) index of the line among the event lines of the issue
+    :param line: (str)
+    :param reason: (str)
+    :param path: (str)
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    record = {
+        "issue_key": issue_key,
+        "offset": offset,
+        "line": line,
+        "reason": reason,
+        "quarantined_at": datetime.now(timezone.utc).isoformat(),
+    }
+
+    with open(path, "a", encoding="utf-8") as f:                                                                        # one short append per line, workers can share the file
+        f.write(json.dumps(record) + "\n")
+
+def load_quarantine(path=QUARANTINE_PATH):
+    """
+    :return: list of quarantine records, empty if nothing was quarantined
+    """
+    if not os.path.exists(path):
+        return []
+
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
@@ -0,0 +1,28 @@
+from etl.schemas.billboard_magazine_3.curation.location_lexicon import build_location_lexicon, get_location_lexicon
+from etl.schemas.billboard_magazine_3.curation.location import match_state_after_venue, correct_location_typos, isolate_venue_name
+import pytest
+
+LOCATION_ALIASES = {
+    "states": {"ariz": 3, "ariz.": 3},
+    "cities": {"buffalo": ["buttato"]},
+    "venue_types": {"auditorium": ["auditorium", "auditoriurn"]},
+}
+
+def test_lexicon_is_read_only():
+    lexicon = build_location_lexicon(LOCATION_ALIASES)
+
+    with pytest.raises(TypeError):
+        lexicon.state_aliases["ariz"] = 4
+    with pytest.raises(AttributeError):
+        lexicon.venue_types = {}
+
+def test_lexicon_is_built_once():
+    assert get_location_lexicon() is get_location_lexicon()
+    assert get_location_lexicon().build_seconds < 1.0
+
+def test_functions_use_given_lexicon():
+    lexicon = build_location_lexicon(LOCATION_ALIASES)
+
+    assert match_state_after_venue(["Civic", "Auditoriurn", "Tempe", "Ariz"], lexicon) == (3, ["Civic", "Auditoriurn", "Tempe"])
+    assert isolate_venue_name(["Civic", "Auditoriurn", "Tempe"], lexicon) == ["Civic", "Auditoriurn"]
+    assert correct_location_typos(["Buttato", "Memorial"], lexicon) == ["Buffalo", "Memorial"]
@@ -0,0 +1,49 @@
+from etl.schemas.billboard_magazine_3.curation.location_lexicon import build_location_lexicon
+from etl.schemas.billboard_magazine_3.curation.location import tag_location_tokens, match_city_after_venue, match_city_in_venue, potential_city_match_in_venue
+from etl.dimensions.location_utils import add_city_to_trie
+from etl.utils.utils import index_dimension
+
+LOCATION_ALIASES = {
+    "states": {"nev": 29},
+    "cities": {"st louis": ["st lous"]},
+    "venue_types": {"center": ["center", "centre"]},
+}
+
+def make_dim_cities(cities):
+    rows = [
+        {"id": str(city_id), "name": name, "slug": slug, "state_id": str(state_id)}
+        for city_id, (name, slug, state_id) in enumerate(cities, start=1)
+    ]
+    return {**index_dimension(rows, key_fn=lambda row: (row["slug"], int(row["state_id"]))), "max_id": len(rows)}
+
+def test_tag_location_tokens():
+    lexicon = build_location_lexicon(LOCATION_ALIASES)
+    dim_cities = make_dim_cities([("Las Vegas", "las-vegas", 29)])
+
+    spans = tag_location_tokens(["Civic", "Centre", "Las", "Vegas,", "Nev", "St", "Lous"], dim_cities, lexicon)
+
+    assert spans == [
+        (1, 2, "venue_type", "center"),
+        (2, 4, "city", "las-vegas"),
+        (4, 5, "state", 29),
+        (5, 7, "city_alias", "st louis"),
+    ]
+
+def test_city_matches_pick_the_same_windows():
+    lexicon = build_location_lexicon(LOCATION_ALIASES)
+    dim_cities = make_dim_cities([("Las Vegas", "las-vegas", 29), ("Vegas", "vegas", 29), ("Springfield", "springfield", 17), ("Springfield", "springfield", 25)])
+
+    assert match_city_after_venue(["Civic", "Center", "Las", "Vegas"], 29, dim_cities, lexicon) == (1, "Las Vegas", 2)
+    assert match_city_after_venue(["Civic", "Center", "Springfield"], None, dim_cities, lexicon) == (None, None, None)
+    assert match_city_in_venue(["Las", "Vegas", "Convention", "Center"], dim_cities, 29) == 2
+    assert potential_city_match_in_venue(["Las", "Vegas", "Convention", "Center"], dim_cities) == "Vegas"
+
+def test_appended_city_is_tagged():
+    lexicon = build_location_lexicon(LOCATION_ALIASES)
+    dim_cities = make_dim_cities([("Las Vegas", "las-vegas", 29)])
+    assert tag_location_tokens(["Reno"], dim_cities, lexicon) == []
+
+    dim_cities["by_slug"]["reno"] = [{"id": "2", "name": "Reno", "slug": "reno", "state_id": "29"}]
+    add_city_to_trie("reno", dim_cities)
+
+    assert tag_location_tokens(["Reno"], dim_cities, lexicon) == [(0, 1, "city", "reno")]
@@ -0,0 +1,29 @@
+from etl.schemas.billboard_magazine_3.curation.special_event import match_event_keywords, find_event_end_index, find_tag_index, parse_event_name
+
+def test_keywords_per_line():
+    keyword_matches = match_event_keywords(['BUDWEISER SUPERFEST:', 'PEABO BRYSON, KOOL &', 'VOL. 13'])
+
+    assert keyword_matches["lines"][0] == {"superfest", "fest"}
+    assert keyword_matches["lines"][1] == set()
+    assert {"vol", "vol."} <= keyword_matches["lines"][2]
+
+def test_keyword_spanning_lines_is_only_joined():
+    keyword_matches = match_event_keywords(['JAZZ FES', 'TIVAL'])
+
+    assert "festival" in keyword_matches["joined"]
+    assert all("festival" not in line_keywords for line_keywords in keyword_matches["lines"])
+
+def test_shared_match_for_index_lookups():
+    artist_lines = ['SWATCH WATCH: NEW YORK', 'CITY FRESH FESTIVAL', 'ROYAL DOO WOPP VOL. 13']
+    keyword_matches = match_event_keywords(artist_lines)
+
+    assert find_event_end_index(artist_lines, ["festival", "show"], keyword_matches) == 1
+    assert find_event_end_index(artist_lines, ["festival", "show"]) == 1
+    assert find_tag_index(artist_lines, ["vol."], keyword_matches) == 2
+    assert find_tag_index(artist_lines, ["doo wopp"]) == 2                                                              # not an event keyword
+
+def test_special_event_alias():
+    event_name, artists = parse_event_name(['LOLLAPALOOZA:', 'LIVING COLOUR', 'FISHBONE'], None)
+
+    assert event_name == "Lollapalooza"
+    assert artists == ['LIVING COLOUR', 'FISHBONE']
@@ -0,0 +1,14 @@
+from etl.schemas.billboard_magazine_3.processing import backfill
+from etl import router
+
+def test_list_backfill_issues_keeps_boxscore_issues(monkeypatch):
+    objects = [
+        ("raw/billboard/pdf/magazines/1984/10/BB-1984-10-06.pdf", '"a"'),                                               # before the backfill range
+        ("raw/billboard/pdf/magazines/1984/10/BB-1984-10-13.pdf", '"b"'),                                               # last issue of the previous schema
+        ("raw/billboard/pdf/magazines/1984/10/BB-1984-10-20.pdf", '"c"'),
+        ("raw/billboard/pdf/magazines/2001/07/BB-2001-07-21.pdf", '"d"'),
+        ("raw/billboard/pdf/magazines/2001/07/BB-2001-07-28.pdf", '"e"'),
+        ("raw/billboard/pdf/magazines/index.txt", '"f"'),
+    ]
+    monkeypatch.setattr(router, "list_s3_objects", lambda prefix: objects)
+    assert backfill.list_backfill_issues() == [objects[2], objects[3]]
@@ -0,0 +1,76 @@
+from etl.schemas.billboard_magazine_3.processing.columns import parse_boxscore_words, assign_cells
+from etl.schemas.billboard_magazine_3.processing import process
+import pandas as pd
+import pytest
+
+OBJECT_KEY = "raw/billboard/pdf/magazines/1985/02/BB-1985-02-09.pdf"
+
+HEADER_LEFTS = {"ARTIST(S)": 0, "Venue": 300, "Date(s)": 600, "Ticket": 800, "Price(s)": 870, "Capacity": 1100, "Promoter": 1300}
+
+def make_words(rows):
+    """
+    :param rows: list of (top, [(left, text), ...])
+    """
+    records = []
+    for line, (top, row_words) in enumerate(rows):
+        for left, text in row_words:
+            records.append({"line": line, "left": left, "top": top, "width": 10 * len(text), "height": 20, "conf": 90.0, "text": text})
+    return pd.DataFrame(records)
+
+def boxscore_words():
+    return make_words([
+        (0, [(0, "Boxscore")]),
+        (100, [(left, text) for text, left in HEADER_LEFTS.items()]),
+        (150, [(0, "CULTURE"), (90, "CLUB"), (300, "Capital"), (380, "Centre"), (600, "Nov."), (650, "11"),
+               (800, "$216,736"), (1100, "13,983"), (1300, "Cellar"), (1370, "Door"), (1420, "Prods.")]),
+        (180, [(0, "DADS"), (300, "Landover,"), (400, "Md."), (800, "$15.50"), (1100, "(19,114)")]),
+        (210, [(0, "ROD"), (50, "STEWART"), (300, "Thomas"), (380, "&"), (400, "Mack"), (600, "Nov."), (650, "7"),
+               (800, "$166,762"), (1100, "9558"), (1300, "Southland"), (1400, "Concerts")]),
+        (242, [(300, "Las"), (350, "Vegas"), (800, "$17.50/$15"), (1100, "two"), (1150, "sellouts")]),
+        (400, [(0, "Copyrighted"), (150, "material")]),
+    ])
+
+def test_assign_cells_uses_header_positions():
+    rows = assign_cells(boxscore_words())
+    assert rows[0] == {
+        "artists": "CULTURE CLUB", "location": "Capital Centre", "dates": "Nov. 11",
+        "gross": "$216,736", "attendance": "13,983", "promoter": "Cellar Door Prods."
+    }
+    assert rows[1] == {"artists": "DADS", "location": "Landover, Md.", "gross": "$15.50", "attendance": "(19,114)"}
+    assert len(rows) == 4                                                                                               # stops at the copyright line
+
+def test_parse_boxscore_words_builds_events():
+    events = parse_boxscore_words(boxscore_words())
+    assert len(events) == 2
+
+    assert events[0]["artists"] == ["CULTURE CLUB", "DADS"]
+    assert events[0]["location"] == ["Capital Centre", "Landover, Md."]
+    assert events[0]["dates"] == ["Nov. 11"]
+    assert events[0]["gross_receipts_us"] == 216736
+    assert events[0]["attendance"] == 13983
+    assert events[0]["capacity"] == 19114
+    assert events[0]["ticket_prices"] == ["15.50"]
+    assert events[0]["promoter"] == ["Cellar Door Prods."]
+
+    assert events[1]["location"] == ["Thomas & Mack", "Las Vegas"]
+    assert events[1]["ticket_prices"] == ["17.50/15"]
+    assert events[1]["num_sellouts"] == 2
+
+def test_parse_boxscore_words_without_header():
+    assert parse_boxscore_words(make_words([(0, [(0, "Boxscore")])])) == []
+
+def test_extract_to_csv_column_parser(monkeypatch):
+    uploads = []
+
+    monkeypatch.setenv(process.COLUMN_PARSER_ENV, "1")
+    monkeypatch.setattr(process, "lookup_source_hash", lambda key, etag: "abc123")
+    monkeypatch.setattr(process, "lookup_table_page", lambda key, table_name: 55)
+    monkeypatch.setattr(process, "load_words", lambda pdf_hash, page_num, dpi: boxscore_words())
+    monkeypatch.setattr(process, "read_boxscore_text", lambda key, etag: pytest.fail("the text parser should not run"))
+    monkeypatch.setattr(process.client, "put_object", lambda **kwargs: uploads.append(kwargs))
+    monkeypatch.setattr(process, "serialize_event_batch", lambda batch, file_format: batch)
+
+    assert process.extract_to_csv(OBJECT_KEY, '"a"') == process.get_processed_key(OBJECT_KEY, process.DEFAULT_PROCESSED_FORMAT)
+    batch = uploads[0]["Body"].to_pydict()
+    assert batch["artists"] == [["CULTURE CLUB", "DADS"], ["ROD STEWART"]]
+    assert all(OBJECT_KEY in s3_uri for s3_uri in batch["s3_uri"])
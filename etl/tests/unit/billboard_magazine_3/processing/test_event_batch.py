@@ -0,0 +1,31 @@
+from etl.schemas.billboard_magazine_3.processing.event_batch import build_event_batch, event_batch_to_frame, EVENT_SCHEMA
+from etl.schemas.billboard_magazine_3.processing.process import parse_event
+import pandas as pd
+
+EVENT_LINES = [
+    "CULTURE CLUB Capital Centre Nov. 11 $216,736 13,983 Cellar Door Prods. | DADS Landover, Md, $15.50 (19,114)",
+    "ROD STEWART Thomas & Mack Nov. 7 $166,762 9558 Southland Concerts | two sellouts",
+]
+
+def test_build_event_batch_list_columns():
+    batch = build_event_batch([parse_event(line) for line in EVENT_LINES])
+
+    assert batch.schema == EVENT_SCHEMA
+    assert batch.num_rows == 2
+    assert batch.column("artists").to_pylist() == [["CULTURE CLUB", "DADS"], ["ROD STEWART"]]
+    assert batch.column("ticket_prices").to_pylist() == [["15.50"], []]
+    assert batch.column("capacity").to_pylist() == [19114, None]
+    assert batch.column("num_sellouts").to_pylist() == [None, 2]
+
+def test_build_event_batch_skips_non_events():
+    batch = build_event_batch([None, parse_event(EVENT_LINES[0])])
+    assert batch.num_rows == 1
+
+def test_build_event_batch_empty():
+    assert build_event_batch([]).num_rows == 0
+
+def test_event_batch_to_frame_matches_csv():
+    events = [parse_event(line) for line in EVENT_LINES]
+    expected = pd.DataFrame(events).to_csv(index=False)
+
+    assert event_batch_to_frame(build_event_batch(events)).to_csv(index=False) == expected
@@ -0,0 +1,31 @@
+from etl.schemas.billboard_magazine_3.processing.event_lines import is_new_event_line
+from etl.schemas.billboard_magazine_3.processing.benchmark_event_lines import LEGACY_NEW_EVENT_PATTERN
+from etl.schemas.billboard_magazine_3.processing.benchmark_parse import RAW_EVENT_LINES_PATH
+from etl.schemas.billboard_magazine_3.processing.process import clean_event
+import random
+import json
+
+def test_event_lines():
+    assert is_new_event_line("CULTURE CLUB Capital Centre Nov. 11 $216,736 13,983 Cellar Door Prods.")
+    assert is_new_event_line("BRUCE SPRINGSTEEN Meadowlands Arena Aug. 5-6 $1,043,820 in-house")
+    assert not is_new_event_line("DADS Landover, Md, $15.50 (19,114)")
+    assert not is_new_event_line("")
+
+def test_same_decisions_as_regex_on_fixtures():
+    with open(RAW_EVENT_LINES_PATH, "r", encoding="utf-8") as f:
+        lines = [clean_event(line) for line in json.load(f)]
+
+    assert any(is_new_event_line(line) for line in lines)
+    for line in lines:
+        assert is_new_event_line(line) == bool(LEGACY_NEW_EVENT_PATTERN.search(line)), line
+
+def test_same_decisions_as_regex_on_random_lines():
+    pieces = ["Nov", "Nov.", "Dec", "Marc", "j", "Sept", "May", "in-house", "A", "X", "ab", " ", " ", "1", "12", "$1,000", "-", ".", ",", "(19,114)", "\t"]
+    rng = random.Random(15)
+
+    for _ in range(5000):
+        line = "".join(rng.choice(pieces) for _ in range(rng.randint(1, 10)))
+        assert is_new_event_line(line) == bool(LEGACY_NEW_EVENT_PATTERN.search(line)), line
+
+def test_long_space_run():
+    assert not is_new_event_line("A" + " " * 100000 + "Nov 1")                                                          # the regex never returns on this line
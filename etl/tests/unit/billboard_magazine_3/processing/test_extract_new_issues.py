@@ -0,0 +1,29 @@
+from etl.schemas.billboard_magazine_3.processing import process
+
+OBJECTS = [
+    ("raw/billboard/pdf/magazines/1984/11/BB-1984-11-03.pdf", '"a"'),
+    ("raw/billboard/pdf/magazines/1984/11/BB-1984-11-10.pdf", '"b"'),
+    ("raw/billboard/pdf/magazines/1979/11/BB-1979-11-10.pdf", '"c"'),                                                   # earlier schema
+]
+
+def test_extract_new_issues_skips_unchanged(tmp_path, monkeypatch):
+    extracted = []
+
+    def fake_extract_to_csv(object_key, etag):
+        extracted.append(object_key)
+        return object_key.replace("raw", "processed").replace(".pdf", ".csv")
+
+    monkeypatch.setattr(process, "list_s3_objects", lambda prefix: OBJECTS)
+    monkeypatch.setattr(process, "extract_to_csv", fake_extract_to_csv)
+    monkeypatch.setattr(process, "lookup_source_hash", lambda key, etag: None)
+    manifest_path = str(tmp_path / "manifest.sqlite")
+
+    assert process.extract_new_issues(manifest_path=manifest_path) == {"processed": 2, "skipped": 0, "failed": 0}
+    assert extracted == [OBJECTS[0][0], OBJECTS[1][0]]
+
+    extracted.clear()
+    objects = [OBJECTS[0], (OBJECTS[1][0], '"b2"')]
+    monkeypatch.setattr(process, "list_s3_objects", lambda prefix: objects)
+
+    assert process.extract_new_issues(manifest_path=manifest_path) == {"processed": 1, "skipped": 1, "failed": 0}
+    assert extracted == [OBJECTS[1][0]]
@@ -0,0 +1,51 @@
+from etl.schemas.billboard_magazine_3.processing.lexer import (
+    tokenize, classify, PIPE, COUNT_WORD, SELLOUT, CAD_MONEY, CAPACITY, MONEY, MONTH, DAY_RANGE, NUMBER, WORD
+)
+from etl.schemas.billboard_magazine_3.processing.process import parse_event
+
+def test_tokenize_kinds():
+    tokens = tokenize("Capital Nov. 11-12 $216,736 ($216,736 (19,114) two sellout |")
+    assert [token.kind for token in tokens] == [WORD, MONTH, DAY_RANGE, MONEY, CAD_MONEY, CAPACITY, COUNT_WORD, SELLOUT, PIPE]
+
+def test_tokenize_kinds_of_boxscore_rows():
+    tokens = tokenize("CULTURE CLUB Capital Centre Nov. 11 $216,736 13,983 Cellar Door Prods. | DADS Landover, Md, $15.50 (19,114)")
+    assert [token.kind for token in tokens] == [
+        WORD, WORD, WORD, WORD, MONTH, DAY_RANGE, MONEY, NUMBER, WORD, WORD, WORD, PIPE, WORD, WORD, WORD, MONEY, CAPACITY
+    ]
+
+    tokens = tokenize("Royal Oak (Mich.) Oct. 19-20 $112,057 7881 Brass Ring Prods. | Music Theater ns (8,500) | five shows")
+    assert [token.kind for token in tokens] == [
+        WORD, WORD, WORD, MONTH, DAY_RANGE, MONEY, NUMBER, WORD, WORD, WORD, PIPE, WORD, WORD, WORD, CAPACITY, PIPE, COUNT_WORD, WORD
+    ]
+    assert classify("8.472").kind == NUMBER                                                                             # attendance with the comma read as a period
+    assert classify("16.").kind == DAY_RANGE
+
+def test_classify_flags():
+    assert classify("Landover,").is_location_word
+    assert not classify("Nov.").is_location_word
+    assert classify("8.472").is_decimal
+    assert classify("13,983").is_attendance
+    assert classify("DADS").is_all_caps
+    assert classify("Promotion").near_promotions
+    assert classify("sellots").metric == "num_sellouts"
+    assert classify("shows").metric == "num_shows"
+    assert classify("two").number == 2
+
+def test_classify_is_cached():
+    assert classify("Centre") is classify("Centre")
+
+def test_parse_event_from_tokens():
+    event_data = parse_event("CULTURE CLUB Capital Centre Nov. 11 $216,736 13,983 Cellar Door Prods. | DADS Landover, Md, $15.50 (19,114)")
+
+    assert event_data["artists"] == ["CULTURE CLUB", "DADS"]
+    assert event_data["location"] == ["Capital Centre", "Landover, Md,"]
+    assert event_data["dates"] == ["Nov. 11"]
+    assert event_data["gross_receipts_us"] == 216736
+    assert event_data["attendance"] == 13983
+    assert event_data["promoter"] == ["Cellar Door Prods."]
+    assert event_data["ticket_prices"] == ["15.50"]
+    assert event_data["capacity"] == 19114
+
+def test_parse_event_count_word_sellouts():
+    event_data = parse_event("ROD STEWART Thomas & Mack Nov. 7 $166,762 9558 Southland Concerts | two sellouts")
+    assert event_data["num_sellouts"] == 2
@@ -0,0 +1,34 @@
+from etl.schemas.billboard_magazine_3.processing.number_words import (
+    classify_word, is_number_word, get_lookup_stats, reset_lookup_stats, WORD_TABLE
+)
+
+def test_number_words():
+    assert classify_word("two")["number"] == 2
+    assert classify_word("Seventy")["number"] == 70
+    assert classify_word("twenty-two")["number"] == 22
+    assert classify_word("3")["number"] == 3
+    assert classify_word("Centre")["number"] is None
+
+def test_is_number_word_rejects_non_words():
+    assert not is_number_word(None)
+    assert not is_number_word("")
+    assert not is_number_word("sevan")
+
+def test_ocr_misspellings_are_in_the_table():
+    for word in ["seHtouts", "setlouts", "seflout"]:
+        assert word in WORD_TABLE
+        assert classify_word(word)["metric"] == "num_sellouts"
+    assert classify_word("seflout")["is_sellout"]
+    assert classify_word("shows")["metric"] == "num_shows"
+
+def test_lookup_stats():
+    reset_lookup_stats()
+    classify_word("two")
+    classify_word("Garden")
+    classify_word("Garden")
+
+    stats = get_lookup_stats()
+    assert stats["table_hits"] == 1
+    assert stats["cache_hits"] == 1
+    assert stats["cache_misses"] == 1
+    assert stats["hit_rate"] == 2 / 3
@@ -0,0 +1,56 @@
+from etl.schemas.billboard_magazine_3.processing.process import parse_events, parse_event
+from etl.schemas.watchdog import load_quarantine, get_deadline
+from etl.schemas.billboard_magazine_3.processing import lexer
+from etl.schemas.billboard_magazine_3.processing.lexer import classify
+from etl.schemas.errors import ParseTimeoutError
+import pytest
+import time
+
+ISSUE_KEY = "raw/billboard/pdf/magazines/1984/11/BB-1984-11-03.pdf"
+EVENT_LINES = [
+    "CULTURE CLUB Capital Centre Nov. 11 $216,736 13,983 Cellar Door Prods. | DADS Landover, Md, $15.50 (19,114)",
+    "ROD STEWART Thomas & Mack Nov. 7 $166,762 9558 Southland Concerts | two sellouts",
+]
+
+def test_parse_events_within_budget(tmp_path):
+    quarantine_path = str(tmp_path / "quarantine.jsonl")
+    events = parse_events(EVENT_LINES, ISSUE_KEY, quarantine_path=quarantine_path)
+
+    assert len(events) == 2
+    assert load_quarantine(quarantine_path) == []
+
+def test_parse_event_past_deadline():
+    with pytest.raises(ParseTimeoutError):
+        parse_event(EVENT_LINES[0], ISSUE_KEY, get_deadline(-1))
+
+def test_parse_events_quarantines_slow_events(tmp_path):
+    quarantine_path = str(tmp_path / "quarantine.jsonl")
+    events = parse_events(EVENT_LINES, ISSUE_KEY, event_budget=-1, quarantine_path=quarantine_path)
+
+    assert events == []
+    records = load_quarantine(quarantine_path)
+    assert [(record["issue_key"], record["offset"], record["line"]) for record in records] == [
+        (ISSUE_KEY, 0, EVENT_LINES[0]), (ISSUE_KEY, 1, EVENT_LINES[1])
+    ]
+
+def test_parse_events_quarantines_rest_of_issue(tmp_path):
+    quarantine_path = str(tmp_path / "quarantine.jsonl")
+    events = parse_events(EVENT_LINES, ISSUE_KEY, issue_budget=-1, quarantine_path=quarantine_path)
+
+    assert events == []
+    assert [record["reason"] for record in load_quarantine(quarantine_path)] == ["issue time budget exceeded"] * 2
+
+def test_parse_event_stops_after_a_slow_token(monkeypatch):
+    classified = []
+
+    def slow_classify(text):
+        classified.append(text)
+        if text == "Centre":
+            time.sleep(0.05)                                                                                            # one token alone runs past the budget
+        return classify(text)
+
+    monkeypatch.setattr(lexer, "classify", slow_classify)
+
+    with pytest.raises(ParseTimeoutError, match="Centre"):
+        parse_event(EVENT_LINES[0], ISSUE_KEY, get_deadline(0.02))
+    assert classified[-1] == "Centre"                                                                                   # the rest of the line is never classified
@@ -0,0 +1,35 @@
+from etl.schemas.billboard_magazine_3.processing import process
+from etl.ocr.engine import LOW_MEMORY_ENV
+from etl.ocr import regions
+from contextlib import contextmanager
+
+OBJECT_KEY = "raw/billboard/pdf/magazines/1984/11/BB-1984-11-03.pdf"
+
+def test_read_boxscore_text_low_memory(monkeypatch):
+    low_memory_calls = []
+
+    @contextmanager
+    def fake_download(object_key, suffix):
+        yield "/tmp/BB-1984-11-03.pdf"
+
+    def fake_ocr_pdf_low_memory(pdf, page_nums, max_workers=None, pdf_hash=None, ocr_fn=None):
+        low_memory_calls.append((pdf, page_nums, pdf_hash, ocr_fn.keywords))
+        return {page_num: ocr_fn((pdf, page_num, pdf_hash)) for page_num in page_nums}
+
+    monkeypatch.setenv(LOW_MEMORY_ENV, "1")
+    monkeypatch.setattr(process, "lookup_source_hash", lambda key, etag: None)
+    monkeypatch.setattr(process, "lookup_table_page", lambda key, table_name: 55)
+    monkeypatch.setattr(process, "download_to_temp_file", fake_download)
+    monkeypatch.setattr(process, "hash_pdf", lambda pdf: "abc123")
+    monkeypatch.setattr(process, "save_source_hash", lambda key, etag, pdf_hash: None)
+    monkeypatch.setattr(process, "ocr_pdf_low_memory", fake_ocr_pdf_low_memory)
+    monkeypatch.setattr(process, "extract_table_text_ocr", lambda *args, **kwargs: "cropped")
+    monkeypatch.setattr(regions, "extract_table_text_ocr", lambda pdf, page_num, era, markers, pdf_hash: f"cropped {era} page {page_num}")
+
+    assert process.read_boxscore_text(OBJECT_KEY, '"a"') == "cropped billboard_boxscore-1984 page 55"
+    assert low_memory_calls == [
+        ("/tmp/BB-1984-11-03.pdf", [55], "abc123", {"era": "billboard_boxscore-1984", "markers": process.BOXSCORE_HEADER_MARKERS})
+    ]
+
+    monkeypatch.delenv(LOW_MEMORY_ENV)
+    assert process.read_boxscore_text(OBJECT_KEY, '"a"') == "cropped"
@@ -0,0 +1,83 @@
+from etl.ocr.benchmark import build_configs, issue_key_from_date, match_event, score_events, fastest_config, run_benchmark
+from etl.ocr import benchmark
+from PIL import Image
+
+def make_event(artists, location, dates, **fields):
+    event = {"artists": artists, "location": location, "dates": dates, "attendance": None, "gross_receipts_us": None}
+    event.update(fields)
+    return event
+
+def test_build_configs_covers_matrix():
+    configs = build_configs({"psm": [4, 6], "oem": [1], "dpi": [200, 300], "preprocessing": ["none"]})
+    assert len(configs) == 4
+    assert {"psm": 6, "oem": 1, "dpi": 300, "preprocessing": "none"} in configs
+
+def test_issue_key_from_date():
+    listings = {
+        "raw/billboard/pdf/magazines/1984/11/": ["raw/billboard/pdf/magazines/1984/11/BB-1984-11-03.pdf"],
+        "raw/billboard/pdf/magazines/1987/03/": [
+            "raw/billboard/pdf/magazines/1987/03/Billboard-1987-03-07.pdf",
+            "raw/billboard/pdf/magazines/1987/03/Billboard-1987-03-14.pdf",
+        ],
+    }
+    list_keys = lambda prefix: listings.get(prefix, [])
+
+    assert issue_key_from_date("11/3/1984", list_keys) == "raw/billboard/pdf/magazines/1984/11/BB-1984-11-03.pdf"
+    assert issue_key_from_date("3/14/1987", list_keys) == "raw/billboard/pdf/magazines/1987/03/Billboard-1987-03-14.pdf"
+    assert issue_key_from_date("3/21/1987", list_keys) is None
+
+def test_match_event_by_token_overlap():
+    events = [
+        make_event(["DIANA ROSS"], ["War Memorial", "Syracuse, N.Y."], ["Oct. 3"]),
+        make_event(["THOMPSON TWINS"], ["Fair Grandstand"], ["Sept. 30"]),
+    ]
+    assert match_event("diana-ross-war-memorial-1984-10-03", events) is events[0]
+    assert match_event("prince-joe-louis-arena-1984-11-04", events) is None
+
+def test_score_events_counts_field_errors():
+    events = [make_event(["DIANA ROSS"], ["War Memorial"], ["Oct. 3"], attendance=8248.0, ticket_prices=["15", "12.50"])]
+    corrections = [
+        {"event_signature": "diana-ross-war-memorial-1984-10-03", "field": "attendance", "true_value": "8248"},
+        {"event_signature": "diana-ross-war-memorial-1984-10-03", "field": "ticket_prices", "true_value": "['15', '13.50']"},
+        {"event_signature": "prince-joe-louis-arena-1984-11-04", "field": "attendance", "true_value": "100"},
+    ]
+    assert score_events(events, corrections) == {"attendance": [1, 2], "ticket_prices": [1, 1]}
+
+def test_fastest_config_meets_error_bar():
+    results = [
+        {"config": "fast", "seconds_per_page": 1.0, "error_rate": 0.5},
+        {"config": "medium", "seconds_per_page": 2.0, "error_rate": 0.1},
+        {"config": "slow", "seconds_per_page": 3.0, "error_rate": 0.05},
+    ]
+    assert fastest_config(results, 0.2)["config"] == "medium"
+    assert fastest_config(results, 0.01) is None
+
+def test_run_benchmark_skips_missing_issues(monkeypatch, capsys):
+    def fake_load_issue_pdf(issue_key, pdf_dir=None):
+        raise benchmark.client.exceptions.NoSuchKey({"Error": {"Code": "NoSuchKey"}}, "GetObject")
+
+    monkeypatch.setattr(benchmark, "load_issue_pdf", fake_load_issue_pdf)
+    monkeypatch.setattr(benchmark, "load_crop_boxes", lambda: {})
+    configs = build_configs({"psm": [6], "oem": [1], "dpi": [200], "preprocessing": ["none"]})
+
+    results = run_benchmark(["raw/billboard/pdf/magazines/1984/11/BB-1984-11-03.pdf"], configs, {})
+
+    assert results[0]["pages"] == 0
+    assert "1 missing" in capsys.readouterr().out
+
+def test_ocr_and_parse_keeps_events_and_quarantine_with_the_issue(tmp_path, monkeypatch):
+    issue_key = "raw/billboard/pdf/magazines/1987/03/Billboard-1987-03-07.pdf"
+    quarantine_path = str(tmp_path / "quarantine.jsonl")
+    calls = []
+
+    def fake_parse_events(tour_lines, object_key, quarantine_path):
+        calls.append((object_key, quarantine_path))
+        return []
+
+    monkeypatch.setattr(benchmark, "render_page", lambda pdf_bytes, page_num, dpi: Image.new("L", (10, 10)))
+    monkeypatch.setattr(benchmark, "image_to_string", lambda image, config: "")
+    monkeypatch.setattr(benchmark, "parse_events", fake_parse_events)
+    config = {"psm": 6, "oem": 1, "dpi": 200, "preprocessing": "none"}
+
+    assert benchmark.ocr_and_parse(b"", 55, None, config, issue_key, quarantine_path)[0] == []
+    assert calls == [(issue_key, quarantine_path)]
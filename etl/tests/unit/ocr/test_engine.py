@@ -0,0 +1,33 @@
+from etl.ocr.engine import ocr_pages, low_memory_enabled, LOW_MEMORY_ENV
+import time
+
+def fake_ocr(job):
+    pdf, page_num, pdf_hash = job
+    time.sleep(0.01 * (5 - page_num % 5))                                                                               # later pages finish first
+    if page_num == 3:
+        raise ValueError("bad page")
+    return f"{pdf} page {page_num}"
+
+def test_ocr_pages_ordered():
+    jobs = [("BB-1984-11-03.pdf", page_num, "abc123") for page_num in range(1, 9)]
+    results = list(ocr_pages(jobs, max_workers=2, ocr_fn=fake_ocr))
+    assert [job for job, text in results] == jobs
+    assert results[0][1] == "BB-1984-11-03.pdf page 1"
+
+def test_ocr_pages_failed_job_returns_none():
+    jobs = [("BB-1984-11-03.pdf", 3, "abc123")]
+    results = list(ocr_pages(jobs, max_workers=1, ocr_fn=fake_ocr))
+    assert results == [(jobs[0], None)]
+
+def test_ocr_pages_unordered_returns_every_job():
+    jobs = [("BB-1984-11-03.pdf", page_num, "abc123") for page_num in range(1, 9)]
+    results = list(ocr_pages(jobs, max_workers=3, ordered=False, max_pending=3, ocr_fn=fake_ocr))
+    assert sorted(job for job, text in results) == jobs
+
+def test_low_memory_enabled_from_environment(monkeypatch):
+    monkeypatch.delenv(LOW_MEMORY_ENV, raising=False)
+    assert not low_memory_enabled()
+    monkeypatch.setenv(LOW_MEMORY_ENV, "true")
+    assert low_memory_enabled()
+    monkeypatch.setenv(LOW_MEMORY_ENV, "0")
+    assert not low_memory_enabled()
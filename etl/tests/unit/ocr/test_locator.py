@@ -0,0 +1,66 @@
+from etl.ocr.locator import predict_page, search_order, contains_marker, locate_table_page, save_page_index, load_page_index
+import etl.ocr.locator as locator
+
+def test_predict_page_uses_closest_issues():
+    table_pages = {
+        "raw/billboard/pdf/magazines/1984/11/BB-1984-11-03.pdf": 55,
+        "raw/billboard/pdf/magazines/1984/11/BB-1984-11-24.pdf": 57,
+        "raw/billboard/pdf/magazines/1984/12/BB-1984-12-01.pdf": 57,
+        "raw/billboard/pdf/magazines/1990/01/BB-1990-01-06.pdf": 80,
+    }
+    assert predict_page("raw/billboard/pdf/magazines/1984/11/BB-1984-11-17.pdf", table_pages, 15) == 57
+
+def test_predict_page_default_without_neighbours():
+    assert predict_page("raw/billboard/pdf/magazines/1984/11/BB-1984-11-17.pdf", {}, 15) == 15
+
+def test_search_order_starts_at_prediction():
+    assert search_order(3, 5) == [3, 4, 2, 5, 1]
+    assert search_order(9, 3) == [3, 2, 1]
+
+def test_search_order_stays_in_window():
+    assert search_order(50, 100, window=2) == [50, 51, 49, 52, 48]
+    assert search_order(1, 100, window=2) == [1, 2, 3]
+
+def test_contains_marker_ignores_case_and_spacing():
+    assert contains_marker("AMUSEMENT BUSINESS BOX SCORE\nTop Concert Grosses", ["Boxscore"])
+    assert not contains_marker("Top Concert Grosses", ["Boxscore"])
+
+def test_contains_marker_require_all():
+    markers = ["Boxscore", "ARTIST(S) Venue Date(s)"]
+    assert contains_marker("BOXSCORE\nARTIST(S) Venue Date(s) Gross", markers, require_all=True)
+    assert not contains_marker("In this issue: Boxscore ... 55", markers, require_all=True)
+
+def test_locate_table_page_uses_page_index(tmp_path):
+    index_path = str(tmp_path / "table_pages.json")
+    save_page_index({"billboard_boxscore": {"raw/billboard/pdf/magazines/1984/11/BB-1984-11-03.pdf": 55}}, index_path)
+    page_num = locate_table_page(b"", "raw/billboard/pdf/magazines/1984/11/BB-1984-11-03.pdf", "billboard_boxscore", ["Boxscore"], page_index_path=index_path)
+    assert page_num == 55
+
+def test_locate_table_page_skips_title_without_column_header(tmp_path, monkeypatch):
+    index_path = str(tmp_path / "table_pages.json")
+    issue_key = "raw/billboard/pdf/magazines/1984/11/BB-1984-11-03.pdf"
+    page_texts = {3: "CONTENTS Boxscore 55", 55: "Boxscore\nARTIST(S) Venue Date(s) Gross"}
+    searched = []
+
+    def fake_header_strip(pdf_bytes, page_num, pdf_hash=None):
+        searched.append(page_num)
+        return page_texts.get(page_num, "")
+
+    monkeypatch.setattr(locator, "find_page_in_text_layer", lambda pdf_bytes, markers: (None, 200))
+    monkeypatch.setattr(locator, "hash_pdf", lambda pdf_bytes: "hash")
+    monkeypatch.setattr(locator, "ocr_header_strip", fake_header_strip)
+
+    markers = ["Boxscore", "ARTIST(S) Venue Date(s)"]
+    assert locate_table_page(b"", issue_key, "billboard_boxscore", markers, default_page=3, page_index_path=index_path, window=60) == 55
+    assert load_page_index(index_path) == {"billboard_boxscore": {issue_key: 55}}
+    assert max(searched) <= 63
+
+def test_save_page_index_keeps_pages_saved_by_other_workers(tmp_path):
+    index_path = str(tmp_path / "table_pages.json")
+    save_page_index({"billboard_boxscore": {"raw/billboard/pdf/magazines/1984/11/BB-1984-11-03.pdf": 55}}, index_path)
+    save_page_index({"billboard_boxscore": {"raw/billboard/pdf/magazines/1984/11/BB-1984-11-10.pdf": 57}}, index_path)
+
+    assert load_page_index(index_path) == {"billboard_boxscore": {
+        "raw/billboard/pdf/magazines/1984/11/BB-1984-11-03.pdf": 55,
+        "raw/billboard/pdf/magazines/1984/11/BB-1984-11-10.pdf": 57,
+    }}
@@ -0,0 +1,83 @@
+from etl.ocr import page_cache
+from PIL import Image
+import os
+
+def fake_render(calls):
+    def render_page(pdf, page_num, dpi):
+        calls.append((page_num, dpi))
+        return Image.new("L", (dpi, dpi), color=page_num)
+    return render_page
+
+def test_get_page_image_renders_once(tmp_path, monkeypatch):
+    calls = []
+    monkeypatch.setattr(page_cache, "render_page", fake_render(calls))
+    first = page_cache.get_page_image(b"%PDF-1.4 issue", 55, dpi=100, cache_dir=str(tmp_path))
+    second = page_cache.get_page_image(b"%PDF-1.4 issue", 55, dpi=100, cache_dir=str(tmp_path))
+    assert calls == [(55, 100)]
+    assert second.size == first.size
+
+def test_get_page_image_keyed_by_dpi_and_contents(tmp_path, monkeypatch):
+    calls = []
+    monkeypatch.setattr(page_cache, "render_page", fake_render(calls))
+    page_cache.get_page_image(b"%PDF-1.4 issue", 55, dpi=100, cache_dir=str(tmp_path))
+    page_cache.get_page_image(b"%PDF-1.4 issue", 55, dpi=50, cache_dir=str(tmp_path))
+    page_cache.get_page_image(b"%PDF-1.4 other issue", 55, dpi=100, cache_dir=str(tmp_path))
+    assert len(calls) == 3
+
+def test_evict_page_cache_removes_least_recently_used(tmp_path, monkeypatch):
+    monkeypatch.setattr(page_cache, "render_page", fake_render([]))
+    pdf_hash = page_cache.hash_pdf(b"%PDF-1.4 issue")
+    for page_num in range(1, 4):
+        page_cache.get_page_image(b"%PDF-1.4 issue", page_num, dpi=100, cache_dir=str(tmp_path))
+        path = page_cache.page_image_path(pdf_hash, page_num, 100, str(tmp_path))
+        os.utime(path, (page_num, page_num))
+    page_size = os.path.getsize(page_cache.page_image_path(pdf_hash, 3, 100, str(tmp_path)))
+
+    page_cache.evict_page_cache(str(tmp_path), max_bytes=page_size * 2)
+
+    assert not os.path.exists(page_cache.page_image_path(pdf_hash, 1, 100, str(tmp_path)))
+    assert os.path.exists(page_cache.page_image_path(pdf_hash, 3, 100, str(tmp_path)))
+
+def test_get_page_image_path_renders_to_file_once(tmp_path, monkeypatch):
+    calls = []
+
+    def fake_convert_from_path(pdf_path, dpi, first_page, last_page, output_folder, fmt, paths_only):
+        calls.append(first_page)
+        path = os.path.join(output_folder, "page.png")
+        Image.new("L", (dpi, dpi)).save(path)
+        return [path]
+
+    monkeypatch.setattr(page_cache, "convert_from_path", fake_convert_from_path)
+    pdf_path = tmp_path / "BB-1984-11-03.pdf"
+    pdf_path.write_bytes(b"%PDF-1.4 issue")
+    cache_dir = str(tmp_path / "pages")
+
+    first = page_cache.get_page_image_path(str(pdf_path), 55, dpi=100, cache_dir=cache_dir)
+    second = page_cache.get_page_image_path(str(pdf_path), 55, dpi=100, cache_dir=cache_dir)
+
+    assert calls == [55]
+    assert first == second == page_cache.page_image_path(page_cache.hash_pdf(str(pdf_path)), 55, 100, cache_dir)
+    assert os.listdir(os.path.dirname(first)) == [os.path.basename(first)]                                             # render folder cleaned up
+
+def test_spooled_pdf_removes_temp_file_and_passes_paths_through(tmp_path):
+    with page_cache.spooled_pdf(b"%PDF-1.4 issue") as pdf_path:
+        with open(pdf_path, "rb") as f:
+            assert f.read() == b"%PDF-1.4 issue"
+    assert not os.path.exists(pdf_path)
+
+    with page_cache.spooled_pdf(str(tmp_path / "issue.pdf")) as pdf_path:
+        assert pdf_path == str(tmp_path / "issue.pdf")
+
+def test_cache_is_walked_only_after_enough_writes(tmp_path, monkeypatch):
+    monkeypatch.setattr(page_cache, "render_page", fake_render([]))
+    monkeypatch.setitem(page_cache.page_cache_writes, "bytes_since_eviction", 0)
+    walks = []
+    monkeypatch.setattr(page_cache, "evict_page_cache", lambda cache_dir, max_bytes: walks.append(cache_dir) or 0)
+    page_cache.get_page_image(b"%PDF-1.4 issue", 1, dpi=100, cache_dir=str(tmp_path))
+    page_size = os.path.getsize(page_cache.page_image_path(page_cache.hash_pdf(b"%PDF-1.4 issue"), 1, 100, str(tmp_path)))
+    max_bytes = int(page_size * 3.5 / page_cache.EVICTION_CHECK_FRACTION)                                               # a walk every 4th page
+
+    for page_num in range(2, 9):
+        page_cache.get_page_image(b"%PDF-1.4 issue", page_num, dpi=100, cache_dir=str(tmp_path), max_bytes=max_bytes)
+
+    assert len(walks) == 2
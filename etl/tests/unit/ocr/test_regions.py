@@ -0,0 +1,35 @@
+from etl.ocr.regions import find_runs, detect_table_region, crop_to_region, save_crop_box, load_crop_boxes
+from concurrent.futures import ProcessPoolExecutor
+from PIL import Image, ImageDraw
+import numpy as np
+
+def test_find_runs_merges_small_gaps():
+    mask = np.array([0, 1, 1, 0, 1, 0, 0, 0, 1, 1], dtype=bool)
+    assert find_runs(mask, 1) == [(1, 5), (8, 10)]
+    assert find_runs(mask, 3) == [(1, 10)]
+    assert find_runs(np.zeros(4, dtype=bool), 1) == []
+
+def test_detect_table_region_finds_dense_block():
+    page = Image.new("L", (1000, 1400), color=255)
+    draw = ImageDraw.Draw(page)
+    draw.rectangle((50, 60, 400, 70), fill=0)                                                                           # headline
+    for y in range(700, 1200, 10):                                                                                      # dense table rows
+        draw.rectangle((300, y, 900, y + 4), fill=0)
+
+    left, top, right, bottom = detect_table_region(page)
+
+    assert 0.28 <= left <= 0.3 and 0.9 <= right <= 0.92
+    assert 0.45 <= top <= 0.5 and 0.85 <= bottom <= 0.87
+    assert crop_to_region(page, (left, top, right, bottom)).size[0] < page.size[0]
+
+def test_detect_table_region_blank_page():
+    assert detect_table_region(Image.new("L", (100, 100), color=255)) is None
+
+def test_save_crop_box_keeps_boxes_saved_in_parallel(tmp_path):
+    path = str(tmp_path / "crop_boxes.json")
+    eras = [f"billboard_boxscore-{year}" for year in range(1980, 1996)]
+
+    with ProcessPoolExecutor(max_workers=4) as executor:
+        list(executor.map(save_crop_box, eras, [(0.1, 0.2, 0.9, 0.8)] * len(eras), [path] * len(eras)))
+
+    assert sorted(load_crop_boxes(path)) == eras
@@ -0,0 +1,18 @@
+from etl.ocr.text_cache import load_ocr_text, save_ocr_text, lookup_source_hash, save_source_hash
+
+def test_ocr_text_round_trip(tmp_path):
+    save_ocr_text("abc123", 55, "BRUCE SPRINGSTEEN Oakland Coliseum", 200, "", "5.3.0", str(tmp_path))
+    assert load_ocr_text("abc123", 55, 200, "", "5.3.0", str(tmp_path)) == "BRUCE SPRINGSTEEN Oakland Coliseum"
+
+def test_ocr_text_keyed_by_settings(tmp_path):
+    save_ocr_text("abc123", 55, "BRUCE SPRINGSTEEN Oakland Coliseum", 200, "", "5.3.0", str(tmp_path))
+    assert load_ocr_text("abc123", 55, 200, "--psm 6", "5.3.0", str(tmp_path)) is None
+    assert load_ocr_text("abc123", 55, 200, "", "4.1.1", str(tmp_path)) is None
+    assert load_ocr_text("abc123", 55, 300, "", "5.3.0", str(tmp_path)) is None
+    assert load_ocr_text("abc123", 56, 200, "", "5.3.0", str(tmp_path)) is None
+
+def test_source_hash_invalidated_by_etag(tmp_path):
+    key = "raw/billboard/pdf/magazines/1984/11/BB-1984-11-03.pdf"
+    save_source_hash(key, '"etag-1"', "abc123", str(tmp_path))
+    assert lookup_source_hash(key, '"etag-1"', str(tmp_path)) == "abc123"
+    assert lookup_source_hash(key, '"etag-2"', str(tmp_path)) is None
@@ -0,0 +1,26 @@
+from etl.ocr.words import clean_words, words_to_text, save_words, load_words
+import pandas as pd
+
+def tesseract_tsv():
+    return pd.DataFrame([
+        {"level": 4, "block_num": 1, "par_num": 1, "line_num": 1, "word_num": 0, "left": 0, "top": 0, "width": 200, "height": 20, "conf": -1, "text": None},
+        {"level": 5, "block_num": 1, "par_num": 1, "line_num": 1, "word_num": 1, "left": 0, "top": 0, "width": 80, "height": 20, "conf": 95.5, "text": "CULTURE"},
+        {"level": 5, "block_num": 1, "par_num": 1, "line_num": 1, "word_num": 2, "left": 90, "top": 0, "width": 50, "height": 20, "conf": 91.0, "text": "CLUB"},
+        {"level": 5, "block_num": 1, "par_num": 1, "line_num": 1, "word_num": 3, "left": 150, "top": 0, "width": 5, "height": 20, "conf": 10.0, "text": " "},
+        {"level": 5, "block_num": 2, "par_num": 1, "line_num": 1, "word_num": 1, "left": 0, "top": 30, "width": 50, "height": 20, "conf": 88.0, "text": "DADS"},
+    ])
+
+def test_clean_words_keeps_words_and_numbers_lines():
+    words = clean_words(tesseract_tsv())
+    assert words["text"].tolist() == ["CULTURE", "CLUB", "DADS"]
+    assert words["line"].tolist() == [0, 0, 1]
+    assert str(words["conf"].dtype) == "float32"
+
+def test_words_to_text():
+    assert words_to_text(clean_words(tesseract_tsv())) == "CULTURE CLUB\nDADS\n"
+
+def test_save_and_load_words(tmp_path):
+    words = clean_words(tesseract_tsv())
+    save_words("abc123", 55, words, 200, tesseract_version="5.3.0", cache_dir=str(tmp_path))
+    assert load_words("abc123", 55, 200, tesseract_version="5.3.0", cache_dir=str(tmp_path)).equals(words)
+    assert load_words("abc123", 55, 300, tesseract_version="5.3.0", cache_dir=str(tmp_path)) is None
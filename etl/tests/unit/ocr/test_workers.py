@@ -0,0 +1,100 @@
+from etl.ocr import workers
+from etl.ocr.workers import image_to_string, run_tesseract_batch, set_ocr_backend, _ocr_batch, TesseractWorkerPool
+from PIL import Image, ImageDraw
+import pytesseract
+import subprocess
+import pytest
+import sys
+
+class FakeBackend:
+    def __init__(self):
+        self.calls = []
+
+    def image_to_string(self, image, config=""):
+        self.calls.append(config)
+        return "backend text"
+
+def test_image_to_string_uses_passed_backend():
+    backend = FakeBackend()
+    assert image_to_string(Image.new("L", (10, 10)), "--psm 6", backend) == "backend text"
+    assert backend.calls == ["--psm 6"]
+
+def test_image_to_string_uses_default_backend():
+    backend = FakeBackend()
+    set_ocr_backend(backend)
+    try:
+        assert image_to_string(Image.new("L", (10, 10))) == "backend text"
+    finally:
+        set_ocr_backend(None)
+
+def test_run_tesseract_batch_splits_pages(monkeypatch):
+    def fake_run(args, capture_output, check):
+        with open(args[1]) as f:
+            num_images = len(f.read().split())
+        stdout = "".join(f"page {i}\n\f" for i in range(num_images))
+        return subprocess.CompletedProcess(args, 0, stdout=stdout.encode("utf-8"))
+
+    monkeypatch.setattr(workers.subprocess, "run", fake_run)
+    texts = run_tesseract_batch([Image.new("L", (10, 10)) for _ in range(3)], tesseract_cmd="tesseract")
+    assert texts == ["page 0\n\f", "page 1\n\f", "page 2\n\f"]
+
+def test_ocr_batch_reports_errors_per_task(monkeypatch):
+    def failing_batch(images, config, tesseract_cmd):
+        raise RuntimeError("tesseract failed")
+
+    monkeypatch.setattr(workers, "run_tesseract_batch", failing_batch)
+    batch = [(0, Image.new("L", (10, 10)), ""), (1, Image.new("L", (10, 10)), "")]
+    assert _ocr_batch(batch, None, "tesseract") == [(0, None, "tesseract failed"), (1, None, "tesseract failed")]
+
+def test_run_tesseract_batch_reads_image_paths_from_disk(tmp_path, monkeypatch):
+    image_path = str(tmp_path / "page.png")
+    Image.new("L", (10, 10)).save(image_path)
+    listed_paths = []
+
+    def fake_run(args, capture_output, check):
+        with open(args[1]) as f:
+            listed_paths.extend(f.read().split())
+        return subprocess.CompletedProcess(args, 0, stdout=b"page\n\f")
+
+    monkeypatch.setattr(workers.subprocess, "run", fake_run)
+    assert run_tesseract_batch([image_path], tesseract_cmd="tesseract") == ["page\n\f"]
+    assert listed_paths == [image_path]
+
+FAKE_TESSERACT = """#!{python}
+import os, signal, sys
+with open(sys.argv[1]) as f:
+    image_paths = f.read().split()
+if any("crash" in path for path in image_paths):
+    os.kill(os.getppid(), signal.SIGKILL)
+for path in image_paths:
+    sys.stdout.write(f"read {{os.path.basename(path)}}\\n\\f")
+"""
+
+@pytest.fixture
+def fake_tesseract(tmp_path, monkeypatch):
+    tesseract_path = tmp_path / "tesseract"
+    tesseract_path.write_text(FAKE_TESSERACT.format(python=sys.executable))
+    tesseract_path.chmod(0o755)
+    monkeypatch.setattr(pytesseract.pytesseract, "tesseract_cmd", str(tesseract_path))
+    return tesseract_path
+
+def test_worker_pool_reads_pages(fake_tesseract, tmp_path):
+    page = Image.new("L", (200, 50), color=255)
+    ImageDraw.Draw(page).text((10, 10), "Boxscore", fill=0)
+    page_path = str(tmp_path / "page.png")
+    page.save(page_path)
+
+    with TesseractWorkerPool(num_workers=1, batch_size=1, result_timeout=30) as pool:                                   # one image per batch, so the in-memory page is always 0.png
+        assert pool.ocr_images([page_path, page], "--psm 6") == ["read page.png\n\f", "read 0.png\n\f"]
+        assert image_to_string(page_path, "--psm 6", pool) == "read page.png\n\f"
+
+def test_worker_pool_fails_pages_of_a_dead_worker(fake_tesseract, tmp_path):
+    crash_path = str(tmp_path / "crash.png")
+    page_path = str(tmp_path / "page.png")
+    for path in (crash_path, page_path):
+        Image.new("L", (10, 10), color=255).save(path)
+
+    with TesseractWorkerPool(num_workers=1, batch_size=1, result_timeout=30) as pool:
+        with pytest.raises(RuntimeError, match="exited"):
+            pool.image_to_string(crash_path, "--psm 6")
+        assert pool.image_to_string(page_path, "--psm 6") == "read page.png\n\f"                                        # a new worker took its place
@@ -0,0 +1,64 @@
+from etl import router
+from etl.schemas.errors import FileParsingError
+from etl.utils.job_queue import open_job_queue, enqueue_jobs, queue_status
+from etl.utils.manifest import open_manifest, get_manifest_entry
+import pytest
+
+KEYS = [
+    ("raw/billboard/pdf/magazines/1979/06/BB-1979-06-02.pdf", '"a"'),
+    ("raw/billboard/pdf/magazines/1984/11/BB-1984-11-03.pdf", '"b"'),
+]
+
+def test_route_issue_by_date():
+    assert router.route_issue("raw/billboard/pdf/magazines/1979/06/BB-1979-06-02.pdf")["schema_id"] == "bb_1"
+    assert router.route_issue("raw/billboard/pdf/magazines/1983/06/BB-1983-06-04.pdf")["schema_id"] == "bb_2"
+    assert router.route_issue("raw/billboard/pdf/magazines/1984/10/BB-1984-10-20.pdf")["schema_id"] == "bb_3"
+    assert router.route_issue("raw/billboard/pdf/magazines/1970/01/BB-1970-01-03.pdf") is None
+
+def test_get_processor_without_parser():
+    with pytest.raises(FileParsingError):
+        router.get_processor("raw/billboard/pdf/magazines/1983/06/BB-1983-06-04.pdf")
+
+def test_list_archive_issues_skips_schemas_without_parser(monkeypatch):
+    objects = KEYS + [("raw/billboard/pdf/magazines/1983/06/BB-1983-06-04.pdf", '"c"')]
+    monkeypatch.setattr(router, "list_s3_objects", lambda prefix: objects)
+    assert router.list_archive_issues() == KEYS
+    assert router.list_archive_issues(schema_ids=["bb_3"]) == KEYS[1:]
+
+def test_run_worker_processes_every_era_and_resumes(tmp_path, monkeypatch):
+    monkeypatch.setattr(router, "lookup_source_hash", lambda key, etag: None)
+    queue_path, manifest_path = str(tmp_path / "jobs.sqlite"), str(tmp_path / "manifest.sqlite")
+    enqueue_jobs(open_job_queue(queue_path), router.select_jobs(KEYS, manifest_path))
+    extracted = []
+
+    def flaky_extract(raw_key, etag):
+        extracted.append(raw_key)
+        if raw_key == KEYS[1][0] and extracted.count(raw_key) == 1:
+            raise RuntimeError("poppler crashed")
+        return raw_key.replace("raw", "processed")
+
+    assert router.run_worker("worker-0", queue_path, manifest_path, extract_fn=flaky_extract) == 2
+    assert extracted == [KEYS[0][0], KEYS[1][0], KEYS[1][0]]                                                            # retried once
+    assert queue_status(open_job_queue(queue_path)) == {"done": 2}
+
+    manifest_conn = open_manifest(manifest_path)
+    assert get_manifest_entry(manifest_conn, KEYS[0][0])["parser_version"].startswith("bb_1")
+    assert get_manifest_entry(manifest_conn, KEYS[1][0])["parser_version"].startswith("bb_3")
+
+    assert router.run_worker("worker-1", queue_path, manifest_path, extract_fn=flaky_extract) == 0                     # nothing left to redo
+
+def test_select_jobs_requeues_issues_read_by_older_parser(tmp_path, monkeypatch):
+    monkeypatch.setattr(router, "lookup_source_hash", lambda key, etag: None)
+    queue_path, manifest_path = str(tmp_path / "jobs.sqlite"), str(tmp_path / "manifest.sqlite")
+    enqueue_jobs(open_job_queue(queue_path), router.select_jobs(KEYS, manifest_path))
+    router.run_worker("worker-0", queue_path, manifest_path, extract_fn=lambda raw_key, etag: raw_key.replace("raw", "processed"))
+
+    assert router.select_jobs(KEYS, manifest_path) == []
+
+    bb_1_processor = router.get_processor(KEYS[0][0])
+    monkeypatch.setattr(bb_1_processor, "PARSER_VERSION", "bb_1-999")
+    jobs = router.select_jobs(KEYS, manifest_path)
+
+    assert jobs == [(KEYS[0][0], KEYS[0][1], "bb_1-999")]
+    assert enqueue_jobs(open_job_queue(queue_path), jobs) == 1
+    assert queue_status(open_job_queue(queue_path)) == {"done": 1, "pending": 1}
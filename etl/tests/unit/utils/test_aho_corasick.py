@@ -0,0 +1,30 @@
+from etl.utils.aho_corasick import build_automaton, find_matches
+import random
+
+def naive_matches(keywords, text):
+    return sorted((i + len(keyword), keyword) for keyword in set(keywords) for i in range(len(text)) if text.startswith(keyword, i))
+
+def test_overlapping_keywords():
+    automaton = build_automaton([("festival", "strong"), ("fest", "strong"), ("superfest", "strong"), ("vol.", "tags")])
+    matches = list(find_matches(automaton, "budweiser superfest: festival vol. 2"))
+
+    assert matches == [(19, "superfest"), (19, "fest"), (25, "fest"), (29, "festival"), (34, "vol.")]
+
+def test_labels():
+    automaton = build_automaton([("tour", "strong"), ("tour", "event"), ("show", "weak")])
+
+    assert automaton["labels"]["tour"] == {"strong", "event"}
+    assert automaton["by_label"]["event"] == {"tour"}
+
+def test_no_keywords():
+    automaton = build_automaton([])
+    assert list(find_matches(automaton, "culture club")) == []
+
+def test_matches_naive_search():
+    rng = random.Random(7)
+    for _ in range(500):
+        keywords = ["".join(rng.choice("ab") for _ in range(rng.randint(1, 4))) for _ in range(rng.randint(1, 6))]
+        text = "".join(rng.choice("abc") for _ in range(rng.randint(0, 30)))
+        automaton = build_automaton((keyword, "keyword") for keyword in keywords)
+
+        assert sorted(find_matches(automaton, text)) == naive_matches(keywords, text)
@@ -0,0 +1,63 @@
+from etl.utils.utils import index_dimension, get_fuzzy_index, load_dimension_table_rows
+from etl.utils.fuzzy_index import find_within
+from etl.dimensions import location_csv
+from etl.dimensions.location_csv import append_city_csv, append_venue_csv
+
+CITY_ROWS = [
+    {"id": "1", "name": "Springfield", "slug": "springfield", "state_id": "17"},
+    {"id": "2", "name": "Peoria", "slug": "peoria", "state_id": "17"},
+    {"id": "3", "name": "Springfield", "slug": "springfield", "state_id": "25"},
+]
+
+VENUE_ROWS = [
+    {"id": "1", "name": "Prairie Capital Convention Center", "slug": "prairie-capital-convention-center", "city_id": "1", "state_id": "17"},
+    {"id": "2", "name": "Civic Center", "slug": "civic-center", "city_id": "2", "state_id": ""},
+]
+
+def test_rows_are_indexed_by_state_and_city():
+    cities = index_dimension(CITY_ROWS, key_fn=lambda row: (row["slug"], int(row["state_id"])))
+    venues = index_dimension(VENUE_ROWS, key_fn=lambda row: (row["slug"], int(row["city_id"])))
+
+    assert [city["id"] for city in cities["by_state"][17]] == ["1", "2"]
+    assert [city["id"] for city in cities["by_state"][25]] == ["3"]
+    assert cities["by_city"] == {}
+    assert [venue["id"] for venue in venues["by_city"][2]] == ["2"]
+    assert list(venues["by_state"]) == [17]                                                                             # empty state_id is left out
+
+def test_appended_rows_are_indexed(tmp_path, monkeypatch):
+    monkeypatch.setattr(location_csv, "LOCAL_DIM_CITIES_PATH", str(tmp_path / "dim_cities.csv"))
+    monkeypatch.setattr(location_csv, "LOCAL_DIM_VENUES_PATH", str(tmp_path / "dim_venues.csv"))
+    dim_cities = {**index_dimension(CITY_ROWS, key_fn=lambda row: (row["slug"], int(row["state_id"]))), "max_id": 3}
+    dim_venues = {**index_dimension(VENUE_ROWS, key_fn=lambda row: (row["slug"], int(row["city_id"]))), "max_id": 2}
+
+    city_id = append_city_csv("Springfield", dim_cities, 29)
+    venue_id = append_venue_csv("Shrine Mosque", dim_venues, city_id, 29)
+
+    assert dim_cities["by_key"][("springfield", 29)] == {"id": "4", "name": "Springfield", "slug": "springfield", "state_id": "29"}
+    assert [city["state_id"] for city in dim_cities["by_slug"]["springfield"]] == ["17", "25", "29"]
+    assert dim_cities["by_state"][29][0]["id"] == "4"
+    assert dim_venues["by_key"][("shrine-mosque", city_id)]["id"] == str(venue_id)
+    assert dim_venues["by_city"][city_id][0]["city_id"] == "4"
+    assert dim_venues["by_state"][29][0]["state_id"] == "29"
+
+def test_appended_row_reads_back_the_same(tmp_path, monkeypatch):
+    path = tmp_path / "dim_cities.csv"
+    path.write_text("id,name,slug,state_id\n" + "".join(f"{row['id']},{row['name']},{row['slug']},{row['state_id']}\n" for row in CITY_ROWS))
+    monkeypatch.setattr(location_csv, "LOCAL_DIM_CITIES_PATH", str(path))
+    dim_cities = {**index_dimension(CITY_ROWS, key_fn=lambda row: (row["slug"], int(row["state_id"]))), "max_id": 3}
+
+    append_city_csv("Reno", dim_cities, 29)
+
+    rows, max_id = load_dimension_table_rows(str(path))
+    assert rows[-1] == dim_cities["by_id"][4]
+
+def test_fuzzy_index_follows_appended_rows(tmp_path, monkeypatch):
+    monkeypatch.setattr(location_csv, "LOCAL_DIM_CITIES_PATH", str(tmp_path / "dim_cities.csv"))
+    dim_cities = {**index_dimension(CITY_ROWS, key_fn=lambda row: (row["slug"], int(row["state_id"]))), "max_id": 3}
+    city_names = get_fuzzy_index(dim_cities, "lowered_name", "by_state", 17)
+    assert [city["id"] for order, distance, name, city in find_within(city_names, "springfeld", 2)] == ["1"]
+
+    city_id = append_city_csv("Springfeld", dim_cities, 17)
+
+    assert get_fuzzy_index(dim_cities, "lowered_name", "by_state", 17) is city_names
+    assert [city["id"] for order, distance, name, city in find_within(city_names, "springfeld", 2)] == ["1", str(city_id)]
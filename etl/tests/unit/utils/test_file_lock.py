@@ -0,0 +1,37 @@
+from etl.utils import file_lock
+from etl.utils.file_lock import update_json_file, load_json_file
+from concurrent.futures import ThreadPoolExecutor
+import os
+
+def add_key(path, key):
+    update_json_file(path, lambda contents: contents.update({key: True}))
+
+def test_update_json_file_keeps_parallel_updates(tmp_path):
+    path = str(tmp_path / "crop_boxes.json")
+    keys = [f"key-{i}" for i in range(20)]
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        list(executor.map(add_key, [path] * len(keys), keys))
+
+    assert sorted(load_json_file(path)) == sorted(keys)
+
+def test_update_json_file_without_fcntl(tmp_path, monkeypatch):
+    monkeypatch.setattr(file_lock, "fcntl", None)
+    path = str(tmp_path / "crop_boxes.json")
+    keys = [f"key-{i}" for i in range(20)]
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        list(executor.map(add_key, [path] * len(keys), keys))
+
+    assert sorted(load_json_file(path)) == sorted(keys)
+    assert not os.path.exists(f"{path}.lock")                                                                           # the lock file is deleted on release
+
+def test_stale_lock_file_is_removed(tmp_path, monkeypatch):
+    monkeypatch.setattr(file_lock, "fcntl", None)
+    path = str(tmp_path / "crop_boxes.json")
+    with open(f"{path}.lock", "w"):
+        pass
+    os.utime(f"{path}.lock", (0, 0))                                                                                    # left behind by a crashed worker
+
+    add_key(path, "key")
+    assert load_json_file(path) == {"key": True}
@@ -0,0 +1,24 @@
+from etl.utils.fuzzy_index import build_fuzzy_index, insert_entry, find_within
+from Levenshtein import distance as levenshtein_distance
+import random
+
+def test_matches_a_full_scan():
+    rnd = random.Random(0)
+    words = ["".join(rnd.choice("abcde") for _ in range(rnd.randint(1, 8))) for _ in range(500)]
+    index = build_fuzzy_index((word, i) for i, word in enumerate(words))
+
+    for query in words[:50] + ["", "abcdeabcde"]:
+        for max_distance in range(3):
+            expected = [i for i, word in enumerate(words) if levenshtein_distance(query, word) <= max_distance]
+            assert [value for order, distance, word, value in find_within(index, query, max_distance)] == expected
+
+def test_inserted_entries_are_found_in_insertion_order():
+    index = build_fuzzy_index([("Civic Center", "first")])
+    insert_entry(index, "Civic Centre", "second")
+    insert_entry(index, "Civic Center", "third")
+
+    assert find_within(index, "Civic Centr", 1) == [(0, 1, "Civic Center", "first"), (1, 1, "Civic Centre", "second"), (2, 1, "Civic Center", "third")]
+    assert find_within(index, "Coliseum", 2) == []
+
+def test_empty_index():
+    assert find_within(build_fuzzy_index([]), "reno", 2) == []
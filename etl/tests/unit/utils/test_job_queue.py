@@ -0,0 +1,57 @@
+from etl.utils.job_queue import open_job_queue, enqueue_jobs, claim_job, complete_job, fail_job, queue_status, failed_jobs
+
+KEYS = [
+    ("raw/billboard/pdf/magazines/1984/10/BB-1984-10-13.pdf", '"a"', "bb_2-1"),
+    ("raw/billboard/pdf/magazines/1984/10/BB-1984-10-20.pdf", '"b"', "bb_3-1"),
+]
+
+def test_enqueue_is_idempotent_and_requeues_changed(tmp_path):
+    conn = open_job_queue(str(tmp_path / "jobs.sqlite"))
+    assert enqueue_jobs(conn, KEYS) == 2
+    complete_job(conn, claim_job(conn, "worker-0")["job_key"])
+
+    assert enqueue_jobs(conn, KEYS) == 0                                                                                # finished jobs stay done
+    assert queue_status(conn) == {"done": 1, "pending": 1}
+    assert enqueue_jobs(conn, [(KEYS[0][0], '"a2"', "bb_2-1")]) == 1                                                    # the pdf changed
+    assert queue_status(conn) == {"pending": 2}
+
+def test_new_parser_version_requeues_done_job(tmp_path):
+    conn = open_job_queue(str(tmp_path / "jobs.sqlite"))
+    enqueue_jobs(conn, KEYS[:1])
+    complete_job(conn, claim_job(conn, "worker-0")["job_key"])
+
+    assert enqueue_jobs(conn, KEYS[:1]) == 0
+    assert enqueue_jobs(conn, [(KEYS[0][0], KEYS[0][1], "bb_2-2")]) == 1
+    assert queue_status(conn) == {"pending": 1}
+
+def test_expired_lease_is_claimed_again(tmp_path):
+    conn = open_job_queue(str(tmp_path / "jobs.sqlite"))
+    enqueue_jobs(conn, KEYS[:1])
+
+    job = claim_job(conn, "worker-0", lease_seconds=-1)                                                                 # worker-0 dies holding the job
+    reclaimed = claim_job(conn, "worker-1")
+
+    assert reclaimed["job_key"] == job["job_key"]
+    assert reclaimed["attempts"] == 2
+    assert claim_job(conn, "worker-2") is None                                                                         # leased by worker-1
+
+def test_failed_job_retries_until_out_of_attempts(tmp_path):
+    conn = open_job_queue(str(tmp_path / "jobs.sqlite"))
+    enqueue_jobs(conn, KEYS[:1])
+
+    for _ in range(2):
+        fail_job(conn, claim_job(conn, "worker-0", max_attempts=2)["job_key"], "ocr failed", max_attempts=2)
+
+    assert claim_job(conn, "worker-0", max_attempts=2) is None
+    assert queue_status(conn) == {"failed": 1}
+
+def test_lease_expired_on_final_attempt_is_failed(tmp_path):
+    conn = open_job_queue(str(tmp_path / "jobs.sqlite"))
+    enqueue_jobs(conn, KEYS[:1])
+
+    for worker_id in ("worker-0", "worker-1"):
+        claim_job(conn, worker_id, lease_seconds=-1, max_attempts=2)                                                    # each worker dies holding the job
+
+    assert claim_job(conn, "worker-2", max_attempts=2) is None
+    assert queue_status(conn) == {"failed": 1}
+    assert failed_jobs(conn) == [(KEYS[0][0], "lease expired on final attempt")]
@@ -0,0 +1,23 @@
+from etl.utils.manifest import open_manifest, get_manifest_entry, needs_processing, record_processed
+
+RAW_KEY = "raw/billboard/pdf/magazines/1984/11/BB-1984-11-03.pdf"
+
+def test_record_and_skip_unchanged(tmp_path):
+    conn = open_manifest(str(tmp_path / "manifest.sqlite"))
+    assert needs_processing(get_manifest_entry(conn, RAW_KEY), '"etag-1"', "bb_3-1")
+
+    record_processed(conn, RAW_KEY, '"etag-1"', "bb_3-1", "processed/billboard/magazines/1984/11/BB-1984-11-03.csv", "abc123")
+    entry = get_manifest_entry(conn, RAW_KEY)
+
+    assert entry["pdf_hash"] == "abc123"
+    assert not needs_processing(entry, '"etag-1"', "bb_3-1")
+    assert needs_processing(entry, '"etag-2"', "bb_3-1")                                                               # pdf replaced
+    assert needs_processing(entry, '"etag-1"', "bb_3-2")                                                               # parser changed
+
+def test_record_processed_updates_existing_row(tmp_path):
+    conn = open_manifest(str(tmp_path / "manifest.sqlite"))
+    record_processed(conn, RAW_KEY, '"etag-1"', "bb_3-1", "out-1.csv")
+    record_processed(conn, RAW_KEY, '"etag-2"', "bb_3-1", "out-2.csv")
+
+    assert get_manifest_entry(conn, RAW_KEY)["output_key"] == "out-2.csv"
+    assert conn.execute("SELECT COUNT(*) FROM processed_issues").fetchone()[0] == 1
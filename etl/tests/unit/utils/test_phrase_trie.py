@@ -0,0 +1,33 @@
+from etl.utils.phrase_trie import build_trie, freeze_trie, find_phrases, tag_phrases, slug_pieces, slug_phrase
+import pytest
+
+def test_find_phrases_returns_every_end():
+    trie = build_trie([(("new",), "new"), (("new", "york"), "new-york"), (("york",), "york")])
+    token_pieces = [("new",), ("york",), ("city",)]
+
+    assert list(find_phrases(trie, token_pieces, 0)) == [(1, "new"), (2, "new-york")]
+    assert list(find_phrases(trie, token_pieces, 0, max_tokens=1)) == [(1, "new")]
+    assert tag_phrases(trie, token_pieces) == [(0, 1, "new"), (0, 2, "new-york"), (1, 2, "york")]
+
+def test_token_can_span_several_pieces():
+    trie = build_trie([(slug_phrase("winston-salem"), "winston-salem")])
+    token_pieces = [slug_pieces(token) for token in ["Winston-Salem,", "N.C."]]
+
+    assert tag_phrases(trie, token_pieces) == [(0, 1, "winston-salem")]
+
+def test_token_without_pieces_is_passed_over():
+    trie = build_trie([(("las", "vegas"), "las-vegas")])
+    token_pieces = [slug_pieces(token) for token in ["Las", "-", "Vegas"]]
+
+    assert tag_phrases(trie, token_pieces) == [(0, 3, "las-vegas")]
+
+def test_frozen_trie_is_read_only():
+    trie = freeze_trie(build_trie([(("reno",), "reno")]))
+
+    with pytest.raises(TypeError):
+        trie["reno"]["tahoe"] = {}
+
+def test_slug_phrase_rejects_impossible_slugs():
+    assert slug_phrase("st-louis") == ("st", "louis")
+    assert slug_phrase("st--louis") is None
+    assert slug_phrase("") == ()
@@ -0,0 +1,36 @@
+from etl.utils.processed import get_processed_key, select_processed_files, read_processed_events
+from etl.schemas.billboard_magazine_3.processing.event_batch import build_event_batch, serialize_event_batch
+from etl.schemas.billboard_magazine_3.processing.process import parse_event
+import io
+
+EVENT_LINES = [
+    "CULTURE CLUB Capital Centre Nov. 11 $216,736 13,983 Cellar Door Prods. | DADS Landover, Md, $15.50 (19,114)",
+    "ROD STEWART Thomas & Mack Nov. 7 $166,762 9558 Southland Concerts | two sellouts",
+]
+
+def test_get_processed_key():
+    raw_key = "raw/billboard/pdf/magazines/1984/11/BB-1984-11-03.pdf"
+    assert get_processed_key(raw_key) == "processed/billboard/magazines/1984/11/BB-1984-11-03.parquet"
+    assert get_processed_key(raw_key, "csv") == "processed/billboard/magazines/1984/11/BB-1984-11-03.csv"
+
+def test_select_processed_files_prefers_parquet():
+    paths = [
+        "processed/1984/11/BB-1984-11-03.csv",
+        "processed/1984/11/BB-1984-11-03.parquet",
+        "processed/1984/11/BB-1984-11-10.csv",
+        "processed/manifest.sqlite",
+    ]
+    assert select_processed_files(paths) == ["processed/1984/11/BB-1984-11-03.parquet", "processed/1984/11/BB-1984-11-10.csv"]
+
+def test_parquet_and_csv_read_the_same_lists():
+    batch = build_event_batch([parse_event(line) for line in EVENT_LINES])
+
+    parquet_df = read_processed_events(io.BytesIO(serialize_event_batch(batch, "parquet")), "BB-1984-11-03.parquet")
+    csv_df = read_processed_events(io.BytesIO(serialize_event_batch(batch, "csv")), "BB-1984-11-03.csv")
+
+    for df in (parquet_df, csv_df):
+        assert df["artists"].tolist() == [["CULTURE CLUB", "DADS"], ["ROD STEWART"]]
+        assert df["location"].tolist() == [["Capital Centre", "Landover, Md,"], ["Thomas & Mack"]]
+        assert df["ticket_prices"].tolist() == [["15.50"], []]
+        assert isinstance(df["promoter"].iloc[0], list)
+    assert parquet_df["gross_receipts_us"].tolist() == csv_df["gross_receipts_us"].tolist()
@@ -0,0 +1,70 @@
+from etl.utils import reference_data
+from etl.utils.reference_data import get_reference_data, get_dimension_table, get_load_counts, reset_reference_data
+import json
+import os
+import pytest
+
+@pytest.fixture(autouse=True)
+def check_every_lookup(monkeypatch):
+    monkeypatch.setattr(reference_data, "CHECK_INTERVAL", 0.0)
+
+@pytest.fixture
+def keywords_path(tmp_path, monkeypatch):
+    path = tmp_path / "event_keywords.json"
+    path.write_text(json.dumps({"strong": ["festival"], "weak": ["show"], "tags": ["tour"]}))
+    monkeypatch.setitem(reference_data.REFERENCE_FILES, "event_keywords", str(path))
+    reset_reference_data()
+    yield path
+    reset_reference_data()
+
+def bump_mtime(path):
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+def test_loads_once(keywords_path):
+    first = get_reference_data("event_keywords")
+    for _ in range(100):
+        assert get_reference_data("event_keywords") is first
+
+    assert get_load_counts() == {"event_keywords": 1}
+
+def test_file_is_not_checked_within_interval(keywords_path, monkeypatch):
+    monkeypatch.setattr(reference_data, "CHECK_INTERVAL", 3600.0)
+    first = get_reference_data("event_keywords")
+    keywords_path.write_text(json.dumps({"strong": [], "weak": [], "tags": []}))
+    bump_mtime(keywords_path)
+
+    assert get_reference_data("event_keywords") is first
+
+def test_touched_file_is_not_parsed_again(keywords_path):
+    first = get_reference_data("event_keywords")
+    bump_mtime(keywords_path)
+
+    assert get_reference_data("event_keywords") is first
+    assert get_load_counts()["event_keywords"] == 1
+
+def test_changed_file_is_reloaded(keywords_path):
+    get_reference_data("event_keywords")
+    keywords_path.write_text(json.dumps({"strong": ["fest"], "weak": [], "tags": []}))
+    bump_mtime(keywords_path)
+
+    assert get_reference_data("event_keywords")["strong"] == ["fest"]
+    assert get_load_counts()["event_keywords"] == 2
+
+def test_dimension_table_reloads_only_on_change(tmp_path, monkeypatch):
+    path = tmp_path / "dim_sources.csv"
+    path.write_text("id,name,slug\n1,Billboard,billboard\n")
+    monkeypatch.setitem(reference_data.DIMENSION_TABLES, "sources", {"local_path": str(path), "s3_path": str(path), "key_fn": lambda row: row["slug"]})
+    reset_reference_data()
+
+    assert reference_data.get_source_id("billboard", "local") == "1"
+    assert reference_data.get_source_id("billboard", "local") == "1"
+    assert get_load_counts() == {"dim_sources:local": 1}
+
+    with open(path, "a") as f:
+        f.write("2,Pollstar,pollstar\n")
+    bump_mtime(path)
+
+    assert get_dimension_table("sources", "local")["max_id"] == 2
+    assert get_load_counts() == {"dim_sources:local": 2}
+    reset_reference_data()
@@ -0,0 +1,65 @@
+from etl.utils.tracing import configure_tracing, set_quiet, get_tracer, trace, MAX_FIELD_LENGTH
+import logging
+import pytest
+
+class ExplodingRepr:
+    def __repr__(self):
+        raise AssertionError("field was formatted")
+
+@pytest.fixture
+def records():
+    collected = []
+    handler = logging.Handler()
+    handler.emit = collected.append
+    root_tracer = logging.getLogger("etl")
+    root_tracer.addHandler(handler)
+    yield collected
+    root_tracer.removeHandler(handler)
+    configure_tracing(levels={}, sample_rates={}, quiet=False)
+
+def test_per_module_levels(records):
+    configure_tracing(levels={"etl.dimensions": "DEBUG"}, sample_rates={}, quiet=False)
+
+    trace(get_tracer("etl.dimensions.artists_utils"), logging.DEBUG, "artist_lookup", artist_id=1)
+    trace(get_tracer("etl.schemas.billboard_magazine_3.curation.location"), logging.DEBUG, "venue_candidates", candidates=3)
+
+    assert [record.getMessage() for record in records] == ["artist_lookup artist_id=1"]
+
+def test_disabled_fields_are_never_formatted(records):
+    configure_tracing(levels={}, sample_rates={}, quiet=False)
+
+    trace(get_tracer("etl.dimensions.artists_utils"), logging.DEBUG, "artist_lookup", by_id=ExplodingRepr())
+
+    assert records == []
+
+def test_quiet_mode_keeps_warnings(records):
+    configure_tracing(levels={"etl.dimensions": "DEBUG"}, sample_rates={}, quiet=True)
+    tracer = get_tracer("etl.dimensions.location_csv")
+
+    trace(tracer, logging.INFO, "venue_added", by_id=ExplodingRepr())
+    trace(tracer, logging.WARNING, "venue_name_missing", city_id=4)
+
+    assert [record.levelno for record in records] == [logging.WARNING]
+
+    set_quiet(False)
+    trace(tracer, logging.DEBUG, "venue_added", venue_id=9)
+    assert len(records) == 2
+
+def test_sampling_is_per_module(records):
+    configure_tracing(levels={"etl": "DEBUG"}, sample_rates={"etl.schemas": 0.25}, quiet=False)
+    sampled_tracer = get_tracer("etl.schemas.billboard_magazine_3.curation.location")
+
+    for i in range(8):
+        trace(sampled_tracer, logging.DEBUG, "venue_candidate", i=i)
+        trace(get_tracer("etl.dimensions.location_utils"), logging.DEBUG, "venue_lookup", i=i)
+
+    sampled = [record.getMessage() for record in records if record.name == sampled_tracer.name]
+    assert sampled == ["venue_candidate i=0", "venue_candidate i=4"]
+    assert len(records) == 10
+
+def test_large_fields_are_cut(records):
+    configure_tracing(levels={"etl": "DEBUG"}, sample_rates={}, quiet=False)
+
+    trace(get_tracer("etl.dimensions.artists_utils"), logging.DEBUG, "artists", by_id={i: "x" * 20 for i in range(1000)})
+
+    assert len(records[0].getMessage()) < MAX_FIELD_LENGTH + 50
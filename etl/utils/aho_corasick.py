@@ -0,0 +1,81 @@
+from collections import deque
+import re
+
+'''
+Aho-Corasick automaton for finding every occurrence of a fixed set of keywords in one pass over a string. The
+automaton is built once as a table of complete transitions, so the scan is a single dict lookup per character no
+matter how many keywords there are or how they overlap. Most strings hold none of the keywords, those are rejected by
+a plain alternation of the keywords before the scan.
+
+    automaton = build_automaton([("festival", "strong"), ("fest", "strong"), ("vol.", "tags")])
+    for end, keyword in find_matches(automaton, "budweiser superfest: vol. 2"):
+        ...
+'''
+
+def build_automaton(patterns):
+    """
+    :param patterns: iterable of (keyword, label) pairs, a keyword can have several labels
+    :return: (dict) {"transitions": [{char: state}], "outputs": [[keyword]], "labels": {keyword: set of labels},
+        "by_label": {label: set of keywords}, "prefilter": compiled alternation of the keywords}
+    """
+    transitions = [{}]
+    outputs = [[]]
+    labels = {}
+    by_label = {}
+
+    for keyword, label in patterns:
+        if not keyword:
+            continue
+        labels.setdefault(keyword, set()).add(label)
+        by_label.setdefault(label, set()).add(keyword)
+
+        state = 0
+        for char in keyword:
+            if char not in transitions[state]:
+                transitions.append({})
+                outputs.append([])
+                transitions[state][char] = len(transitions) - 1
+            state = transitions[state][char]
+        if keyword not in outputs[state]:
+            outputs[state].append(keyword)
+
+    alphabet = {char for keyword in labels for char in keyword}
+    fail = [0] * len(transitions)
+    queue = deque(transitions[0].values())
+
+    # breadth first, so the fail state of every state is complete before its children are visited
+    while queue:
+        state = queue.popleft()
+        outputs[state] = outputs[state] + [keyword for keyword in outputs[fail[state]] if keyword not in outputs[state]]
+
+        for char in alphabet:
+            child = transitions[state].get(char)
+            fallback = transitions[fail[state]].get(char, 0)
+            if child is None:
+                transitions[state][char] = fallback                                                                     # complete the table, no fail links at scan time
+            else:
+                fail[child] = fallback
+                queue.append(child)
+
+    prefilter = re.compile("|".join(re.escape(keyword) for keyword in sorted(labels, key=len, reverse=True)))
+
+    return {"transitions": transitions, "outputs": outputs, "labels": labels, "by_label": by_label, "prefilter": prefilter}
+
+def find_matches(automaton, text):
+    """
+    :param automaton: (dict) from build_automaton
+    :param text: (str)
+    :return: generator of (end, keyword), end being the position after the keyword's last character, in order of end
+    """
+    if not automaton["prefilter"].search(text):
+        return
+
+    transitions = automaton["transitions"]
+    outputs = automaton["outputs"]
+    state = 0
+
+    for i, char in enumerate(text):
+        state = transitions[state].get(char, 0)
+        if outputs[state]:
+            for keyword in outputs[state]:
+                yield i + 1, keyword
@@ -0,0 +1,88 @@
+from contextlib import contextmanager
+import json
+import time
+import os
+
+try:
+    import fcntl
+except ImportError:                                                                                                     # not available on Windows
+    fcntl = None
+
+'''
+Lock-then-replace updates of the small JSON files shared by worker processes, ex. the crop boxes and the page index.
+The file is read, updated and written to a temp file that replaces it, all under a lock, so two workers saving at the
+same time never drop each other's entries.
+
+The lock is an flock on '<path>.lock' where fcntl exists. Elsewhere it is the '<path>.lock' file itself, created with
+O_EXCL and deleted on release. A lock file older than STALE_LOCK_SECONDS is left over from a crashed worker and removed.
+
+    update_json_file(path, lambda crop_boxes: crop_boxes.update({era: box}))
+'''
+
+LOCK_RETRY_SECONDS = 0.05
+STALE_LOCK_SECONDS = 60
+
+@contextmanager
+def file_lock(path):
+    """
+    Holds an exclusive lock on '<path>.lock' for the body of the with block
+
+    :param path: (str) the file being protected
+    """
+    lock_path = f"{path}.lock"
+    os.makedirs(os.path.dirname(lock_path) or ".", exist_ok=True)
+
+    if fcntl is not None:
+        with open(lock_path, "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)                                                                       # released when the lock file is closed
+            yield
+        return
+
+    while True:
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(lock_path) > STALE_LOCK_SECONDS:
+                    os.remove(lock_path)
+                    continue
+            except FileNotFoundError:                                                                                   # released between the two calls
+                continue
+            time.sleep(LOCK_RETRY_SECONDS)
+
+    try:
+        yield
+    finally:
+        os.close(fd)
+        os.remove(lock_path)
+
+def load_json_file(path):
+    """
+    :return: (dict) the file's contents, empty if it does not exist
+    """
+    if not os.path.exists(path):
+        return {}
+
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def update_json_file(path, update):
+    """
+    Re-reads the file under its lock, applies the update and atomically replaces the file
+
+    :param path: (str)
+    :param update: function taking the loaded dict and changing it in place
+    :return: (dict) the updated contents
+    """
+    with file_lock(path):
+        contents = load_json_file(path)
+        update(contents)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(contents, f, indent=2, sort_keys=True)
+
+        os.replace(tmp_path, path)
+
+    return contents
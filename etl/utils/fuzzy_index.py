@@ -0,0 +1,69 @@
+from Levenshtein import distance as levenshtein_distance
+
+'''
+BK-tree for typo tolerant lookups of names. Every child of a node sits at a known edit distance from the node's word,
+so a lookup within k edits of a word at distance d from the node only descends into the children between d-k and d+k
+and skips the rest of the tree. Entries can be inserted at any time, each keeps the order it was inserted in so a
+caller can still pick the first or last match the way a scan over the rows would.
+
+    index = build_fuzzy_index((venue["name"], venue) for venue in venues)
+    for order, distance, name, venue in find_within(index, "Civic Centre", 2):
+        ...
+'''
+
+def insert_entry(index, word, value):
+    """
+    :param index: (dict) from build_fuzzy_index
+    :param word: (str) the word the entry is found by
+    :param value: returned with the word by find_within, ex. the dimension row
+    """
+    entry = (index["size"], value)
+    index["size"] += 1
+
+    if index["root"] is None:
+        index["root"] = {"word": word, "entries": [entry], "children": {}}
+        return
+
+    node = index["root"]
+    while True:
+        distance = levenshtein_distance(word, node["word"])
+        if distance == 0:                                                                                               # same word, several rows
+            node["entries"].append(entry)
+            return
+        child = node["children"].get(distance)
+        if child is None:
+            node["children"][distance] = {"word": word, "entries": [entry], "children": {}}
+            return
+        node = child
+
+def build_fuzzy_index(entries):
+    """
+    :param entries: iterable of (word, value)
+    :return: (dict) {"root": nested nodes, "size": number of entries}
+    """
+    index = {"root": None, "size": 0}
+    for word, value in entries:
+        insert_entry(index, word, value)
+    return index
+
+def find_within(index, word, max_distance):
+    """
+    :param index: (dict) from build_fuzzy_index
+    :param word: (str)
+    :param max_distance: (int) most edits allowed
+    :return: list of (order, distance, word, value) for every entry within max_distance of word, in insertion order
+    """
+    matches = []
+    nodes = [index["root"]] if index["root"] is not None else []
+
+    while nodes:
+        node = nodes.pop()
+        distance = levenshtein_distance(word, node["word"])
+        if distance <= max_distance:
+            matches.extend((order, distance, node["word"], value) for order, value in node["entries"])
+        for child_distance, child in node["children"].items():
+            if distance - max_distance <= child_distance <= distance + max_distance:
+                nodes.append(child)
+
+    matches.sort(key=lambda match: match[0])
+    return matches
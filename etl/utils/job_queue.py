@@ -0,0 +1,166 @@
+from datetime import datetime, timezone
+import sqlite3
+import time
+import os
+
+'''
+Durable job queue in a SQLite file, shared by worker processes. A worker claims a job by taking a lease on it. If the
+worker dies, the lease expires and another worker picks the job up again. Failed jobs are retried until they run out
+of attempts. Finished jobs stay done, so a crashed run resumes where it stopped.
+
+Job statuses: pending -> running -> done, or back to pending on failure until max_attempts, then failed. A job whose
+lease expires on its last attempt is failed too, the worker died on it as many times as a job may be tried
+'''
+
+LEASE_EXPIRED_ERROR = "lease expired on final attempt"
+
+JOB_QUEUE_PATH = os.path.join(os.path.dirname(__file__), "..", "..", "data", "processed", "jobs.sqlite")
+DEFAULT_LEASE_SECONDS = 15 * 60
+DEFAULT_MAX_ATTEMPTS = 3
+
+def open_job_queue(path=JOB_QUEUE_PATH):
+    """
+    Opens the job queue, creating it if it does not exist
+
+    :param path: (str)
+    :return: sqlite3 connection
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    conn = sqlite3.connect(path, timeout=60, isolation_level=None)                                                      # transactions are managed explicitly
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")                                                                             # readers do not block the worker claiming a job
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS jobs (
+            job_key TEXT PRIMARY KEY,
+            etag TEXT,
+            parser_version TEXT,
+            status TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            worker_id TEXT,
+            lease_until REAL,
+            error TEXT,
+            updated_at TEXT
+        )
+    """)
+    columns = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+    if "parser_version" not in columns:                                                                                 # queues created before jobs recorded their parser version
+        conn.execute("ALTER TABLE jobs ADD COLUMN parser_version TEXT")
+    return conn
+
+def now_iso():
+    return datetime.now(timezone.utc).isoformat()
+
+def enqueue_jobs(conn, jobs):
+    """
+    Adds jobs to the queue. Jobs already in the queue keep their status, unless their ETag or parser version changed,
+    in which case they are queued again
+
+    :param conn: sqlite3 connection from open_job_queue
+    :param jobs: iterable of (job key, etag, parser version) tuples
+    :return: (int) number of jobs added or re-queued
+    """
+    num_queued = 0
+    conn.execute("BEGIN IMMEDIATE")
+
+    try:
+        for job_key, etag, parser_version in jobs:
+            cursor = conn.execute(
+                """
+                INSERT INTO jobs (job_key, etag, parser_version, updated_at) VALUES (?, ?, ?, ?)
+                ON CONFLICT(job_key) DO UPDATE SET
+                    etag = excluded.etag, parser_version = excluded.parser_version, status = 'pending', attempts = 0,
+                    error = NULL, updated_at = excluded.updated_at
+                WHERE jobs.etag IS NOT excluded.etag OR jobs.parser_version IS NOT excluded.parser_version
+                """,
+                (job_key, etag, parser_version, now_iso())
+            )
+            num_queued += cursor.rowcount
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+    return num_queued
+
+def claim_job(conn, worker_id, lease_seconds=DEFAULT_LEASE_SECONDS, max_attempts=DEFAULT_MAX_ATTEMPTS):
+    """
+    Leases the next pending job, or a running job whose lease expired because its worker died. Running jobs whose
+    lease expired on their last attempt are marked failed first
+
+    :param conn: sqlite3 connection
+    :param worker_id: (str)
+    :param lease_seconds: (int) how long the worker has to finish before the job can be claimed by another worker
+    :param max_attempts: (int)
+    :return: (dict) the claimed job, None if there are no jobs left to claim
+    """
+    current_time = time.time()
+    conn.execute("BEGIN IMMEDIATE")                                                                                     # lock out other workers between the select and the update
+
+    try:
+        conn.execute(
+            """
+            UPDATE jobs SET status = 'failed', lease_until = NULL, error = ?, updated_at = ?
+            WHERE status = 'running' AND lease_until < ? AND attempts >= ?
+            """,
+            (LEASE_EXPIRED_ERROR, now_iso(), current_time, max_attempts)
+        )
+        row = conn.execute(
+            """
+            SELECT * FROM jobs
+            WHERE attempts < ? AND (status = 'pending' OR (status = 'running' AND lease_until < ?))
+            ORDER BY job_key
+            LIMIT 1
+            """,
+            (max_attempts, current_time)
+        ).fetchone()
+
+        if row is None:
+            conn.execute("COMMIT")
+            return None
+
+        conn.execute(
+            """
+            UPDATE jobs SET status = 'running', attempts = attempts + 1, worker_id = ?, lease_until = ?, updated_at = ?
+            WHERE job_key = ?
+            """,
+            (worker_id, current_time + lease_seconds, now_iso(), row["job_key"])
+        )
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+    job = dict(row)
+    job["attempts"] += 1
+    return job
+
+def complete_job(conn, job_key):
+    conn.execute(
+        "UPDATE jobs SET status = 'done', lease_until = NULL, error = NULL, updated_at = ? WHERE job_key = ?",
+        (now_iso(), job_key)
+    )
+
+def fail_job(conn, job_key, error, max_attempts=DEFAULT_MAX_ATTEMPTS):
+    """
+    Records the error and puts the job back in the queue, or marks it failed once it is out of attempts
+    """
+    conn.execute(
+        """
+        UPDATE jobs SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END,
+            lease_until = NULL, error = ?, updated_at = ?
+        WHERE job_key = ?
+        """,
+        (max_attempts, str(error), now_iso(), job_key)
+    )
+
+def queue_status(conn):
+    """
+    :return: (dict) {status: number of jobs}
+    """
+    return {row["status"]: row["count"] for row in conn.execute("SELECT status, COUNT(*) AS count FROM jobs GROUP BY status")}
+
+def failed_jobs(conn):
+    """
+    :return: list of (job key, error) tuples for jobs that ran out of attempts
+    """
+    return [(row["job_key"], row["error"]) for row in conn.execute("SELECT job_key, error FROM jobs WHERE status = 'failed'")]
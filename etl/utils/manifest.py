@@ -0,0 +1,74 @@
+from datetime import datetime, timezone
+import sqlite3
+import os
+
+'''
+Manifest of the raw pdfs that have been processed. Every row records the raw key, the ETag and hash of the pdf that was
+read, the parser version that read it and the processed output key, so batch runs only process issues that are new,
+changed since they were last read, or were read by an older parser.
+'''
+
+MANIFEST_PATH = os.path.join(os.path.dirname(__file__), "..", "..", "data", "processed", "manifest.sqlite")
+
+def open_manifest(path=MANIFEST_PATH):
+    """
+    Opens the manifest, creating it if it does not exist
+
+    :param path: (str)
+    :return: sqlite3 connection
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS processed_issues (
+            raw_key TEXT PRIMARY KEY,
+            etag TEXT NOT NULL,
+            pdf_hash TEXT,
+            parser_version TEXT NOT NULL,
+            output_key TEXT,
+            processed_at TEXT NOT NULL
+        )
+    """)
+    conn.commit()
+    return conn
+
+def get_manifest_entry(conn, raw_key):
+    """
+    :param conn: sqlite3 connection from open_manifest
+    :param raw_key: (str)
+    :return: (dict) the manifest row, None if the issue has never been processed
+    """
+    row = conn.execute("SELECT * FROM processed_issues WHERE raw_key = ?", (raw_key,)).fetchone()
+    return dict(row) if row else None
+
+def load_manifest(conn):
+    """
+    :return: (dict) {raw key: manifest row}
+    """
+    return {row["raw_key"]: dict(row) for row in conn.execute("SELECT * FROM processed_issues")}
+
+def needs_processing(entry, etag, parser_version):
+    """
+    :param entry: (dict) the manifest row for the issue, None if it has never been processed
+    :param etag: (str) the current ETag of the raw pdf
+    :param parser_version: (str) the version of the parser that would read it
+    :return: bool
+    """
+    return entry is None or entry["etag"] != etag or entry["parser_version"] != parser_version
+
+def record_processed(conn, raw_key, etag, parser_version, output_key, pdf_hash=None):
+    conn.execute(
+        """
+        INSERT INTO processed_issues (raw_key, etag, pdf_hash, parser_version, output_key, processed_at)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ON CONFLICT(raw_key) DO UPDATE SET
+            etag = excluded.etag,
+            pdf_hash = excluded.pdf_hash,
+            parser_version = excluded.parser_version,
+            output_key = excluded.output_key,
+            processed_at = excluded.processed_at
+        """,
+        (raw_key, etag, pdf_hash, parser_version, output_key, datetime.now(timezone.utc).isoformat())
+    )
+    conn.commit()
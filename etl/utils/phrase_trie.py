@@ -0,0 +1,92 @@
+from functools import lru_cache
+from types import MappingProxyType
+import slugify
+
+'''
+Token trie for tagging multi-word phrases in a token list. A phrase is stored as the sequence of its pieces, one
+level per piece, so finding every phrase that starts at a token is a walk of at most as many steps as the longest
+phrase, whatever the number of phrases. Tagging a whole token list is one left to right pass over the start tokens.
+
+    trie = build_trie([(("las", "vegas"), "las-vegas"), (("reno",), "reno")])
+    tag_phrases(trie, [slug_pieces(token) for token in location_tokens])   # [(start, end, 'las-vegas'), ...]
+'''
+
+END = None                                                                                                              # key of the value stored at the end of a phrase, never a piece
+
+def insert_phrase(trie, pieces, value):
+    """
+    :param trie: (dict) from build_trie
+    :param pieces: sequence of (str)
+    :param value: stored at the end of the phrase, replaces the value of an equal phrase
+    """
+    node = trie
+    for piece in pieces:
+        node = node.setdefault(piece, {})
+    node[END] = value
+
+def build_trie(phrases):
+    """
+    :param phrases: iterable of (pieces, value)
+    :return: (dict) nested {piece: node}, with the value of a phrase under END in its last node
+    """
+    trie = {}
+    for pieces, value in phrases:
+        insert_phrase(trie, pieces, value)
+    return trie
+
+def freeze_trie(trie):
+    """
+    :return: read-only copy of the trie
+    """
+    return MappingProxyType({piece: node if piece is END else freeze_trie(node) for piece, node in trie.items()})
+
+def find_phrases(trie, token_pieces, start, max_tokens=None):
+    """
+    Walks the trie from one start token, a token without pieces is passed over as part of the phrase
+
+    :param trie: (dict) from build_trie
+    :param token_pieces: list of the pieces of every token
+    :param start: (int) index of the first token
+    :param max_tokens: (int) longest phrase in tokens, defaults to no limit
+    :return: generator of (end, value) for every phrase starting at start, end exclusive and ascending
+    """
+    node = trie
+    stop = len(token_pieces) if max_tokens is None else min(len(token_pieces), start + max_tokens)
+
+    for end in range(start, stop):
+        for piece in token_pieces[end]:
+            node = node.get(piece)
+            if node is None:
+                return
+        if END in node:
+            yield end + 1, node[END]
+
+def tag_phrases(trie, token_pieces, max_tokens=None):
+    """
+    :return: list of (start, end, value) for every phrase in the token list, ordered by start then end
+    """
+    return [
+        (start, end, value)
+        for start in range(len(token_pieces))
+        for end, value in find_phrases(trie, token_pieces, start, max_tokens)
+    ]
+
+@lru_cache(maxsize=65536)
+def slug_pieces(token):
+    """
+    The slug of a few tokens joined by spaces is the slug pieces of each token joined by '-'
+
+    :param token: (str)
+    :return: (tuple) the parts of the token's slug, ex. 'Winston-Salem,' -> ('winston', 'salem')
+    """
+    return tuple(piece for piece in slugify.slugify(token.lower()).split("-") if piece)
+
+def slug_phrase(slug):
+    """
+    :param slug: (str) a dimension table slug
+    :return: (tuple) its pieces, None if slugify could never produce the slug
+    """
+    pieces = tuple(slug.split("-"))
+    if not all(pieces) and slug != "":
+        return None
+    return () if slug == "" else pieces
@@ -0,0 +1,96 @@
+import pyarrow.parquet as pq
+import pandas as pd
+import ast
+import os
+
+'''
+Reads and names the files of the processed layer. Processed events are written as Parquet with native list columns,
+so curation gets python lists straight from the file. Older issues processed to CSV hold the lists as their string
+repr, the CSV reader parses them once on read so curation sees the same DataFrame either way.
+'''
+
+PROCESSED_PREFIX = "processed/billboard/magazines/"
+PROCESSED_EXTENSIONS = {"parquet": ".parquet", "csv": ".csv"}
+DEFAULT_PROCESSED_FORMAT = "parquet"
+LIST_COLUMNS = ["artists", "dates", "promoter", "ticket_prices", "location"]
+
+def get_processed_key(raw_key, file_format=DEFAULT_PROCESSED_FORMAT):
+    """
+    :param raw_key: (str) ex. 'raw/billboard/pdf/magazines/1984/11/BB-1984-11-03.pdf'
+    :param file_format: (str) 'parquet' or 'csv'
+    :return: (str) ex. 'processed/billboard/magazines/1984/11/BB-1984-11-03.parquet'
+    """
+    parts = raw_key.split('/')
+    year, month, file_name = parts[4], parts[5], parts[-1]
+    return f"{PROCESSED_PREFIX}{year}/{month}/" + file_name.replace(".pdf", PROCESSED_EXTENSIONS[file_format])
+
+def get_processed_format(path):
+    """
+    :param path: (str) a processed file path or s3 key
+    :return: (str) 'parquet' or 'csv', None if the file is neither
+    """
+    for file_format, extension in PROCESSED_EXTENSIONS.items():
+        if path.endswith(extension):
+            return file_format
+    return None
+
+def select_processed_files(paths):
+    """
+    Keeps one processed file per issue, the Parquet file when an issue was processed to both formats
+
+    :param paths: list of processed file paths or s3 keys
+    :return: list of paths, sorted
+    """
+    selected = {}
+
+    for path in paths:
+        file_format = get_processed_format(path)
+        if file_format is None:
+            continue
+
+        issue = os.path.splitext(path)[0]
+        if issue not in selected or file_format == "parquet":
+            selected[issue] = path
+
+    return sorted(selected.values())
+
+def read_processed_parquet(source):
+    """
+    :param source: path or file-like object of a processed Parquet file
+    :return: DataFrame with the list columns as python lists
+    """
+    table = pq.read_table(source)
+    processed_events_df = table.to_pandas()
+
+    for column in LIST_COLUMNS:
+        if column in table.column_names:
+            processed_events_df[column] = table.column(column).to_pylist()                                              # to_pandas gives numpy arrays
+
+    return processed_events_df
+
+def read_processed_csv(source):
+    """
+    :param source: path or file-like object of a processed CSV file
+    :return: DataFrame with the list columns parsed from their string repr
+    """
+    processed_events_df = pd.read_csv(source)
+
+    for column in LIST_COLUMNS:
+        if column in processed_events_df.columns:
+            processed_events_df[column] = processed_events_df[column].apply(ast.literal_eval)
+
+    return processed_events_df
+
+def read_processed_events(source, path=None):
+    """
+    Reads a processed file in either format
+
+    :param source: path or file-like object
+    :param path: (str) the path or s3 key of the file, used for its format when source is file-like
+    :return: DataFrame with one row per event and the list columns as python lists
+    """
+    file_format = get_processed_format(path or source)
+
+    if file_format == "parquet":
+        return read_processed_parquet(source)
+    return read_processed_csv(source)
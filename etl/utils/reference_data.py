@@ -0,0 +1,140 @@
+from etl.utils.utils import load_json, load_dimension_table_rows, index_dimension
+from config.config import DIMENSION_TABLES
+from config.paths import ARTIST_CORRECTIONS_PATH, EVENT_KEYWORDS_PATH, LOCATION_ALIASES_PATH
+import hashlib
+import time
+import os
+
+'''
+Registry of the reference data curation reads on every row: the correction and alias json files and the dimension
+tables. Each file is loaded once per process and kept with its mtime, size and content hash. A lookup stats the file
+at most once every CHECK_INTERVAL seconds, and the file is read again only when its mtime or size changed, and parsed
+again only when its hash did too.
+
+    event_keywords = get_reference_data("event_keywords")
+    dim_sources = get_dimension_table("sources", storage_mode)
+'''
+
+REFERENCE_FILES = {
+    "artist_corrections": ARTIST_CORRECTIONS_PATH,
+    "event_keywords": EVENT_KEYWORDS_PATH,
+    "location_aliases": LOCATION_ALIASES_PATH,
+    "special_event_aliases": os.path.join(os.path.dirname(EVENT_KEYWORDS_PATH), "special_event_aliases.json"),          # lives next to event_keywords.json
+}
+
+CHECK_INTERVAL = 1.0                                                                                                    # seconds between stats of the same file
+
+registry = {
+    "entries": {},                                                                                                      # {key: {"value", "stat", "digest", "checked"}}
+    "load_counts": {},                                                                                                  # {key: times the file was parsed}
+}
+
+def get_file_stat(path):
+    """
+    :param path: (str)
+    :return: (tuple) (mtime_ns, size), None if the file does not exist
+    """
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+def hash_file(path):
+    """
+    :param path: (str)
+    :return: (str) sha256 of the file's bytes, None if the file does not exist
+    """
+    try:
+        with open(path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except FileNotFoundError:
+        return None
+
+def load_reference(key, path, loader):
+    """
+    Returns the cached value for key, loading it with loader the first time and whenever the file's content changed
+
+    :param key: (str) registry key
+    :param path: (str) the file the value is loaded from
+    :param loader: function taking the path and returning the value
+    :return: the loaded value, the same object until the file changes
+    """
+    entry = registry["entries"].get(key)
+    now = time.monotonic()
+
+    if entry is not None and now - entry["checked"] < CHECK_INTERVAL:
+        return entry["value"]
+
+    stat = get_file_stat(path)
+    if entry is not None and entry["stat"] == stat:
+        entry["checked"] = now
+        return entry["value"]
+
+    digest = hash_file(path)
+    if entry is not None and entry["digest"] == digest:                                                                 # touched but not changed
+        entry["stat"] = stat
+        entry["checked"] = now
+        return entry["value"]
+
+    value = loader(path)
+    registry["entries"][key] = {"value": value, "stat": stat, "digest": digest, "checked": now}
+    registry["load_counts"][key] = registry["load_counts"].get(key, 0) + 1
+    return value
+
+def get_reference_data(name):
+    """
+    :param name: (str) a key of REFERENCE_FILES, ex. 'event_keywords'
+    :return: the parsed json file
+    """
+    return load_reference(name, REFERENCE_FILES[name], load_json)
+
+def load_dimension_table(path, key_fn):
+    """
+    :return: (dict) the dimension table in the shape load_dimension_tables returns for each table
+    """
+    rows, max_id = load_dimension_table_rows(path)
+    indexes = index_dimension(rows, key_fn=key_fn)
+
+    return {
+        "by_id": indexes["by_id"],
+        "by_slug": indexes["by_slug"],
+        "by_key": indexes["by_key"],
+        "by_state": indexes["by_state"],
+        "by_city": indexes["by_city"],
+        "max_id": max_id
+    }
+
+def get_dimension_table(name, storage_mode):
+    """
+    :param name: (str) a key of DIMENSION_TABLES, ex. 'sources'
+    :param storage_mode: (str) 'local' or 's3'
+    :return: (dict) the indexed dimension table
+    """
+    meta = DIMENSION_TABLES[name]
+    path = meta["s3_path"] if storage_mode == "s3" else meta["local_path"]
+    return load_reference(f"dim_{name}:{storage_mode}", path, lambda table_path: load_dimension_table(table_path, meta["key_fn"]))
+
+def get_dimension_tables(storage_mode):
+    """
+    Same tables as load_dimension_tables, only the tables whose file changed are reloaded
+
+    :param storage_mode: (str) 'local' or 's3'
+    :return: (dict) {table name: indexed dimension table}
+    """
+    return {name: get_dimension_table(name, storage_mode) for name in DIMENSION_TABLES}
+
+def get_source_id(source_slug, storage_mode):
+    dim_sources = get_dimension_table("sources", storage_mode)["by_slug"]
+    source_id = dim_sources[source_slug][0]["id"]
+    return source_id
+
+def get_load_counts():
+    """
+    :return: (dict) {registry key: times the file was parsed}
+    """
+    return dict(registry["load_counts"])
+
+def reset_reference_data():
+    registry["entries"].clear()
+    registry["load_counts"].clear()
@@ -1,6 +1,9 @@
 import boto3
 import io
 from config import BUCKET_NAME
+from contextlib import contextmanager
+import tempfile
+import os
 
 client = boto3.client('s3')
 
@@ -16,11 +19,47 @@ def list_s3_files(prefix):
 
     return keys
 
+def list_s3_objects(prefix):
+    """
+    Lists every object under the prefix along with its ETag, so changed objects can be found without downloading them
+
+    :param prefix: (str)
+    :return: list of (key, etag) tuples
+    """
+    paginator = client.get_paginator('list_objects_v2')
+    pages = paginator.paginate(Bucket=BUCKET_NAME, Prefix=prefix)
+
+    objects = []
+
+    for page in pages:
+        for obj in page.get('Contents', []):
+            objects.append((obj['Key'], obj['ETag']))
+
+    return objects
+
 def read_s3_file(key):
     response = client.get_object(Bucket=BUCKET_NAME, Key=key)
     file_stream = io.BytesIO(response['Body'].read())
     return file_stream
 
+@contextmanager
+def download_to_temp_file(key, suffix=""):
+    """
+    Streams an s3 object to a temporary file without holding the whole object in memory
+
+    :param key: (str) the s3 key
+    :param suffix: (str) file extension for the temp file, ex. '.pdf'
+    :return: the path to the temporary file, deleted on exit
+    """
+    with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as f:
+        path = f.name
+
+    try:
+        client.download_file(BUCKET_NAME, key, path)
+        yield path
+    finally:
+        os.remove(path)
+
 def write_s3_to_parquet(df, s3_client, bucket, key):
     buffer = io.BytesIO()
     df.to_parquet(buffer, engine="pyarrow", index=False)
@@ -0,0 +1,205 @@
+import logging
+import sys
+import os
+
+'''
+Level-gated tracing for the curation and dimension modules. Every module gets its own logger under 'etl', so levels
+can be set per module or per package, and a trace call that is below its module's level or outside its sample returns
+before any of its fields are formatted.
+
+    tracer = get_tracer(__name__)
+    trace(tracer, logging.DEBUG, "venue_candidate", venue_id=venue_id, city_id=city_id)
+
+Levels, sample rates and quiet mode come from the environment and can be changed at runtime:
+
+    ETL_TRACE_LEVELS="etl.dimensions=DEBUG,etl.schemas.billboard_magazine_3.curation.location=DEBUG"
+    ETL_TRACE_SAMPLE="etl.schemas.billboard_magazine_3.curation.location=0.01"
+    ETL_QUIET=1
+'''
+
+ROOT_TRACER = "etl"
+TRACE_LEVELS_ENV = "ETL_TRACE_LEVELS"
+TRACE_SAMPLE_ENV = "ETL_TRACE_SAMPLE"
+QUIET_ENV = "ETL_QUIET"
+DEFAULT_LEVEL = logging.INFO
+QUIET_LEVEL = logging.WARNING                                                                                           # quiet mode still shows warnings and errors
+MAX_FIELD_LENGTH = 200                                                                                                  # dimension dicts are cut, never dumped whole
+TRACE_FORMAT = "%(levelname)s %(name)s %(message)s"
+
+trace_state = {
+    "levels": {},                                                                                                       # {logger name: level} set by configure_tracing
+    "sample_rates": {},                                                                                                 # {logger name: rate}, a rate applies to its children too
+    "resolved_rates": {},                                                                                               # {logger name: rate} cache of the nearest configured rate
+    "counters": {},                                                                                                     # {logger name: trace calls seen}
+    "quiet": False,
+}
+
+def parse_setting_list(setting, convert):
+    """
+    :param setting: (str) ex. 'etl.dimensions=DEBUG,etl.schemas=INFO'
+    :param convert: function applied to each value
+    :return: (dict) {logger name: converted value}
+    """
+    settings = {}
+
+    for item in (setting or "").split(","):
+        if "=" not in item:
+            continue
+        name, value = item.split("=", 1)
+        settings[name.strip()] = convert(value.strip())
+
+    return settings
+
+def parse_level(level):
+    """
+    :param level: (int or str) ex. 10 or 'DEBUG'
+    :return: (int) logging level
+    """
+    if isinstance(level, int):
+        return level
+    if level.isdigit():
+        return int(level)
+
+    parsed_level = logging.getLevelName(level.upper())
+    if not isinstance(parsed_level, int):
+        raise ValueError(f"Unknown trace level {level}")
+    return parsed_level
+
+def get_root_tracer():
+    root_tracer = logging.getLogger(ROOT_TRACER)
+
+    if not root_tracer.handlers:
+        handler = logging.StreamHandler(sys.stdout)                                                                     # the prints this replaced went to stdout
+        handler.setFormatter(logging.Formatter(TRACE_FORMAT))
+        root_tracer.addHandler(handler)
+        root_tracer.propagate = False
+
+    return root_tracer
+
+def configure_tracing(levels=None, sample_rates=None, quiet=None):
+    """
+    Sets the per-module levels, sample rates and quiet mode, defaults are read from the environment
+
+    :param levels: (dict) {logger name: level}, ex. {'etl.dimensions': 'DEBUG'}
+    :param sample_rates: (dict) {logger name: rate}, 1.0 traces every call, 0.01 one call in a hundred
+    :param quiet: (bool) only warnings and errors are traced, whatever the module levels
+    """
+    if levels is None:
+        levels = parse_setting_list(os.environ.get(TRACE_LEVELS_ENV), parse_level)
+    if sample_rates is None:
+        sample_rates = parse_setting_list(os.environ.get(TRACE_SAMPLE_ENV), float)
+    if quiet is None:
+        quiet = os.environ.get(QUIET_ENV, "").lower() in ("1", "true", "yes")
+
+    for name in trace_state["levels"]:                                                                                  # drop the levels of the previous configuration
+        logging.getLogger(name).setLevel(logging.NOTSET)
+
+    trace_state["levels"] = {name: parse_level(level) for name, level in levels.items()}
+    trace_state["sample_rates"] = {name: float(rate) for name, rate in sample_rates.items()}
+    trace_state["resolved_rates"] = {}
+    trace_state["counters"] = {}
+
+    get_root_tracer().setLevel(DEFAULT_LEVEL)
+    for name, level in trace_state["levels"].items():
+        logging.getLogger(name).setLevel(level)
+
+    set_quiet(quiet)
+
+def set_quiet(quiet=True):
+    """
+    Quiet mode raises the level every etl logger is checked against, so a trace call below it costs one cached
+    isEnabledFor lookup
+
+    :param quiet: (bool)
+    """
+    trace_state["quiet"] = quiet
+    root_tracer = get_root_tracer()
+
+    if quiet:
+        root_tracer.setLevel(QUIET_LEVEL)
+        for name in trace_state["levels"]:
+            logging.getLogger(name).setLevel(max(trace_state["levels"][name], QUIET_LEVEL))
+    else:
+        root_tracer.setLevel(DEFAULT_LEVEL)
+        for name, level in trace_state["levels"].items():
+            logging.getLogger(name).setLevel(level)
+
+def get_tracer(name):
+    """
+    :param name: (str) the module's __name__
+    :return: logging.Logger under the etl tracer
+    """
+    if name != ROOT_TRACER and not name.startswith(ROOT_TRACER + "."):
+        name = f"{ROOT_TRACER}.{name}"
+    return logging.getLogger(name)
+
+def get_sample_rate(name):
+    """
+    :param name: (str) logger name
+    :return: (float) the rate configured for the logger or its nearest parent, 1.0 if there is none
+    """
+    resolved_rates = trace_state["resolved_rates"]
+    if name in resolved_rates:
+        return resolved_rates[name]
+
+    rate = 1.0
+    parts = name.split(".")
+    for end in range(len(parts), 0, -1):
+        parent = ".".join(parts[:end])
+        if parent in trace_state["sample_rates"]:
+            rate = trace_state["sample_rates"][parent]
+            break
+
+    resolved_rates[name] = rate
+    return rate
+
+def is_sampled(name):
+    """
+    Deterministic sampling, a rate of 0.1 traces the 1st, 11th, 21st ... call of the logger
+
+    :param name: (str) logger name
+    :return: True if this call should be traced
+    """
+    rate = get_sample_rate(name)
+    if rate >= 1.0:
+        return True
+    if rate <= 0.0:
+        return False
+
+    counters = trace_state["counters"]
+    count = counters.get(name, 0)
+    counters[name] = count + 1
+    return count % round(1 / rate) == 0
+
+def format_field(value):
+    text = repr(value)
+    if len(text) > MAX_FIELD_LENGTH:
+        text = text[:MAX_FIELD_LENGTH] + f"... ({len(text)} chars)"
+    return text
+
+def format_trace(event, fields):
+    """
+    :param event: (str) short name of what happened, ex. 'venue_candidate'
+    :param fields: (dict) {name: value}
+    :return: (str) ex. "venue_candidate venue_id=12 city_id=3"
+    """
+    return " ".join([event] + [f"{name}={format_field(value)}" for name, value in fields.items()])
+
+def trace(tracer, level, event, **fields):
+    """
+    Traces one event with its fields as key=value pairs. The fields are only formatted when the tracer's level is
+    enabled and the call is in the sample, so large values can be passed as they are
+
+    :param tracer: logging.Logger from get_tracer
+    :param level: (int) logging level
+    :param event: (str)
+    :param fields: values to trace with the event
+    """
+    if not tracer.isEnabledFor(level):
+        return
+    if level < logging.WARNING and not is_sampled(tracer.name):                                                         # warnings and errors are never sampled out
+        return
+
+    tracer.log(level, format_trace(event, fields), stacklevel=2)
+
+configure_tracing()
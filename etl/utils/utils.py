@@ -1,6 +1,9 @@
 from collections import defaultdict
-from pdf2image import convert_from_bytes
-import pytesseract
+from etl.ocr.page_cache import get_page_image, get_page_image_path, hash_pdf, spooled_pdf, DEFAULT_DPI
+from etl.ocr.text_cache import load_ocr_text, save_ocr_text
+from etl.ocr.workers import image_to_string
+from etl.ocr.words import image_to_words, words_to_text, empty_words, load_words, save_words
+from etl.utils.fuzzy_index import build_fuzzy_index, insert_entry
 import os
 import re
 import csv
@@ -24,18 +27,83 @@ def sluggify_column(column_name):
     slug = column_name.replace(' ', '_').lower()
     return slug
 
-def extract_text_ocr(pdf_bytes, page_num):
-    pdf_images = convert_from_bytes(
-        pdf_bytes,
-        first_page=page_num,
-        last_page=page_num
-    )
+def get_ocr_image(pdf_bytes, page_num, dpi, pdf_hash, low_memory=False):
+    '''
+    :return: the page as a PIL image, or the path of the rendered page in low memory mode, None if the page does not exist
+    '''
+    if low_memory:
+        with spooled_pdf(pdf_bytes) as pdf_path:
+            return get_page_image_path(pdf_path, page_num, dpi=dpi, pdf_hash=pdf_hash)
+
+    return get_page_image(pdf_bytes, page_num, dpi=dpi, pdf_hash=pdf_hash)
+
+def extract_text_ocr(pdf_bytes, page_num, dpi=DEFAULT_DPI, pdf_hash=None, config="", use_cache=True, ocr_backend=None, low_memory=False, emit_words=False):
+    '''
+    Rasterizes one page of a pdf and reads its text with pytesseract. Text that has already been read with the same
+    DPI, config and tesseract version comes from the OCR text cache, and page images come from the page cache
+
+    :param pdf_bytes: the raw bytes of the pdf, or the path to a local pdf file
+    :param page_num: (int) the 1-indexed page number
+    :param dpi: (int)
+    :param pdf_hash: (str) the pdf's hash if already known
+    :param config: (str) extra tesseract arguments, ex. '--psm 6'
+    :param use_cache: (bool) False always runs tesseract and does not save the text
+    :param ocr_backend: a TesseractWorkerPool, defaults to the backend set with set_ocr_backend or pytesseract
+    :param low_memory: (bool) render the page to a file and let tesseract read it from disk instead of decoding it here,
+        pass a pdf path rather than bytes so the pdf is not spooled to a temp file on every call
+    :param emit_words: (bool) read the page as word boxes and save them to the word cache, see extract_words_ocr. The
+        text is rebuilt from the words so tesseract only runs once
+    :return: the OCR text of the page
+    '''
+    pdf_hash = pdf_hash or hash_pdf(pdf_bytes)
+
+    if emit_words:
+        words = extract_words_ocr(pdf_bytes, page_num, dpi, pdf_hash, config, use_cache, low_memory)
+        return words_to_text(words)
+
+    if use_cache:
+        page_text = load_ocr_text(pdf_hash, page_num, dpi, config)
+        if page_text is not None:
+            return page_text
+
+    img = get_ocr_image(pdf_bytes, page_num, dpi, pdf_hash, low_memory)
+
+    page_text = "" if img is None else image_to_string(img, config, ocr_backend)
+
+    if use_cache:
+        save_ocr_text(pdf_hash, page_num, page_text, dpi, config)
+
+    return page_text
+
+def extract_words_ocr(pdf_bytes, page_num, dpi=DEFAULT_DPI, pdf_hash=None, config="", use_cache=True, low_memory=False):
+    '''
+    Reads every word of the page with its bounding box and confidence from tesseract's TSV output. Words that have
+    already been read with the same DPI, config and tesseract version come from the word cache
+
+    :param pdf_bytes: the raw bytes of the pdf, or the path to a local pdf file
+    :param page_num: (int) the 1-indexed page number
+    :param dpi: (int)
+    :param pdf_hash: (str) the pdf's hash if already known
+    :param config: (str) extra tesseract arguments
+    :param use_cache: (bool)
+    :param low_memory: (bool) see extract_text_ocr
+    :return: DataFrame of words, see etl.ocr.words
+    '''
+    pdf_hash = pdf_hash or hash_pdf(pdf_bytes)
+
+    if use_cache:
+        words = load_words(pdf_hash, page_num, dpi, config)
+        if words is not None:
+            return words
 
-    texts = []
-    for img in pdf_images:
-        texts.append(pytesseract.image_to_string(img))
+    img = get_ocr_image(pdf_bytes, page_num, dpi, pdf_hash, low_memory)
 
-    return "\n".join(texts)
+    words = empty_words() if img is None else image_to_words(img, config)
+
+    if use_cache:
+        save_words(pdf_hash, page_num, words, dpi, config)
+
+    return words
 
 def load_corrections_table(path):
     corrections_dict = {}
@@ -86,14 +154,29 @@ def load_dimension_tables(storage_mode):
             "by_id": indexes["by_id"],
             "by_slug": indexes["by_slug"],
             "by_key": indexes["by_key"],
+            "by_state": indexes["by_state"],
+            "by_city": indexes["by_city"],
             "max_id": max_id
         }
 
     return tables
 
+SECONDARY_INDEXES = {"by_state": "state_id", "by_city": "city_id"}                                                      # index name -> column, rows with the column empty are left out
+
+def add_to_secondary_indexes(row, indexes):
+    '''
+    :param row: dict - a row of the dimension table
+    :param indexes: dict - holding one dictionary per name in SECONDARY_INDEXES
+    '''
+    for index_name, column in SECONDARY_INDEXES.items():
+        value = row.get(column)
+        if value is not None and value != "":
+            indexes[index_name].setdefault(int(value), []).append(row)
+
 def index_dimension(rows, key_fn):
     '''
-    Creates three versions of the dimension table as a dictionary. One allowing search by unique key, one version allowing search by slug, one by unique id number
+    Creates five versions of the dimension table as a dictionary. One allowing search by unique key, one version allowing search by slug, one by unique id number,
+    and lists of the rows in each state and in each city
     :param rows: list - a list of the rows of the dimension table
     :param key_fn: lambda function: a function that generates a unique key to identify the row in the dictionary
     :return: dictionary of dictionaries containing versions of the same dimension table with different indexes
@@ -108,11 +191,56 @@ def index_dimension(rows, key_fn):
         by_slug[row["slug"]].append(row)
         by_id[int(row["id"])] = row
 
-    return {
-        "by_key": by_key,
-        "by_slug": dict(by_slug),
-        "by_id": by_id
-    }
+    indexes = {"by_key": by_key, "by_slug": dict(by_slug), "by_id": by_id, "by_state": {}, "by_city": {}}
+
+    # rows are listed in by_slug order, the order the curation scanned them in before these indexes existed
+    for slug_rows in indexes["by_slug"].values():
+        for row in slug_rows:
+            add_to_secondary_indexes(row, indexes)
+
+    return indexes
+
+def add_dimension_row(row, table, key_fn):
+    '''
+    Adds a row appended to a dimension table to every index of the loaded table
+    :param row: dict - the new row, with the string values load_dimension_table_rows would read back for it
+    :param table: dict - the table as load_dimension_tables returns it
+    :param key_fn: lambda function: the table's key_fn from DIMENSION_TABLES
+    '''
+    table["by_key"][key_fn(row)] = row
+    table["by_slug"].setdefault(row["slug"], []).append(row)
+    table["by_id"][int(row["id"])] = row
+    add_to_secondary_indexes(row, table)
+
+    for (field, index_name, partition), fuzzy_index in table.get("fuzzy_indexes", {}).items():
+        value = row.get(SECONDARY_INDEXES[index_name])
+        if value is not None and value != "" and int(value) == partition:
+            insert_entry(fuzzy_index, FUZZY_FIELDS[field](row), row)
+
+FUZZY_FIELDS = {                                                                                                        # field name -> the word a row is found by
+    "name": lambda row: row["name"],
+    "lowered_name": lambda row: row["name"].lower(),
+    "slug": lambda row: row["slug"],
+}
+
+def get_fuzzy_index(table, field, index_name, partition):
+    '''
+    Typo tolerant index of one field of the rows in one partition of a secondary index, ex. the slugs of the cities in a state.
+    Built the first time it is asked for and kept current by add_dimension_row
+    :param table: dict - the table as load_dimension_tables returns it
+    :param field: str - a key of FUZZY_FIELDS
+    :param index_name: str - a key of SECONDARY_INDEXES
+    :param partition: int - the state_id or city_id
+    :return: dict - from build_fuzzy_index, with the rows in the order the secondary index lists them
+    '''
+    fuzzy_indexes = table.setdefault("fuzzy_indexes", {})
+    key = (field, index_name, partition)
+
+    if key not in fuzzy_indexes:
+        word_fn = FUZZY_FIELDS[field]
+        fuzzy_indexes[key] = build_fuzzy_index((word_fn(row), row) for row in table[index_name].get(partition, []))
+
+    return fuzzy_indexes[key]
 
 def add_slugs_to_csv(path):
     df = pd.read_csv(path)
@@ -155,11 +283,6 @@ def parse_ocr_int(value):
 
     return int(v)
 
-def get_source_id(source_slug, storage_mode):
-    dim_sources = load_dimension_tables(storage_mode)["sources"]["by_slug"]
-    source_id = dim_sources[source_slug][0]["id"]
-    return source_id
-
 def load_artist_corrections():
     with open(ARTIST_CORRECTIONS_PATH, "r", encoding="utf-8") as f:
         return json.load(f)